@@ -0,0 +1,54 @@
+from staking_sdk.utils import sign_group
+from staking_sdk.batch_signing import sign_groups
+from staking_sdk.v1.deposit import deposit
+from algosdk import account
+from algosdk.future.transaction import SuggestedParams, assign_group_id
+from concurrent.futures import ProcessPoolExecutor
+from base64 import b64encode
+from os import cpu_count
+from time import perf_counter
+
+#Finds the batch size from which signing the deposit groups on a process pool is faster than signing them in process.
+#Run from the repository root with: python -m benchmarks.batch_signing
+
+SIZES = [100, 250, 500, 1000, 2000, 4000, 8000]
+
+PK, ADDRESS = account.generate_account()
+PARAMS = SuggestedParams(1000, 1000, 2000, b64encode(bytes(32)).decode(), "simnet-v1", True)
+
+def build_groups(number: int) -> list:
+    return [assign_group_id(deposit(ADDRESS, PARAMS, amount, 1001, 1000, 1650000000)) for amount in range(1, number + 1)]
+
+def timed(call) -> float:
+    start = perf_counter()
+    call()
+    return perf_counter() - start
+
+def main():
+    processes = cpu_count() or 1
+    print("CPUs:", processes)
+    if processes < 2:
+        print("sign_groups always signs in process with a single CPU, the parallel timings only show the process pool overhead")
+        processes = 2
+
+    groups = build_groups(SIZES[-1])
+    with ProcessPoolExecutor(processes) as executor:
+        sign_groups(groups[:processes * 8], PK, executor, processes, min_parallel=0) #Start the workers
+
+        print("{:>8}{:>14}{:>14}{:>16}{:>10}".format("groups", "sign_group s", "in process s", "process pool s", "speedup"))
+        crossover = None
+        for size in SIZES:
+            batch = groups[:size]
+            sequential = timed(lambda: [sign_group(group, PK) for group in batch])
+            in_process = timed(lambda: sign_groups(batch, PK, min_parallel=size + 1))
+            parallel = timed(lambda: sign_groups(batch, PK, executor, processes, min_parallel=0))
+
+            if crossover is None and parallel < in_process:
+                crossover = size
+            print("{:>8}{:>14.3f}{:>14.3f}{:>16.3f}{:>9.2f}x".format(size, sequential, in_process, parallel, sequential / parallel))
+
+    assert sign_groups(groups[:10], PK) == [sign_group(group, PK) for group in groups[:10]]
+    print("Crossover:", "{} groups".format(crossover) if crossover else "not reached")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from argparse import ArgumentParser
+from base64 import b64encode
+from statistics import median
+from subprocess import run
+from time import perf_counter, sleep
+import sys
+
+#Start-up cost of a StakingClient: import time of the module in a fresh interpreter, then construction
+#eager vs lazy against a stubbed indexer answering after --latency milliseconds, as a remote one would.
+#Run from the repository root with: python -m benchmarks.client_startup [--latency MS] [--pools N]
+
+APP_ID = 1000
+ASA_ID = 1001
+ADDRESS = "A" * 58
+ROUNDS = 5
+
+IMPORT_SCRIPT = '''
+from time import perf_counter
+import sys
+start = perf_counter()
+import {module}
+print((perf_counter() - start) * 1000, any(name.startswith("algosdk") for name in sys.modules))
+'''
+
+def key_value(key: str, value: str) -> dict:
+    return {"key": key, "value": {"type": 1, "bytes": value, "uint": 0}}
+
+class StubIndexer:
+    def __init__(self, pools: int, latency: float) -> None:
+        from staking_sdk.v1.codec import PoolRecord, encode_pool_id, encode_pool_record
+
+        self.latency = latency
+        self.reads = 0
+        info = b64encode(bytes(32) + pools.to_bytes(8, "big")).decode()
+        self.global_state = [key_value(b64encode(b"INFO").decode(), info)]
+        self.global_state += [key_value(encode_pool_id(1650000000 + n), encode_pool_record(PoolRecord(10**9, n, 10**9, 10**6, 10**12, 1650000000, 86400, ASA_ID)))
+                              for n in range(pools)]
+
+    def applications(self, app_id: int) -> dict:
+        self.reads += 1
+        sleep(self.latency)
+        return {"application": {"params": {"global-state": self.global_state}}}
+
+def measure_import(module: str) -> 'tuple[float, bool]':
+    '''Median milliseconds to import module in a new interpreter, and whether algosdk was loaded by it'''
+
+    results = []
+    for _ in range(ROUNDS):
+        output = run([sys.executable, "-c", IMPORT_SCRIPT.format(module=module)], capture_output=True, text=True, check=True).stdout.split()
+        results.append((float(output[0]), output[1] == "True"))
+    return median(result[0] for result in results), results[0][1]
+
+def measure_construction(pools: int, latency: float, lazy: bool) -> 'tuple[float, float, int]':
+    '''Median milliseconds to construct the client and to then read its pools, and the indexer reads of the construction'''
+
+    from staking_sdk.v1.staking_client import StakingClient
+
+    construction, first_use, reads = [], [], 0
+    for _ in range(ROUNDS):
+        indexer = StubIndexer(pools, latency)
+        start = perf_counter()
+        client = StakingClient(None, indexer, "testnet", ADDRESS, app_id=APP_ID, lazy=lazy)
+        constructed = perf_counter()
+        reads = indexer.reads
+        len(client.pools)
+        construction.append((constructed - start) * 1000)
+        first_use.append((perf_counter() - constructed) * 1000)
+    return median(construction), median(first_use), reads
+
+def main():
+    parser = ArgumentParser(description="Measures the import and construction times of StakingClient")
+    parser.add_argument("--latency", type=float, default=50, help="milliseconds of each stubbed indexer read")
+    parser.add_argument("--pools", type=int, default=63, help="pools in the stubbed global state")
+    args = parser.parse_args()
+
+    print("{:<40}{:>12}{:>10}".format("import (ms)", "median", "algosdk"))
+    for module in ("algosdk", "staking_sdk.v1.staking_client", "staking_sdk.v1.sharded_staking_client"):
+        milliseconds, algosdk = measure_import(module)
+        print("{:<40}{:>12.1f}{:>10}".format(module, milliseconds, "loaded" if algosdk else "-"))
+
+    from staking_sdk.utils import get_app_id, read_app_ids
+    start = perf_counter()
+    get_app_id("testnet")
+    first = perf_counter()
+    get_app_id("testnet")
+    print("\nget_app_id: first call {:.3f} ms, memoized {:.4f} ms".format((first - start) * 1000, (perf_counter() - first) * 1000))
+    read_app_ids.cache_clear()
+
+    print("\n{:<40}{:>12}{:>12}{:>8}".format("construction (ms, {} pools)".format(args.pools), "__init__", "1st pools", "reads"))
+    for lazy in (False, True):
+        construction, first_use, reads = measure_construction(args.pools, args.latency / 1000, lazy)
+        print("{:<40}{:>12.2f}{:>12.2f}{:>8}".format("lazy" if lazy else "eager", construction, first_use, reads))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,52 @@
+from staking_sdk.utils import bytes_to_int
+from staking_sdk.v1.codec import PoolRecord, UserSlot, encode_pool_id, encode_pool_record, encode_user_slot, decode_pool_id, unpack_pool_record, decode_user_slot
+from base64 import b64decode
+from timeit import timeit
+
+#Compares the slicing decoding used before the codec with the single pass struct decoding.
+#Run from the repository root with: python -m benchmarks.codec_decoding
+
+NUMBER = 100000
+
+KEY = encode_pool_id(1650000000)
+POOL_VALUE = encode_pool_record(PoolRecord(10**9, 42, 10**8, 10**7, 10**12, 1650000000, 86400, 31566704))
+SLOT_VALUE = encode_user_slot(UserSlot(1650000000, 10**6, 10**11, 31566704))
+
+def slicing_pool(key: str, value: str) -> tuple:
+    return (bytes_to_int(b64decode(key)),
+            bytes_to_int(b64decode(value)[:8]),
+            bytes_to_int(b64decode(value)[8:16]),
+            bytes_to_int(b64decode(value)[16:24]),
+            bytes_to_int(b64decode(value)[24:32]),
+            bytes_to_int(b64decode(value)[32:40]),
+            bytes_to_int(b64decode(value)[40:48]),
+            bytes_to_int(b64decode(value)[48:56]),
+            bytes_to_int(b64decode(value)[56:]))
+
+def codec_pool(key: str, value: str) -> tuple:
+    return (decode_pool_id(key),) + unpack_pool_record(value)
+
+def slicing_slot(value: str) -> dict:
+    return dict(POOL_ID = bytes_to_int(b64decode(value)[:8]),
+                user_staked = bytes_to_int(b64decode(value)[8:16]),
+                user_score = bytes_to_int(b64decode(value)[16:24]),
+                STAKING_ASA_ID = bytes_to_int(b64decode(value)[24:]))
+
+def codec_slot(value: str) -> UserSlot:
+    return decode_user_slot(value)
+
+def report(name: str, before, after) -> None:
+    before_time = timeit(before, number=NUMBER)
+    after_time = timeit(after, number=NUMBER)
+    print("{:<14}{:>12.0f}{:>12.0f}{:>9.1f}x".format(name, NUMBER / before_time, NUMBER / after_time, before_time / after_time))
+
+def main():
+    assert slicing_pool(KEY, POOL_VALUE) == codec_pool(KEY, POOL_VALUE)
+    assert slicing_slot(SLOT_VALUE) == codec_slot(SLOT_VALUE).json()
+
+    print("{:<14}{:>12}{:>12}{:>10}".format("ops/sec", "slicing", "codec", "speedup"))
+    report("pool record", lambda: slicing_pool(KEY, POOL_VALUE), lambda: codec_pool(KEY, POOL_VALUE))
+    report("user slot", lambda: slicing_slot(SLOT_VALUE), lambda: codec_slot(SLOT_VALUE))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from staking_sdk.utils import format_state, sign_group
+from staking_sdk.v1.staking_client import StakingClient
+from staking_sdk.v1.codec import PoolRecord, UserSlot, encode_pool_id, encode_pool_record, encode_user_slot
+from staking_sdk.v1.deposit import deposit
+from staking_sdk.v1.claim import claim
+from staking_sdk.v1.withdraw import withdraw
+from staking_sdk.v1.create_pool import create_pool
+from staking_sdk.v1.escrow_opt_in import escrow_opt_in
+from staking_sdk.v1.transaction_template import PoolTransactionTemplate
+from algosdk import account
+from algosdk.encoding import decode_address
+from algosdk.future.transaction import SuggestedParams, assign_group_id
+from argparse import ArgumentParser
+from base64 import b64encode
+from json import dump, load
+from os import path
+from time import perf_counter
+import tracemalloc
+
+#Offline benchmarks of the SDK hot paths, with stubbed algod and indexer clients.
+#Run from the repository root with: python -m benchmarks.hot_paths [--save]
+#--save writes the results as the baseline, the following runs are compared against it.
+
+BASELINE_PATH = path.join(path.dirname(path.abspath(__file__)), "hot_paths_baseline.json")
+POOLS = 64
+APP_ID = 1000
+ASA_ID = 1001
+
+PK, ADDRESS = account.generate_account()
+PARAMS = SuggestedParams(1000, 1000, 2000, b64encode(bytes(32)).decode(), "simnet-v1", True)
+
+def key_value(key: str, value: str) -> dict:
+    return {"key": key, "value": {"type": 1, "bytes": value, "uint": 0}}
+
+class StubAlgod:
+    def suggested_params(self) -> SuggestedParams:
+        return SuggestedParams(1000, 1000, 2000, b64encode(bytes(32)).decode(), "simnet-v1", False)
+
+class StubIndexer:
+    def __init__(self, pools: int) -> None:
+        '''Serves a global state of pools records and a full local state, changing one pool record for each global state read'''
+        self.reads = 0
+        self.records = {encode_pool_id(1650000000 + n): PoolRecord(10**9, n, 10**9, 10**6, 10**12, 1650000000, 86400, ASA_ID) for n in range(pools)}
+        self.info = b64encode(decode_address(ADDRESS) + len(self.records).to_bytes(8, "big")).decode()
+        self.local = [key_value(encode_pool_id(n), encode_user_slot(UserSlot(1650000000 + n, 10**6, 10**11, ASA_ID))) for n in range(1, 5)]
+
+    def applications(self, app_id: int) -> dict:
+        self.reads += 1
+        changed = list(self.records.values())[self.reads % len(self.records)]
+        changed.users_number += 1
+
+        global_state = [key_value(b64encode(b"INFO").decode(), self.info)]
+        global_state += [key_value(key, encode_pool_record(record)) for key, record in self.records.items()]
+        return {"application": {"params": {"global-state": global_state}}}
+
+    def account_info(self, address: str) -> dict:
+        return {"account": {"apps-local-state": [{"id": APP_ID, "key-value": self.local}]}}
+
+def measure(name: str, call, seconds: float = 0.5) -> dict:
+    '''Returns the ops/sec of call run for about seconds and the peak bytes allocated by one call'''
+
+    call()
+    number, start = 0, perf_counter()
+    while perf_counter() - start < seconds:
+        call()
+        number += 1
+    ops = number / (perf_counter() - start)
+
+    tracemalloc.start()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"name": name, "ops": ops, "peak_bytes": peak - current}
+
+def benchmarks() -> list:
+    indexer = StubIndexer(POOLS)
+    client = StakingClient(StubAlgod(), indexer, "testnet", ADDRESS, app_id=APP_ID)
+    pool_ids = client.pools.ids()
+    pool = client.get_pool_from_id(pool_ids[0])
+    key, value = encode_pool_id(pool.id), encode_pool_record(indexer.records[encode_pool_id(pool.id)])
+    global_state = indexer.applications(APP_ID)["application"]["params"]["global-state"]
+    group = assign_group_id(deposit(ADDRESS, PARAMS, 1000, ASA_ID, APP_ID, pool.id))
+    template = PoolTransactionTemplate(APP_ID, pool.id, ASA_ID)
+
+    return [
+        ("deposit", lambda: deposit(ADDRESS, PARAMS, 1000, ASA_ID, APP_ID, pool.id)),
+        ("claim", lambda: claim(ADDRESS, PARAMS, ASA_ID, APP_ID, pool.id)),
+        ("withdraw", lambda: withdraw(ADDRESS, PARAMS, ASA_ID, APP_ID, pool.id)),
+        ("create_pool", lambda: create_pool(ADDRESS, PARAMS, 10**9, 0, 86400, ASA_ID, APP_ID)),
+        ("deposit_template", lambda: template.deposit(ADDRESS, PARAMS, 1000)),
+        ("claim_template", lambda: template.claim(ADDRESS, PARAMS)),
+        ("withdraw_template", lambda: template.withdraw(ADDRESS, PARAMS)),
+        ("escrow_opt_in", lambda: escrow_opt_in(ADDRESS, PARAMS, ASA_ID, APP_ID)),
+        ("assign_group_id", lambda: assign_group_id(deposit(ADDRESS, PARAMS, 1000, ASA_ID, APP_ID, pool.id))),
+        ("sign_group", lambda: sign_group(group, PK)),
+        ("format_state", lambda: format_state(global_state)),
+        ("update_pool_state", lambda: pool.update_pool_state(key, value)),
+        ("get_formatted_local_state", lambda: client.get_formatted_local_state(ADDRESS)),
+        ("get_pool_from_id_{}".format(POOLS), lambda: [client.get_pool_from_id(pool_id) for pool_id in pool_ids]),
+        ("update_global_state", client.update_global_state),
+    ]
+
+def main():
+    parser = ArgumentParser(description="Benchmarks of the SDK hot paths")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file path")
+    parser.add_argument("--seconds", type=float, default=0.5, help="seconds to run each benchmark")
+    args = parser.parse_args()
+
+    baseline = {}
+    if path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            baseline = {result["name"]: result for result in load(file)}
+
+    results = []
+    print("{:<28}{:>14}{:>14}{:>12}".format("benchmark", "ops/sec", "peak bytes", "vs baseline"))
+    for name, call in benchmarks():
+        result = measure(name, call, args.seconds)
+        results.append(result)
+
+        delta = ""
+        if name in baseline:
+            delta = "{:+.1f}%".format((result["ops"] / baseline[name]["ops"] - 1) * 100)
+        print("{:<28}{:>14.0f}{:>14}{:>12}".format(name, result["ops"], result["peak_bytes"], delta))
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            dump(results, file, indent=4)
+        print("Baseline saved in", args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from staking_sdk.http_transport import HTTPTransport, PooledAlgodClient, PooledIndexerClient
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.indexer import IndexerClient
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from os import path
+from subprocess import run
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+import ssl
+
+#Compares the default algosdk clients (a new connection per request) with the pooled ones (staking_sdk.http_transport)
+#against a local keep-alive HTTP stand-in of algod and indexer, sequentially and from several threads.
+#Run from the repository root with: python -m benchmarks.http_transport [--tls] [--requests N] [--threads N]
+#--tls serves HTTPS with a self-signed certificate made by the openssl command, where the handshake of each new connection shows
+
+PARAMS = dumps({"fee": 0, "last-round": 1000, "genesis-hash": "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI=", "genesis-id": "testnet-v1.0",
+                "consensus-version": "future", "min-fee": 1000}).encode()
+APPLICATION = dumps({"application": {"id": 1000, "params": {"global-state": []}}}).encode()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True      #as the Go servers of algod and indexer, else each response waits for a delayed ACK
+
+    def do_GET(self) -> None:
+        body = PARAMS if self.path.startswith("/v2/transactions/params") else APPLICATION
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+def start_server(certificate_directory: str = None) -> 'tuple[ThreadingHTTPServer, str, ssl.SSLContext]':
+    '''Starts the stand-in on a free local port, with TLS if certificate_directory is given\n
+       Returns the server, its address and the client SSL context trusting its certificate'''
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    scheme, client_context = "http", None
+
+    if certificate_directory != None:
+        key, certificate = path.join(certificate_directory, "key.pem"), path.join(certificate_directory, "certificate.pem")
+        run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+             "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", key, "-out", certificate], capture_output=True, check=True)
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(certificate, key)
+        server.socket = server_context.wrap_socket(server.socket, server_side=True)
+        client_context = ssl.create_default_context(cafile=certificate)
+        scheme = "https"
+
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server, "{}://127.0.0.1:{}".format(scheme, server.server_address[1]), client_context
+
+def measure(clients: tuple, requests: int, threads: int) -> float:
+    '''Returns the requests per second of suggested_params and applications calls alternated over threads'''
+
+    algod_client, indexer_client = clients
+    calls = [algod_client.suggested_params if n % 2 == 0 else (lambda: indexer_client.applications(1000)) for n in range(requests)]
+
+    start = perf_counter()
+    if threads == 1:
+        for call in calls:
+            call()
+    else:
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(lambda call: call(), calls))
+    return requests / (perf_counter() - start)
+
+def main():
+    parser = ArgumentParser(description="Benchmarks the pooled HTTP transport against a local algod/indexer stand-in")
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS with a self-signed certificate (needs openssl)")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--max-connections", type=int, default=4, help="max_connections_per_host of the transport")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as directory:
+        server, address, client_context = start_server(directory if args.tls else None)
+        if client_context != None:
+            #the default clients open their connections with urllib, which reads the default HTTPS context on each one
+            ssl._create_default_https_context = lambda: client_context
+
+        transport = HTTPTransport(args.max_connections, ssl_context=client_context)
+        clients = {
+            "new connection per request": (AlgodClient("", address), IndexerClient("", address)),
+            "HTTPTransport": (PooledAlgodClient("", address, transport=transport), PooledIndexerClient("", address, transport=transport)),
+        }
+
+        print("{} stand-in, {} requests".format("HTTPS" if args.tls else "HTTP", args.requests))
+        print("{:<30}{:>16}{:>16}".format("requests/sec", "1 thread", "{} threads".format(args.threads)))
+        for name, pair in clients.items():
+            print("{:<30}{:>16.0f}{:>16.0f}".format(name, measure(pair, args.requests, 1), measure(pair, args.requests, args.threads)))
+
+        for host, stats in transport.stats().items():
+            print("\n{}: {}".format(host, stats))
+
+        transport.close()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
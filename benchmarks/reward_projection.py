@@ -0,0 +1,63 @@
+from staking_sdk.v1.staking_pool import StakingPool
+from staking_sdk.v1.reward_projection import RewardProjection, reference_claimable
+from staking_sdk.v1.codec import PoolRecord, encode_pool_id, encode_pool_record
+from random import Random
+from time import perf_counter
+
+#Projects the claimable amount of 100k stakers with RewardProjection and with the scalar reference, checking they match.
+#Run from the repository root with: python -m benchmarks.reward_projection
+
+POOLS = 64
+STAKERS = 100000
+
+def random_state(random: Random) -> tuple:
+    '''Pools lasting 30 days, deposits scored as in on_deposit (amount * remaining seconds), TSC is the sum of the pool USCs'''
+
+    time_delta = 30 * 86400
+    scores = {pool_id: 0 for pool_id in range(1, POOLS + 1)}
+
+    slots = []
+    for n in range(STAKERS):
+        pool_id = random.randint(1, POOLS)
+        amount = random.randint(10**3, 10**9)
+        user_score = amount * random.randint(1, time_delta)
+        scores[pool_id] += user_score
+        slots.append(("ADDRESS{}".format(n), dict(POOL_ID=pool_id if n % 100 else 0,
+                                                  user_staked=amount,
+                                                  user_score=user_score,
+                                                  STAKING_ASA_ID=7)))
+
+    pools = []
+    for pool_id, total_score in scores.items():
+        total_rewards = random.randint(10**6, 10**12)
+        record = PoolRecord(total_rewards, 0, random.randint(total_rewards // 2, total_rewards), 0, total_score, 0, time_delta, 7)
+        pools.append(StakingPool(None, None, encode_pool_id(pool_id), encode_pool_record(record)))
+
+    return pools, slots
+
+def main():
+    pools, slots = random_state(Random(0))
+
+    start = perf_counter()
+    projection = RewardProjection(pools, slots)
+    loaded = perf_counter()
+    claimable = projection.claimable()
+    projected = perf_counter()
+
+    by_id = {pool.id: pool for pool in pools}
+    expected = []
+    for _, state in slots:
+        pool = by_id.get(state["POOL_ID"])
+        pool_state = (pool.total_rewards, pool.to_be_claimed, pool.total_score) if pool else (0, 0, 0)
+        expected.append(reference_claimable(*pool_state, state["user_staked"], state["user_score"]))
+    scalar = perf_counter()
+
+    assert [int(amount) for amount in claimable] == expected
+    projection.verify()
+
+    print("load arrays      {:>8.1f} ms".format((loaded - start) * 1000))
+    print("vectorized       {:>8.1f} ms".format((projected - loaded) * 1000))
+    print("scalar reference {:>8.1f} ms".format((scalar - projected) * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from staking_sdk.utils import get_app_id
+from staking_sdk.state_backend import IndexerStateBackend, AlgodStateBackend
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.indexer import IndexerClient
+from algosdk.mnemonic import to_public_key
+from time import perf_counter
+from json import load
+
+#Compares the latency of the indexer and algod state backends on testnet.
+#Run from the repository root with: python -m benchmarks.state_backend_latency
+
+with open("./NEEDED.json", 'r') as file:
+    json = load(file)
+
+MNEMONIC_DEPOSITOR = json["DEPOSITOR"]
+ASA_ID = json["ASA_ID"]
+ROUNDS = 20
+
+def measure(call, rounds: int = ROUNDS) -> float:
+    '''Returns the mean latency of call in milliseconds'''
+    start = perf_counter()
+    for _ in range(rounds):
+        call()
+    return (perf_counter() - start) / rounds * 1000
+
+def main():
+    address = to_public_key(MNEMONIC_DEPOSITOR)
+    app_id = get_app_id("testnet")
+
+    backends = {
+        "indexer": IndexerStateBackend(IndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})),
+        "algod": AlgodStateBackend(AlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})),
+    }
+
+    print("{:<20}{:>12}{:>12}".format("call (ms)", *backends.keys()))
+    calls = {
+        "read_global_state": lambda backend: backend.read_global_state(app_id),
+        "read_local_state": lambda backend: backend.read_local_state(app_id, address),
+        "is_opted_in_app": lambda backend: backend.is_opted_in_app(address, app_id),
+        "is_opted_in_asset": lambda backend: backend.is_opted_in_asset(address, ASA_ID),
+    }
+    for name, call in calls.items():
+        print("{:<20}{:>12.1f}{:>12.1f}".format(name, *[measure(lambda: call(backend)) for backend in backends.values()]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from algosdk.v2client.algod import AlgodClient
+from importlib.metadata import version
+from inspect import getsourcefile
+from hashlib import sha256
+from base64 import b64decode
+from json import dumps, loads
+from os import makedirs, path, replace
+import staking_contract_pyteal
+
+#Local cache of the builds of the contract, used by deploy_contract.py:
+#   builds/<build key>.json     the TEAL hashes of a build, keyed by the hash of the build parameters and of the contract sources
+#   teal/<TEAL hash>.teal       the TEAL sources
+#   bytecode/<TEAL hash>.bin    the bytecode compiled by algod from the TEAL source of the same hash
+#A build hit reuses TEAL and bytecode without running PyTeal nor calling algod, a new TEAL with a known hash
+#(e.g. a comment changed in the PyTeal source) reuses its bytecode without calling algod
+
+CACHE_DIRECTORY = path.join(path.abspath(path.dirname(__file__)), ".teal_cache")
+
+def teal_hash(teal: str) -> str:
+    return sha256(teal.encode()).hexdigest()
+
+class Build:
+    def __init__(self, key: str, approval_teal: str, clear_teal: str, approval_bytecode: bytes, clear_bytecode: bytes) -> None:
+        self.key = key
+        self.approval_teal = approval_teal
+        self.clear_teal = clear_teal
+        self.approval_bytecode = approval_bytecode
+        self.clear_bytecode = clear_bytecode
+
+    def write_teal(self, approval_path: str = "approval_program.teal", clear_path: str = "clear_program.teal") -> None:
+        '''Writes the TEAL sources as convert_to_teal()'''
+        with open(approval_path, "w") as f:
+            f.write(self.approval_teal)
+        with open(clear_path, "w") as f:
+            f.write(self.clear_teal)
+
+class CompileCache:
+    def __init__(self, directory: str = CACHE_DIRECTORY) -> None:
+        self.directory = directory
+        self.hits = 0
+        self.compiled = 0
+
+    def file(self, folder: str, name: str) -> str:
+        return path.join(self.directory, folder, name)
+
+    def read(self, folder: str, name: str, mode: str = "r"):
+        file_path = self.file(folder, name)
+        if not path.exists(file_path):
+            return None
+        with open(file_path, mode) as f:
+            return f.read()
+
+    def write(self, folder: str, name: str, content, mode: str = "w") -> None:
+        '''Writes through a temporary file, so a build interrupted never leaves a partial artifact'''
+
+        makedirs(path.join(self.directory, folder), exist_ok=True)
+        file_path = self.file(folder, name)
+        with open(file_path + ".tmp", mode) as f:
+            f.write(content)
+        replace(file_path + ".tmp", file_path)
+
+    def build_parameters(self, contract, manager: str) -> dict:
+        '''Everything the TEAL depends on: the contract sources, the PyTeal version, MANAGER_ADDRESS, MAX_SECONDS_TO_CLAIM and the schema'''
+
+        sources = {}
+        for module in {staking_contract_pyteal, contract}:
+            with open(getsourcefile(module), "rb") as f:
+                sources[module.__name__] = sha256(f.read()).hexdigest()
+
+        return {"contract": contract.__name__,
+                "sources": sources,
+                "pyteal": version("pyteal"),
+                "manager": manager,
+                "max_seconds_to_claim": staking_contract_pyteal.MAX_SECONDS_TO_CLAIM,
+                "global_schema": [contract.MAX_GLOBAL_INTS, contract.MAX_GLOBAL_BYTES],
+                "local_schema": [contract.MAX_LOCAL_INTS, contract.MAX_LOCAL_BYTES]}
+
+    def build_key(self, contract, manager: str) -> str:
+        return sha256(dumps(self.build_parameters(contract, manager), sort_keys=True).encode()).hexdigest()
+
+    def bytecode(self, algod_client: AlgodClient, teal: str) -> bytes:
+        '''The bytecode of teal, compiled by algod only if its hash is not cached'''
+
+        name = teal_hash(teal)
+        if not path.exists(self.file("teal", name + ".teal")):
+            self.write("teal", name + ".teal", teal)
+
+        bytecode = self.read("bytecode", name + ".bin", "rb")
+        if bytecode is None:
+            bytecode = b64decode(algod_client.compile(teal)['result'])
+            self.compiled += 1
+            self.write("bytecode", name + ".bin", bytecode, "wb")
+        return bytecode
+
+    def lookup(self, key: str) -> 'Build | None':
+        '''The cached build of key, None if it or one of its artifacts is missing'''
+
+        manifest = self.read("builds", key + ".json")
+        if manifest is None:
+            return None
+        manifest = loads(manifest)
+
+        artifacts = []
+        for program in ("approval", "clear"):
+            teal = self.read("teal", manifest[program] + ".teal")
+            bytecode = self.read("bytecode", manifest[program] + ".bin", "rb")
+            if teal is None or bytecode is None or teal_hash(teal) != manifest[program]:
+                return None
+            artifacts += [teal, bytecode]
+        return Build(key, artifacts[0], artifacts[2], artifacts[1], artifacts[3])
+
+    def build(self, algod_client: AlgodClient, contract=staking_contract_pyteal, manager: str = None) -> Build:
+        '''Returns the TEAL and the bytecode of the contract module (staking_contract_pyteal or staking_contract_pool_keys_pyteal)
+           hardcoding manager (by default MANAGER_ADDRESS), from the cache when the same build was already done.\n
+           The same Build can deploy any number of applications'''
+
+        if manager is None:
+            manager = staking_contract_pyteal.MANAGER_ADDRESS
+        key = self.build_key(contract, manager)
+
+        build = self.lookup(key)
+        if build is not None:
+            self.hits += 1
+            return build
+
+        approval_teal = contract.approval_program(manager)
+        clear_teal = contract.clear_state_program()
+        build = Build(key, approval_teal, clear_teal, self.bytecode(algod_client, approval_teal), self.bytecode(algod_client, clear_teal))
+
+        self.write("builds", key + ".json", dumps({"approval": teal_hash(approval_teal), "clear": teal_hash(clear_teal),
+                                                   "parameters": self.build_parameters(contract, manager)}, indent=4))
+        return build
\ No newline at end of file
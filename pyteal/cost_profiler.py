@@ -0,0 +1,195 @@
+from staking_contract_pyteal import MAX_LOCAL_BYTES
+from argparse import ArgumentParser
+from importlib import import_module
+from json import dumps
+from typing import Dict, List, Set, Tuple
+
+#Static opcode cost of the TEAL generated by staking_contract_pyteal.py, for each entry point and subroutine.
+#Run from this folder with: python cost_profiler.py [--json costs.json] [--contract staking_contract_pool_keys_pyteal]
+#worst: every loop runs MAX_LOCAL_BYTES (of the contract module) times and every branch takes its most expensive side
+#typical: as worst but every loop runs at most once (a depositor with one staking slot)
+
+OPCODE_BUDGET = 700
+ZERO_ADDRESS = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+
+#Opcodes that do not cost 1 in TEAL v5
+OPCODE_COSTS = {"sha256": 35, "keccak256": 130, "sha512_256": 45, "ed25519verify": 1900, "ecdsa_verify": 1700,
+                "ecdsa_pk_decompress": 650, "ecdsa_pk_recover": 2000, "divmodw": 20}
+TERMINATORS = {"return", "err", "retsub"}
+ON_COMPLETION = {0: "noop", 1: "optin", 2: "closeout", 4: "update", 5: "delete"}
+
+class Block:
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.cost = 0
+        self.calls: List[str] = []
+        self.successors: List[str] = []
+        self.lines: List[List[str]] = []
+
+class Program:
+    def __init__(self, teal: str) -> None:
+        '''Control flow graph of a TEAL program: basic blocks split at labels and branches, callsub kept inside the block'''
+
+        self.blocks: Dict[str, Block] = {}
+        self.order: List[str] = []
+        self.subroutines: List[str] = []
+
+        block = self.new_block("main")
+        for line in teal.splitlines():
+            line = line.split("//")[0].strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.endswith(":"):
+                label = line[:-1]
+                if block.lines or block.label != "main":
+                    if not block.lines or block.lines[-1][0] not in TERMINATORS | {"b"}:
+                        block.successors.append(label)
+                block = self.new_block(label)
+                continue
+
+            fields = line.split()
+            block.lines.append(fields)
+            block.cost += OPCODE_COSTS.get(fields[0], 1)
+            if fields[0] == "callsub":
+                block.calls.append(fields[1])
+                if fields[1] not in self.subroutines:
+                    self.subroutines.append(fields[1])
+            elif fields[0] in ("b", "bz", "bnz"):
+                block.successors.append(fields[1])
+                if fields[0] != "b":
+                    fall_through = self.new_block("{}+{}".format(block.label, len(self.order)))
+                    block.successors.append(fall_through.label)
+                    block = fall_through
+        self.back_edges = self.find_back_edges()
+
+    def new_block(self, label: str) -> Block:
+        block = Block(label)
+        self.blocks[label] = block
+        self.order.append(label)
+        return block
+
+    def find_back_edges(self) -> Set[Tuple[str, str]]:
+        '''Edges to a block on the current depth first search path, i.e. the jumps closing a loop'''
+
+        back_edges, visited = set(), set()
+
+        def visit(label: str, path: Set[str]) -> None:
+            visited.add(label)
+            path.add(label)
+            for successor in self.blocks[label].successors:
+                if successor in path:
+                    back_edges.add((label, successor))
+                elif successor not in visited:
+                    visit(successor, path)
+            path.discard(label)
+
+        for root in ["main"] + self.subroutines:
+            if root not in visited:
+                visit(root, set())
+        return back_edges
+
+    def cost(self, label: str, loop_bound: int) -> int:
+        '''Most expensive path from label to a return, err or retsub, with each loop closed at most loop_bound times'''
+
+        subroutine_costs: Dict[str, int] = {}
+
+        def subroutine_cost(name: str) -> int:
+            if name not in subroutine_costs:
+                subroutine_costs[name] = self.cost(name, loop_bound)
+            return subroutine_costs[name]
+
+        path_costs: Dict[tuple, int] = {}
+
+        def longest(label: str, loops: Tuple[Tuple[Tuple[str, str], int], ...]) -> int:
+            key = (label, loops)
+            if key in path_costs:
+                return path_costs[key]
+
+            block = self.blocks[label]
+            cost = block.cost + sum(subroutine_cost(name) for name in block.calls)
+            best = 0
+            for successor in block.successors:
+                edge = (label, successor)
+                if edge in self.back_edges:
+                    taken = dict(loops).get(edge, 0)
+                    if taken >= loop_bound:
+                        continue
+                    best = max(best, longest(successor, tuple(sorted({**dict(loops), edge: taken + 1}.items()))))
+                else:
+                    best = max(best, longest(successor, loops))
+
+            path_costs[key] = cost + best
+            return cost + best
+
+        return longest(label, ())
+
+    def entry_points(self) -> List[Tuple[str, int, str]]:
+        '''Reads the Cond dispatch at the beginning of the program: returns (name, dispatch cost, handler label) for each branch.\n
+           A branch is named by its application argument (e.g. "DP") or by its on completion / creation check'''
+
+        entries, dispatch_cost, names = [], 0, []
+        label = "main"
+        constants = {}
+        while True:
+            block = self.blocks[label]
+            for fields in block.lines:
+                dispatch_cost += OPCODE_COSTS.get(fields[0], 1)
+                if fields[0] == "intcblock":
+                    constants.update({"intc_{}".format(n): int(value) for n, value in enumerate(fields[1:])})
+                elif fields[0] == "txn" and fields[1] == "ApplicationID":
+                    names.append("create")
+                elif fields[0] == "txn" and fields[1] == "OnCompletion":
+                    names.append("on_completion")
+                elif names and names[-1] == "on_completion" and (fields[0] in constants or fields[0] == "pushint"):
+                    value = constants[fields[0]] if fields[0] in constants else int(fields[1])
+                    names[-1] = ON_COMPLETION.get(value, str(value))
+                elif fields[0] == "pushbytes" and fields[1].startswith("0x"):
+                    names.append(bytes.fromhex(fields[1][2:]).decode(errors="replace"))
+
+            if block.lines and block.lines[-1][0] == "bnz":
+                entries.append((names[-1] if names else block.lines[-1][1], dispatch_cost, block.lines[-1][1]))
+                names = []
+                label = block.successors[-1]
+            else:
+                return entries
+
+def profile(approval_teal: str, clear_teal: str, loop_bound: int = MAX_LOCAL_BYTES) -> dict:
+    '''Returns {"entry_points": {name: {"worst", "typical"}}, "subroutines": {...}} with the opcode cost of each path of the programs'''
+
+    approval, clear = Program(approval_teal), Program(clear_teal)
+    result = {"budget": OPCODE_BUDGET, "loop_bound": loop_bound, "entry_points": {}, "subroutines": {}}
+
+    for name, dispatch_cost, label in approval.entry_points():
+        result["entry_points"][name] = {"worst": dispatch_cost + approval.cost(label, loop_bound),
+                                        "typical": dispatch_cost + approval.cost(label, 1)}
+    result["entry_points"]["clear"] = {"worst": clear.cost("main", loop_bound), "typical": clear.cost("main", 1)}
+
+    for prefix, program in (("", approval), ("clear:", clear)):
+        for name in program.subroutines:
+            result["subroutines"][prefix + name] = {"worst": program.cost(name, loop_bound), "typical": program.cost(name, 1)}
+    return result
+
+def table(result: dict) -> str:
+    rows = ["{:<24}{:>8}{:>10}{:>10}".format("", "worst", "typical", "budget")]
+    for section in ("entry_points", "subroutines"):
+        rows.append(section)
+        for name, costs in result[section].items():
+            rows.append("  {:<22}{:>8}{:>10}{:>9.0f}%".format(name, costs["worst"], costs["typical"], costs["worst"] * 100 / result["budget"]))
+    return "\n".join(rows)
+
+def main():
+    parser = ArgumentParser(description="Static opcode cost of the staking contract")
+    parser.add_argument("--json", help="also write the costs to this JSON file")
+    parser.add_argument("--contract", default="staking_contract_pyteal", help="module of the contract variant to profile")
+    args = parser.parse_args()
+
+    contract = import_module(args.contract)
+    result = profile(contract.approval_program(ZERO_ADDRESS), contract.clear_state_program(), contract.MAX_LOCAL_BYTES)
+    print(table(result))
+
+    if args.json:
+        with open(args.json, "w") as file:
+            file.write(dumps(result, indent=4))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
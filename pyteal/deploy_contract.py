@@ -1,9 +1,12 @@
 from algosdk.v2client.algod import AlgodClient
 from algosdk.mnemonic import to_private_key, to_public_key
 from algosdk.future.transaction import  ApplicationCreateTxn, OnComplete, wait_for_confirmation, StateSchema
-from staking_contract_pyteal import convert_to_teal, clear_state_program, approval_program, MAX_GLOBAL_BYTES, MAX_GLOBAL_INTS, MAX_LOCAL_BYTES, MAX_LOCAL_INTS
+import staking_contract_pyteal
+import staking_contract_pool_keys_pyteal
+from compile_cache import CompileCache, CACHE_DIRECTORY
+from argparse import ArgumentParser
 from base64 import b64decode
-from json import load
+from json import load, dumps
 
 with open("../NEEDED.json", 'r') as file:
     json = load(file)
@@ -37,24 +40,38 @@ def create_application(algod_client: AlgodClient, private_key, creator, approval
     return transaction_response['application-index']
 
 def main():
+    parser = ArgumentParser(description="Deploys the staking contract")
+    parser.add_argument("--pool-keys", action="store_true", help="deploy the variant with the pool ids as local keys (staking_contract_pool_keys_pyteal.py)")
+    parser.add_argument("--shards", type=int, default=1, help="number of identical applications to deploy, for staking_sdk.v1.sharded_staking_client")
+    parser.add_argument("--cache", default=CACHE_DIRECTORY, help="directory of the compile cache")
+    args = parser.parse_args()
+    contract = staking_contract_pool_keys_pyteal if args.pool_keys else staking_contract_pyteal
+
     creator = Account(MNEMONIC_CREATOR)
     algod_client = AlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
     
-    global_schema = state_schema(MAX_GLOBAL_INTS, MAX_GLOBAL_BYTES)
-    local_schema = state_schema(MAX_LOCAL_INTS, MAX_LOCAL_BYTES)
-    
-    convert_to_teal()
+    global_schema = state_schema(contract.MAX_GLOBAL_INTS, contract.MAX_GLOBAL_BYTES)
+    local_schema = state_schema(contract.MAX_LOCAL_INTS, contract.MAX_LOCAL_BYTES)
     
-    # compile approval program to binary
-    approval_program_compiled = compile_program(algod_client, approval_program())
-    # compile clear state program to binary
-    clear_state_program_compiled = compile_program(algod_client, clear_state_program())
+    # build the teal sources and compile them to binary, or reuse the cached ones
+    cache = CompileCache(args.cache)
+    build = cache.build(algod_client, contract)
+    build.write_teal()
+    approval_program_compiled = build.approval_bytecode
+    clear_state_program_compiled = build.clear_bytecode
+    print("build {} ({})".format(build.key[:12], "cached" if cache.hits else "{} programs compiled".format(cache.compiled)))
     
-    # create new application
-    app_id = create_application(algod_client, creator.pk, creator.address, approval_program_compiled, clear_state_program_compiled, global_schema, local_schema)
+    # create new applications
+    app_ids = []
+    for _ in range(args.shards):
+        app_id = create_application(algod_client, creator.pk, creator.address, approval_program_compiled, clear_state_program_compiled, global_schema, local_schema)
+        app_ids.append(app_id)
+
+        print("APPLICATION CREATED")
+        print("app id: {}".format(app_id))
 
-    print("APPLICATION CREATED")
-    print("app id: {}".format(app_id))
+    if args.shards > 1:
+        print("APP_IDS for app_ids.json: {}".format(dumps(app_ids)))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
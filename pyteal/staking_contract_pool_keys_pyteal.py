@@ -0,0 +1,291 @@
+from pyteal import *
+from staking_contract_pyteal import approval_program as slots_approval_program, hasGlobalKey, PoolRecord, MANAGER_ADDRESS, TX_FEE, MAX_GLOBAL_INTS, MAX_GLOBAL_BYTES
+from staking_contract_pyteal import rewards, relative_time, i, pool_id, TR, UN, TBC, TS, TSC, ST, TD, CID_G, UST, USC, CID_L
+
+#Variant of staking_contract_pyteal.py where the local key of a stake is the 8 bytes pool id itself (the POOL_ID application argument)
+#instead of a slot index Itob(1..MAX_LOCAL_BYTES): finding, adding and removing a stake is a single App.localGetEx/localPut/localDel
+#and no call loops over the slots. The local value has the same layout (POOL_ID | UST | USC | CID_L), so the SDK decodes both deployments alike.
+#The number of stakes is kept in the uint local key STAKES, checked by the close out, and capped to MAX_STAKES: the clear state
+#program removes every stake from its pool within its opcode budget.
+#Running this script will create the teal sources as staking_contract_pyteal.py, deploy with: python deploy_contract.py --pool-keys
+
+#DO NOT EDIT
+MAX_STAKES = 8          #Pool ids the clear state program can remove within the 700 opcodes budget (about 71 ops per id)
+MAX_LOCAL_INTS = 1
+MAX_LOCAL_BYTES = MAX_STAKES
+STAKES = Bytes("STAKES")
+
+previous_pool_id = ScratchVar(TealType.uint64, 6)
+
+def StakesNumber():
+    return App.localGet(Txn.sender(), STAKES)
+
+def approval_program(manager: str = MANAGER_ADDRESS):
+    handle_closeout = Seq([
+        Assert(And(
+            Global.group_size() == Int(1),
+            Txn.rekey_to() == Global.zero_address(),
+            StakesNumber() == Int(0)
+        )),
+
+        Approve()
+    ])
+
+    pool = PoolRecord(Txn.application_args[1])
+    slot = App.localGetEx(Txn.sender(), Global.current_application_id(), Txn.application_args[1])
+    on_deposit = Seq([
+        pool,
+
+        Assert(
+            And(
+                Txn.assets.length() == Int(1),
+                Txn.accounts.length() == Int(0),
+                Global.group_size() == Int(2),
+                Gtxn[0].type_enum() == TxnType.AssetTransfer,
+                Gtxn[0].asset_receiver() == Global.current_application_address(),
+                Gtxn[0].xfer_asset() == Txn.assets[0],
+                Gtxn[0].asset_amount() != Int(0),
+                Gtxn[0].rekey_to() == Global.zero_address(),
+                Gtxn[0].asset_close_to() == Global.zero_address(),
+                Gtxn[1].type_enum() == TxnType.ApplicationCall,
+                Gtxn[1].rekey_to() == Global.zero_address(),
+                Gtxn[0].sender() == Gtxn[1].sender(),
+                pool.hasValue(),                                                        #Pool Is created
+                Txn.assets[0] == CID_G(pool.value()),                                   #Is the right pool for the asset
+                Global.latest_timestamp() < ST(pool.value()) + TD(pool.value())         #Pool is not ended
+            )
+        ),
+
+        If(Global.latest_timestamp() <= ST(pool.value()))
+        .Then(
+            relative_time.store(
+                TD(pool.value())
+            )
+        )
+        .Else(
+            relative_time.store(
+                TD(pool.value()) + ST(pool.value()) - Global.latest_timestamp()
+            )
+        ),
+
+        slot,
+
+        If(slot.hasValue()) #if the depositor has alredy deposited, he has alredy been counted
+        .Then(
+            Seq([
+                App.localPut(
+                    Txn.sender(),
+                    Txn.application_args[1],
+                    Concat(
+                        Txn.application_args[1],                                                    #Pool_id
+                        Itob(UST(slot.value()) + Gtxn[0].asset_amount()),                           #UST(k-1) + UST(k)
+                        Itob(USC(slot.value()) + Mul(relative_time.load(),Gtxn[0].asset_amount())), #USC(k-1) + USC(k)
+                        Itob(Txn.assets[0])                                                         #CID_L
+                    )
+                ),
+
+                App.globalPut(
+                    Txn.application_args[1],
+                    Concat(
+                        Extract(pool.value(), Int(0), Int(24)),
+                        Itob(TS(pool.value()) + Gtxn[0].asset_amount()),                             #TS(k-1) + TS(k)
+                        Itob(TSC(pool.value()) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(k-1) + TSC(k)
+                        Extract(pool.value(), Int(40), Int(24)),
+                    )
+                )
+            ])
+        )
+        .Else(
+            Seq([
+                Assert(StakesNumber() < Int(MAX_STAKES)),
+
+                App.localPut(
+                    Txn.sender(),
+                    Txn.application_args[1],
+                    Concat(
+                        Txn.application_args[1],                                #Pool_id
+                        Itob(Gtxn[0].asset_amount()),                           #UST(k-1) + UST(k)
+                        Itob(Mul(relative_time.load(),Gtxn[0].asset_amount())), #USC(k-1) + USC(k)
+                        Itob(Txn.assets[0])                                     #CID_L
+                    )
+                ),
+
+                App.localPut(Txn.sender(), STAKES, StakesNumber() + Int(1)),
+
+                App.globalPut(
+                    Txn.application_args[1],
+                    Concat(
+                        Extract(pool.value(), Int(0), Int(8)),
+                        Itob(UN(pool.value()) + Int(1)),                                             #Increment the total users
+                        Extract(pool.value(), Int(16), Int(8)),
+                        Itob(TS(pool.value()) + Gtxn[0].asset_amount()),                             #TS(K-1) + TS(k)
+                        Itob(TSC(pool.value()) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(K-1) + TSC(k)
+                        Extract(pool.value(), Int(40), Int(24)),
+                    )
+                )
+            ])
+        ),
+
+        Approve()
+    ])
+
+    pool = PoolRecord(Txn.application_args[1])
+    slot = App.localGetEx(Txn.sender(), Global.current_application_id(), Txn.application_args[1])
+    on_claim = Seq([
+        pool,
+        slot,
+
+        Assert(
+            And(
+                Txn.assets.length() == Int(1),
+                Txn.accounts.length() == Int(0),
+                Global.group_size() == Int(1),
+                Txn.type_enum() == TxnType.ApplicationCall,
+                Txn.fee() == Int(2*TX_FEE),
+                Txn.rekey_to() == Global.zero_address(),
+                pool.hasValue(),                                                        #Pool is created
+                slot.hasValue(),                                                        #Address has deposited
+                Txn.assets[0] == CID_G(pool.value()),                                   #Is the right pool for the asset
+                Global.latest_timestamp() > ST(pool.value()) + TD(pool.value()),        #Check that the pool is ended
+            )
+        ),
+
+        rewards.store(
+            WideRatio(
+                [TR(pool.value()), USC(slot.value())],
+                [TSC(pool.value())]
+            )
+        ),
+
+        If(TBC(pool.value()) < rewards.load())
+        .Then(
+            rewards.store(
+                TBC(pool.value())
+            )
+        ),
+
+        InnerTxnBuilder.Begin(),
+        InnerTxnBuilder.SetFields(
+            {
+                TxnField.type_enum: TxnType.AssetTransfer,
+                TxnField.asset_amount: UST(slot.value()) + rewards.load(),
+                TxnField.fee: Int(0),
+                TxnField.xfer_asset: Txn.assets[0],
+                TxnField.asset_receiver: Txn.sender()
+            }
+        ),
+        InnerTxnBuilder.Submit(),
+
+        App.localDel(Txn.sender(), Txn.application_args[1]),
+        App.localPut(Txn.sender(), STAKES, StakesNumber() - Int(1)),
+
+        App.globalPut(
+            Txn.application_args[1],
+            Concat(
+                Extract(pool.value(), Int(0), Int(8)),
+                Itob(UN(pool.value()) - Int(1)),                                        #Decrement the total users
+                Itob(TBC(pool.value()) - rewards.load()),                               #Decrement the amount to be claimed
+                Extract(pool.value(), Int(24), Int(40)),
+            )
+        ),
+
+        Approve()
+    ])
+
+    slot = App.localGetEx(Txn.sender(), Global.current_application_id(), Txn.application_args[1])
+    on_withdrawal = Seq([
+        slot,
+
+        Assert(
+            And(
+                Txn.assets.length() == Int(1),
+                Txn.accounts.length() == Int(0),
+                Global.group_size() == Int(1),
+                Txn.type_enum() == TxnType.ApplicationCall,
+                Txn.fee() == Int(2*TX_FEE),
+                Txn.rekey_to() == Global.zero_address(),
+                Not(hasGlobalKey(Txn.application_args[1],Global.current_application_id())), #The pool has been deleted
+                slot.hasValue(),                                                            #But the address has deposited in that pool
+                Txn.assets[0] == CID_L(slot.value()),                                       #The user has a deposit active for that asa
+            )
+        ),
+
+        InnerTxnBuilder.Begin(),
+        InnerTxnBuilder.SetFields(
+            {
+                TxnField.type_enum: TxnType.AssetTransfer,
+                TxnField.asset_amount: UST(slot.value()),
+                TxnField.fee: Int(0),
+                TxnField.xfer_asset: Txn.assets[0],
+                TxnField.asset_receiver: Txn.sender()
+            }
+        ),
+        InnerTxnBuilder.Submit(),
+
+        App.localDel(Txn.sender(), Txn.application_args[1]),
+        App.localPut(Txn.sender(), STAKES, StakesNumber() - Int(1)),
+
+        Approve()
+    ])
+
+    return slots_approval_program(manager, {"closeout": handle_closeout, "DP": on_deposit, "CL": on_claim, "WD": on_withdrawal})
+
+def clear_state_program():
+    '''The program cannot list the local keys: the clear state call passes the pool ids of the stakes as application arguments
+       in ascending order (staking_sdk.v1.staking_app_clear_state does it), each one still staked is removed from its pool totals.
+       An account holds at most MAX_STAKES stakes, so all of them fit in the opcode budget'''
+
+    slot = App.localGetEx(Txn.sender(), Global.current_application_id(), pool_id.load())
+    pool = PoolRecord(pool_id.load())
+    program = Seq([
+            i.store(Int(0)),
+            previous_pool_id.store(Int(0)),
+
+            While(i.load() < Txn.application_args.length())
+            .Do(
+                Seq([
+                    pool_id.store(Txn.application_args[i.load()]),
+                    If(Btoi(pool_id.load()) > previous_pool_id.load())      #Ascending, so that a stake is removed once
+                    .Then(
+                        Seq([
+                            previous_pool_id.store(Btoi(pool_id.load())),
+                            slot,
+                            pool,
+                            If(And(slot.hasValue(), pool.hasValue()))
+                            .Then(
+                                App.globalPut(
+                                    pool_id.load(),
+                                    Concat(
+                                        Extract(pool.value(), Int(0), Int(8)),
+                                        Itob(UN(pool.value()) - Int(1)),                            #Decrement the total users
+                                        Extract(pool.value(), Int(16), Int(8)),
+                                        Itob(TS(pool.value()) - UST(slot.value())),                 #Decrement the Total staked
+                                        Itob(TSC(pool.value()) - USC(slot.value())),                #Decrement the Total score
+                                        Extract(pool.value(), Int(40), Int(24))
+                                    )
+                                )
+                            )
+                        ])
+                    ),
+                    i.store(i.load() + Int(1))
+                ])
+            ),
+
+            Approve()
+    ])
+    return compileTeal(program, Mode.Application, version=5, assembleConstants=True)
+
+
+
+def convert_to_teal():
+    with open("approval_program.teal", "w") as f:
+        approval_program_teal = approval_program()
+        f.write(approval_program_teal)
+
+    with open("clear_program.teal", "w") as f:
+        clear_state_program_teal = clear_state_program()
+        f.write(clear_state_program_teal)
+
+
+if __name__ == "__main__":
+    convert_to_teal()
\ No newline at end of file
@@ -38,18 +38,24 @@ def isOptedInAsset(addr, id):
 @Subroutine(TealType.none)
 def searchPoolId(pool_id, account):
     '''If the pool_id is not found in the depositor's local state saves in scratch variable 'i' the uint 0, 
-       if is found saves in scratch variable 'i' the uint of the index (from 1 to MAX_LOCAL_BYTES)'''
+       if is found saves in scratch variable 'i' the uint of the index (from 1 to MAX_LOCAL_BYTES) and in scratch variable 'slot_record' its value,
+       so that the handlers do not read the local key again'''
 
+    slot: MaybeValue = App.localGetEx(account, Global.current_application_id(), Itob(i.load()))
     return Seq([
         i.store(Int(1)),
         While(i.load() < Int(MAX_LOCAL_BYTES + 1))
         .Do(   
             Seq([
-                If(hasLocalKey(account, Itob(i.load())))
+                slot,
+                If(slot.hasValue())
                 .Then(
-                    If(Extract(App.localGet(account,Itob(i.load())),Int(0),Int(8)) == pool_id)
+                    If(Extract(slot.value(),Int(0),Int(8)) == pool_id)
                     .Then(
-                        Return()
+                        Seq([
+                            slot_record.store(slot.value()),
+                            Return()
+                        ])
                     )
                 ),
                 i.store(i.load() + Int(1))
@@ -110,41 +116,38 @@ def ExtractBytesFromGlobalKey(key, start, lenght):
                 lenght
             )
 
-def ExtractUint64FromLocalKey(account, key, start):
-    return ExtractUint64(
-                App.localGet(account, key),
-                start
-            )
-
-def ExtractBytesFromLocalKey(account, key, start, lenght):
-    return Extract(
-                App.localGet(account, key),
-                start,
-                lenght
-            )
-
 rewards = ScratchVar(TealType.uint64,0)
 relative_time = ScratchVar(TealType.uint64,1)
 i = ScratchVar(TealType.uint64, 2)
 pool_id = ScratchVar(TealType.bytes, 3)
 time_delta = ScratchVar(TealType.uint64, 4)
+slot_record = ScratchVar(TealType.bytes, 5)
 
 MG = ExtractBytesFromGlobalKey(Bytes("INFO"), Int(0), Int(32))
 POOL_NUM = ExtractUint64FromGlobalKey(Bytes("INFO"), Int(32))
-TR = lambda key: ExtractUint64FromGlobalKey(key,Int(0))
-UN = lambda key: ExtractUint64FromGlobalKey(key,Int(8))
-TBC = lambda key: ExtractUint64FromGlobalKey(key,Int(16))
-TS = lambda key: ExtractUint64FromGlobalKey(key,Int(24))
-TSC = lambda key: ExtractUint64FromGlobalKey(key,Int(32))
-ST = lambda key: ExtractUint64FromGlobalKey(key,Int(40))
-TD = lambda key: ExtractUint64FromGlobalKey(key,Int(48))
-CID_G = lambda key : ExtractUint64FromGlobalKey(key,Int(56))
-
-UST = lambda key: ExtractUint64FromLocalKey(Txn.sender(),key,Int(8))
-USC = lambda key: ExtractUint64FromLocalKey(Txn.sender(),key,Int(16))
-CID_L = lambda key: ExtractUint64FromLocalKey(Txn.sender(),key,Int(24))
-
-def approval_program(manager: str = MANAGER_ADDRESS):
+
+#The fields are extracted from a pool record or user slot read once per call (App.globalGetEx, App.localGetEx)
+#and kept in scratch, instead of reading again the global or local key for each field
+TR = lambda record: ExtractUint64(record,Int(0))
+UN = lambda record: ExtractUint64(record,Int(8))
+TBC = lambda record: ExtractUint64(record,Int(16))
+TS = lambda record: ExtractUint64(record,Int(24))
+TSC = lambda record: ExtractUint64(record,Int(32))
+ST = lambda record: ExtractUint64(record,Int(40))
+TD = lambda record: ExtractUint64(record,Int(48))
+CID_G = lambda record : ExtractUint64(record,Int(56))
+
+UST = lambda slot: ExtractUint64(slot,Int(8))
+USC = lambda slot: ExtractUint64(slot,Int(16))
+CID_L = lambda slot: ExtractUint64(slot,Int(24))
+
+def PoolRecord(key):
+    '''The pool record of key, read once: hasValue() is 1 if the pool exists and value() are its 64 bytes'''
+    return App.globalGetEx(Global.current_application_id(), key)
+
+def approval_program(manager: str = MANAGER_ADDRESS, overrides: dict = None):
+    '''overrides replaces the handlers of "closeout", "DP", "CL" and "WD" (see staking_contract_pool_keys_pyteal.py)'''
+
     on_creation = Seq([
         App.globalPut(Bytes("INFO"), Concat(Addr(manager),Itob(Int(0)))),
 
@@ -266,7 +269,10 @@ def approval_program(manager: str = MANAGER_ADDRESS):
     ])
     
 
+    pool = PoolRecord(Txn.application_args[1])
     on_deposit = Seq([
+        pool,
+
         Assert(
             And(
                 Txn.assets.length() == Int(1),
@@ -281,21 +287,21 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 Gtxn[1].type_enum() == TxnType.ApplicationCall,
                 Gtxn[1].rekey_to() == Global.zero_address(),
                 Gtxn[0].sender() == Gtxn[1].sender(),
-                hasGlobalKey(Txn.application_args[1],Global.current_application_id()),                  #Pool Is created
-                Txn.assets[0] == CID_G(Txn.application_args[1]),                                        #Is the right pool for the asset
-                Global.latest_timestamp() < ST(Txn.application_args[1]) + TD(Txn.application_args[1])   #Pool is not ended
+                pool.hasValue(),                                                        #Pool Is created
+                Txn.assets[0] == CID_G(pool.value()),                                   #Is the right pool for the asset
+                Global.latest_timestamp() < ST(pool.value()) + TD(pool.value())         #Pool is not ended
             )
         ),
 
-        If(Global.latest_timestamp() <= ST(Txn.application_args[1]))
+        If(Global.latest_timestamp() <= ST(pool.value()))
         .Then(
             relative_time.store(
-                TD(Txn.application_args[1])
+                TD(pool.value())
             )
         )
         .Else(
             relative_time.store(
-                TD(Txn.application_args[1]) + ST(Txn.application_args[1]) - Global.latest_timestamp()
+                TD(pool.value()) + ST(pool.value()) - Global.latest_timestamp()
             )
         ),
 
@@ -310,8 +316,8 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                     Itob(i.load()),
                     Concat(
                         Txn.application_args[1],                                                        #Pool_id
-                        Itob(UST(Itob(i.load())) + Gtxn[0].asset_amount()),                             #UST(k-1) + UST(k)
-                        Itob(USC(Itob(i.load())) + Mul(relative_time.load(),Gtxn[0].asset_amount())),   #USC(k-1) + USC(k)
+                        Itob(UST(slot_record.load()) + Gtxn[0].asset_amount()),                         #UST(k-1) + UST(k)
+                        Itob(USC(slot_record.load()) + Mul(relative_time.load(),Gtxn[0].asset_amount())),   #USC(k-1) + USC(k)
                         Itob(Txn.assets[0])                                                             #CID_L
                     )
                 ),
@@ -320,10 +326,10 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 App.globalPut(
                     Txn.application_args[1],
                     Concat(
-                        ExtractBytesFromGlobalKey(Txn.application_args[1], Int(0), Int(24)),
-                        Itob(TS(Txn.application_args[1]) + Gtxn[0].asset_amount()),                             #TS(k-1) + TS(k)
-                        Itob(TSC(Txn.application_args[1]) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(k-1) + TSC(k)
-                        ExtractBytesFromGlobalKey(Txn.application_args[1], Int(40), Int(24)),
+                        Extract(pool.value(), Int(0), Int(24)),
+                        Itob(TS(pool.value()) + Gtxn[0].asset_amount()),                             #TS(k-1) + TS(k)
+                        Itob(TSC(pool.value()) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(k-1) + TSC(k)
+                        Extract(pool.value(), Int(40), Int(24)),
                     )
                 )
             ])
@@ -351,12 +357,12 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 App.globalPut(
                     Txn.application_args[1],
                     Concat(
-                        ExtractBytesFromGlobalKey(Txn.application_args[1], Int(0), Int(8)),
-                        Itob(UN(Txn.application_args[1]) + Int(1)),                                             #Increment the total users
-                        ExtractBytesFromGlobalKey(Txn.application_args[1], Int(16), Int(8)),
-                        Itob(TS(Txn.application_args[1]) + Gtxn[0].asset_amount()),                             #TS(K-1) + TS(k)
-                        Itob(TSC(Txn.application_args[1]) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(K-1) + TSC(k)
-                        ExtractBytesFromGlobalKey(Txn.application_args[1], Int(40), Int(24)),
+                        Extract(pool.value(), Int(0), Int(8)),
+                        Itob(UN(pool.value()) + Int(1)),                                             #Increment the total users
+                        Extract(pool.value(), Int(16), Int(8)),
+                        Itob(TS(pool.value()) + Gtxn[0].asset_amount()),                             #TS(K-1) + TS(k)
+                        Itob(TSC(pool.value()) + Mul(relative_time.load(),Gtxn[0].asset_amount())),  #TSC(K-1) + TSC(k)
+                        Extract(pool.value(), Int(40), Int(24)),
                     )
                 )
             ])
@@ -365,7 +371,9 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         Approve()
     ])
 
+    pool = PoolRecord(Txn.application_args[1])
     on_claim = Seq([
+        pool,
         searchPoolId(Txn.application_args[1], Txn.sender()),
 
         Assert(
@@ -376,24 +384,24 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 Txn.type_enum() == TxnType.ApplicationCall,
                 Txn.fee() == Int(2*TX_FEE),
                 Txn.rekey_to() == Global.zero_address(),
-                hasGlobalKey(Txn.application_args[1], Global.current_application_id()),                  #Pool is created
-                i.load() != Int(0),                                                                     #Address has deposited
-                Txn.assets[0] == CID_G(Txn.application_args[1]),                                        #Is the right pool for the asset
-                Global.latest_timestamp() > ST(Txn.application_args[1]) + TD(Txn.application_args[1]),  #Check that the pool is ended
+                pool.hasValue(),                                                        #Pool is created
+                i.load() != Int(0),                                                     #Address has deposited
+                Txn.assets[0] == CID_G(pool.value()),                                   #Is the right pool for the asset
+                Global.latest_timestamp() > ST(pool.value()) + TD(pool.value()),        #Check that the pool is ended
             )
         ),
         
         rewards.store(
             WideRatio(
-                [TR(Txn.application_args[1]), USC(Itob(i.load()))],
-                [TSC(Txn.application_args[1])]
+                [TR(pool.value()), USC(slot_record.load())],
+                [TSC(pool.value())]
             )
         ),
 
-        If(TBC(Txn.application_args[1]) < rewards.load())
+        If(TBC(pool.value()) < rewards.load())
         .Then(
             rewards.store(
-                TBC(Txn.application_args[1])
+                TBC(pool.value())
             )
         ),
 
@@ -401,7 +409,7 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         InnerTxnBuilder.SetFields(
             {
                 TxnField.type_enum: TxnType.AssetTransfer,
-                TxnField.asset_amount: UST(Itob(i.load())) + rewards.load(),
+                TxnField.asset_amount: UST(slot_record.load()) + rewards.load(),
                 TxnField.fee: Int(0),
                 TxnField.xfer_asset: Txn.assets[0],
                 TxnField.asset_receiver: Txn.sender()
@@ -414,10 +422,10 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         App.globalPut(
             Txn.application_args[1],
             Concat(
-                ExtractBytesFromGlobalKey(Txn.application_args[1], Int(0), Int(8)),
-                Itob(UN(Txn.application_args[1]) - Int(1)),                             #Decrement the total users
-                Itob(TBC(Txn.application_args[1]) - rewards.load()),                    #Decrement the amount to be claimed
-                ExtractBytesFromGlobalKey(Txn.application_args[1], Int(24), Int(40)),
+                Extract(pool.value(), Int(0), Int(8)),
+                Itob(UN(pool.value()) - Int(1)),                                        #Decrement the total users
+                Itob(TBC(pool.value()) - rewards.load()),                               #Decrement the amount to be claimed
+                Extract(pool.value(), Int(24), Int(40)),
             )
         ),
 
@@ -437,7 +445,7 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 Txn.rekey_to() == Global.zero_address(),
                 Not(hasGlobalKey(Txn.application_args[1],Global.current_application_id())), #The pool has been deleted
                 i.load() != Int(0),                                                         #But the address has deposited in that pool
-                Txn.assets[0] == CID_L(Itob(i.load())),                                     #The user has a deposit active for that asa
+                Txn.assets[0] == CID_L(slot_record.load()),                                 #The user has a deposit active for that asa
             )
         ),
 
@@ -445,7 +453,7 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         InnerTxnBuilder.SetFields(
             {
                 TxnField.type_enum: TxnType.AssetTransfer,
-                TxnField.asset_amount: UST(Itob(i.load())),
+                TxnField.asset_amount: UST(slot_record.load()),
                 TxnField.fee: Int(0),
                 TxnField.xfer_asset: Txn.assets[0],
                 TxnField.asset_receiver: Txn.sender()
@@ -458,7 +466,10 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         Approve()
     ])
 
+    pool = PoolRecord(Txn.application_args[1])
     on_pool_delete = Seq([
+        pool,
+
         Assert(
             And(
                 Txn.assets.length() == Int(1),
@@ -468,12 +479,12 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 Txn.type_enum() == TxnType.ApplicationCall,
                 Txn.fee() == Int(2*TX_FEE),
                 Txn.rekey_to() == Global.zero_address(),
-                hasGlobalKey(Txn.application_args[1], Global.current_application_id()),                                                 #Check that the pool has been created
-                Txn.assets[0] == CID_G(Txn.application_args[1]),
-                Global.latest_timestamp() > ST(Txn.application_args[1]) + TD(Txn.application_args[1]),                                  #Check that the pool is ended
-                Or(                                                                                                                     #Verify that:
-                    UN(Txn.application_args[1]) == Int(0),                                                                              #Or there are no user that should claim
-                    Global.latest_timestamp() > ST(Txn.application_args[1]) + TD(Txn.application_args[1]) + Int(MAX_SECONDS_TO_CLAIM)   #Or that the max time to claim is passed 
+                pool.hasValue(),                                                                            #Check that the pool has been created
+                Txn.assets[0] == CID_G(pool.value()),
+                Global.latest_timestamp() > ST(pool.value()) + TD(pool.value()),                            #Check that the pool is ended
+                Or(                                                                                         #Verify that:
+                    UN(pool.value()) == Int(0),                                                             #Or there are no user that should claim
+                    Global.latest_timestamp() > ST(pool.value()) + TD(pool.value()) + Int(MAX_SECONDS_TO_CLAIM)   #Or that the max time to claim is passed 
                 )
             )
         ),
@@ -484,7 +495,7 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 TxnField.type_enum: TxnType.AssetTransfer,
                 TxnField.fee: Int(0),
                 TxnField.asset_receiver: Txn.sender(),
-                TxnField.asset_amount: TBC(Txn.application_args[1]),
+                TxnField.asset_amount: TBC(pool.value()),
                 TxnField.xfer_asset: Txn.assets[0],
             }
         ),
@@ -504,47 +515,50 @@ def approval_program(manager: str = MANAGER_ADDRESS):
         Approve()
     ])
 
+    handlers = {"closeout": handle_closeout, "DP": on_deposit, "CL": on_claim, "WD": on_withdrawal}
+    if overrides != None:
+        handlers.update(overrides)
+
+    #Creation is checked first so that a creation call is never routed to a handler, then the most frequent calls (DP, CL)
     program = Cond(
         [Txn.application_id() == Int(0), on_creation],
-        [Txn.on_completion() == OnComplete.OptIn, handle_optin],
-        [Txn.on_completion() == OnComplete.CloseOut, handle_closeout],
-        [Txn.on_completion() == OnComplete.UpdateApplication, handle_updateapp],
-        [Txn.on_completion() == OnComplete.DeleteApplication, handle_deleteapp],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
-                Txn.application_args.length() == Int(1),
-                Txn.application_args[0] == Bytes("OI")
+                Txn.application_args.length() == Int(2),
+                Txn.application_args[0] == Bytes("DP"),
             )
-        ), opt_in_asset],
+        ), handlers["DP"]],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
-                Txn.application_args.length() == Int(3),
-                Txn.application_args[0] == Bytes("CP")
+                Txn.application_args.length() == Int(2),
+                Txn.application_args[0] == Bytes("CL"),
             )
-        ), on_pool_create],
+        ), handlers["CL"]],
+        [Txn.on_completion() == OnComplete.OptIn, handle_optin],
+        [Txn.on_completion() == OnComplete.CloseOut, handlers["closeout"]],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
                 Txn.application_args.length() == Int(2),
-                Txn.application_args[0] == Bytes("DP"),
+                Txn.application_args[0] == Bytes("WD"),
             )
-        ), on_deposit],
+        ), handlers["WD"]],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
-                Txn.application_args.length() == Int(2),
-                Txn.application_args[0] == Bytes("CL"),
+                Txn.application_args.length() == Int(1),
+                Txn.application_args[0] == Bytes("OI")
             )
-        ), on_claim],
+        ), opt_in_asset],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
-                Txn.application_args.length() == Int(2),
-                Txn.application_args[0] == Bytes("WD"),
+                Txn.application_args.length() == Int(3),
+                Txn.application_args[0] == Bytes("CP")
             )
-        ), on_withdrawal],
+        ), on_pool_create],
         [And(
             Txn.on_completion() == OnComplete.NoOp,
             And(
@@ -552,31 +566,37 @@ def approval_program(manager: str = MANAGER_ADDRESS):
                 Txn.application_args[0] == Bytes("DL"),
             )
         ), on_pool_delete],
+        [Txn.on_completion() == OnComplete.UpdateApplication, handle_updateapp],
+        [Txn.on_completion() == OnComplete.DeleteApplication, handle_deleteapp],
     )
     return compileTeal(program, Mode.Application, version=5, assembleConstants=True)
 
 def clear_state_program():
+    slot = App.localGetEx(Txn.sender(), Global.current_application_id(), Itob(i.load()))
+    pool = PoolRecord(pool_id.load())
     program = Seq([
             i.store(Int(1)),
 
             While(i.load() < Int(MAX_LOCAL_BYTES + 1))
             .Do(
                 Seq([
-                    If(hasLocalKey(Txn.sender(), Itob(i.load())))
+                    slot,
+                    If(slot.hasValue())
                     .Then(
                         Seq([
-                            pool_id.store(ExtractBytesFromLocalKey(Txn.sender(), Itob(i.load()), Int(0), Int(8))),
-                            If(hasGlobalKey(pool_id.load(), Global.current_application_id()))
+                            pool_id.store(Extract(slot.value(), Int(0), Int(8))),
+                            pool,
+                            If(pool.hasValue())
                             .Then(
                                 App.globalPut(
                                     pool_id.load(),
                                     Concat(
-                                        ExtractBytesFromGlobalKey(pool_id.load(), Int(0), Int(8)),
-                                        Itob(UN(pool_id.load()) - Int(1)),                          #Decrement the total users
-                                        ExtractBytesFromGlobalKey(pool_id.load(), Int(16), Int(8)),
-                                        Itob(TS(pool_id.load()) - UST(Itob(i.load()))),             #Decrement the Total staked
-                                        Itob(TSC(pool_id.load()) - USC(Itob(i.load()))),            #Decrement the Total score
-                                        ExtractBytesFromGlobalKey(pool_id.load(), Int(40), Int(24))
+                                        Extract(pool.value(), Int(0), Int(8)),
+                                        Itob(UN(pool.value()) - Int(1)),                            #Decrement the total users
+                                        Extract(pool.value(), Int(16), Int(8)),
+                                        Itob(TS(pool.value()) - UST(slot.value())),                 #Decrement the Total staked
+                                        Itob(TSC(pool.value()) - USC(slot.value())),                #Decrement the Total score
+                                        Extract(pool.value(), Int(40), Int(24))
                                     )
                                 )
                             )
@@ -0,0 +1,208 @@
+from threading import Lock
+from time import monotonic
+from typing import Dict, List, Tuple
+from .state_backend import StateBackend
+from .params_cache import SECONDS_PER_ROUND
+from .utils import format_state
+
+class AccountSnapshot:
+    __slots__ = ("account", "round", "fetched_at")
+
+    def __init__(self, account: dict, round: int, fetched_at: float) -> None:
+        '''One full account read, answering all the opt in and local state queries of that address'''
+        self.account = account
+        self.round = round
+        self.fetched_at = fetched_at
+
+    def is_opted_in_app(self, app_id: int) -> bool:
+        return any(app['id'] == app_id for app in self.account.get('apps-local-state', []))
+
+    def is_opted_in_asset(self, asa_id: int) -> bool:
+        return any(asset['asset-id'] == asa_id for asset in self.account.get('assets', []))
+
+    def local_state(self, app_id: int) -> Dict[str, 'int | str']:
+        for local_state in self.account.get('apps-local-state', []):
+            if local_state['id'] == app_id:
+                return format_state(local_state.get('key-value', []))
+        return {}
+
+class LocalStateSnapshot:
+    __slots__ = ("state", "round", "fetched_at")
+
+    def __init__(self, state: Dict[str, 'int | str'], round: int, fetched_at: float) -> None:
+        '''Local state of one application known from a confirmed transaction state delta'''
+        self.state = state
+        self.round = round
+        self.fetched_at = fetched_at
+
+class OptInSnapshot:
+    __slots__ = ("opted_in", "round", "fetched_at")
+
+    def __init__(self, opted_in: bool, round: int, fetched_at: float) -> None:
+        '''One opt in query answered by the backend'''
+        self.opted_in = opted_in
+        self.round = round
+        self.fetched_at = fetched_at
+
+def apply_state_delta(state: Dict[str, 'int | str'], delta: List[dict]) -> Dict[str, 'int | str']:
+    '''Returns a copy of a formatted state with an algod EvalDelta applied (action 1 set bytes, 2 set uint, 3 delete)'''
+
+    state = dict(state)
+    for item in delta:
+        action = item['value']['action']
+        if action == 1:
+            state[item['key']] = item['value'].get('bytes', '')
+        elif action == 2:
+            state[item['key']] = item['value'].get('uint', 0)
+        else:
+            state.pop(item['key'], None)
+    return state
+
+class AccountSnapshotCache(StateBackend):
+    def __init__(self, backend: StateBackend, max_rounds: int = 2, max_seconds: float = None) -> None:
+        '''Caches the account reads in front of backend, the global state is always read from backend.\n
+           With a backend with cheap_account_reads (the indexer) one full account read per address answers all its queries,
+           otherwise (algod) each opt in and local state is read with the backend per account methods and cached on its own,
+           the full account is read only by read_account.\n
+           A snapshot or cached read expires after max_seconds or when the latest round seen (from snapshots and confirmations)
+           is more than max_rounds after the snapshot round (estimated as SECONDS_PER_ROUND each when no round is seen).\n
+           invalidate(address, round) drops the snapshot and the local states of an address and refuses to cache reads older than round,
+           so an indexer lagging behind a confirmed transaction is read again on the next query.\n
+           apply_local_delta keeps the local state written by a confirmed transaction, local state and app opt in queries
+           are then answered without reads until it expires as a snapshot'''
+
+        self.backend = backend
+        self.max_rounds = max_rounds
+        self.ttl = max_rounds * SECONDS_PER_ROUND
+        if max_seconds is not None:
+            self.ttl = min(self.ttl, max_seconds)
+
+        self.lock = Lock()
+        self.snapshots: Dict[str, AccountSnapshot] = {}
+        self.local_states: Dict[Tuple[str, int], LocalStateSnapshot] = {}
+        self.opt_ins: Dict[str, Dict[Tuple[int, bool], OptInSnapshot]] = {}
+        self.min_rounds: Dict[str, int] = {}
+        self.latest_round = 0
+
+    def is_fresh(self, snapshot: 'AccountSnapshot | LocalStateSnapshot | OptInSnapshot | None') -> bool:
+        return snapshot is not None and monotonic() - snapshot.fetched_at < self.ttl and snapshot.round + self.max_rounds >= self.latest_round
+
+    def snapshot(self, address: str) -> AccountSnapshot:
+        with self.lock:
+            snapshot = self.snapshots.get(address)
+            if self.is_fresh(snapshot):
+                return snapshot
+
+        account, round = self.backend.read_account(address)
+        snapshot = AccountSnapshot(account, round, monotonic())
+
+        with self.lock:
+            self.latest_round = max(self.latest_round, round)
+            if round >= self.min_rounds.get(address, 0):
+                self.snapshots[address] = snapshot
+                self.min_rounds.pop(address, None)
+        return snapshot
+
+    def observe_round(self, round: int) -> None:
+        '''Records a round known to be reached, expiring the snapshots more than max_rounds older'''
+        with self.lock:
+            self.latest_round = max(self.latest_round, round)
+
+    def invalidate(self, address: str, round: int = None) -> None:
+        '''Drops the snapshot of address, round is the round of a transaction that changed the account (e.g. its confirmed round).\n
+           The local states of address are dropped too, except the ones a delta of that transaction was applied to (at round)'''
+
+        with self.lock:
+            self.snapshots.pop(address, None)
+            self.opt_ins.pop(address, None)
+            for key, local_state in list(self.local_states.items()):
+                if key[0] == address and (round is None or local_state.round < round):
+                    del self.local_states[key]
+            if round is not None:
+                self.min_rounds[address] = max(self.min_rounds.get(address, 0), round)
+                self.latest_round = max(self.latest_round, round)
+
+    def apply_local_delta(self, address: str, app_id: int, delta: List[dict], round: int, opted_in: bool = False) -> None:
+        '''Applies the local-state-delta of address from a transaction confirmed in round, opted_in if the transaction is the app opt in.\n
+           The delta is applied to the local state known before the transaction, nothing is kept when it is not known'''
+
+        with self.lock:
+            local_state = self.local_states.get((address, app_id))
+            snapshot = self.snapshots.get(address)
+            if self.is_fresh(local_state) and local_state.round <= round:
+                base = local_state.state
+            elif opted_in:
+                base = {}
+            elif self.is_fresh(snapshot) and snapshot.round < round and snapshot.is_opted_in_app(app_id):
+                base = snapshot.local_state(app_id)
+            else:
+                return
+
+            self.local_states[(address, app_id)] = LocalStateSnapshot(apply_state_delta(base, delta), round, monotonic())
+            self.latest_round = max(self.latest_round, round)
+
+    def drop_local_state(self, address: str, app_id: int) -> None:
+        '''Drops the local state kept from deltas, e.g. after a close out'''
+        with self.lock:
+            self.local_states.pop((address, app_id), None)
+
+    def local_state(self, address: str, app_id: int) -> 'LocalStateSnapshot | None':
+        with self.lock:
+            local_state = self.local_states.get((address, app_id))
+            return local_state if self.is_fresh(local_state) else None
+
+    def opt_in(self, address: str, index: int, app: bool) -> bool:
+        '''Opt in of address to the application (app) or asset index, read with the backend per account method'''
+
+        with self.lock:
+            snapshot = self.opt_ins.get(address, {}).get((index, app))
+            if self.is_fresh(snapshot):
+                return snapshot.opted_in
+            round = self.latest_round
+
+        opted_in = self.backend.is_opted_in_app(address, index) if app else self.backend.is_opted_in_asset(address, index)
+        with self.lock:
+            self.opt_ins.setdefault(address, {})[(index, app)] = OptInSnapshot(opted_in, round, monotonic())
+        return opted_in
+
+    def clear(self) -> None:
+        with self.lock:
+            self.snapshots.clear()
+            self.local_states.clear()
+            self.opt_ins.clear()
+
+    def read_global_state(self, app_id: int) -> Dict[str, 'int | str']:
+        return self.backend.read_global_state(app_id)
+
+    def read_local_state(self, app_id: int, address: str) -> Dict[str, 'int | str']:
+        local_state = self.local_state(address, app_id)
+        if local_state is not None:
+            return dict(local_state.state)
+        if self.backend.cheap_account_reads:
+            return self.snapshot(address).local_state(app_id)
+        if not self.opt_in(address, app_id, True):
+            return {}
+
+        with self.lock:
+            round = self.latest_round
+        state = self.backend.read_local_state(app_id, address)
+        with self.lock:
+            if not self.is_fresh(self.local_states.get((address, app_id))):
+                self.local_states[(address, app_id)] = LocalStateSnapshot(state, round, monotonic())
+        return dict(state)
+
+    def is_opted_in_app(self, address: str, app_id: int) -> bool:
+        if self.local_state(address, app_id) is not None:
+            return True
+        if self.backend.cheap_account_reads:
+            return self.snapshot(address).is_opted_in_app(app_id)
+        return self.opt_in(address, app_id, True)
+
+    def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        if self.backend.cheap_account_reads:
+            return self.snapshot(address).is_opted_in_asset(asa_id)
+        return self.opt_in(address, asa_id, False)
+
+    def read_account(self, address: str) -> Tuple[dict, int]:
+        snapshot = self.snapshot(address)
+        return snapshot.account, snapshot.round
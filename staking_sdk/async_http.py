@@ -0,0 +1,126 @@
+from base64 import b64decode
+from json import loads
+from urllib.parse import quote
+from aiohttp import ClientSession, TCPConnector
+from algosdk import constants, encoding
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+from algosdk.future.transaction import SuggestedParams, Transaction
+
+class AsyncHTTPTransport:
+    def __init__(self, limit: int = 100, limit_per_host: int = 0) -> None:
+        '''Asyncio HTTP transport keeping the connections alive between requests.\n
+           One transport can be shared by several async clients, the aiohttp session is opened on the first request'''
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.session: ClientSession = None
+
+    async def request(self, method: str, url: str, headers: dict = None, params: dict = None, data: bytes = None) -> 'tuple[int, bytes]':
+        if self.session is None or self.session.closed:
+            self.session = ClientSession(connector=TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host))
+
+        async with self.session.request(method, url, headers=headers, params=params, data=data) as response:
+            return response.status, await response.read()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+class AsyncAlgodClient:
+    def __init__(self, algod_token: str, algod_address: str, headers: dict = None, transport: AsyncHTTPTransport = None) -> None:
+        '''Awaitable subset of the algod v2 endpoints used by the SDK, mirroring AlgodClient method names'''
+
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.headers = headers
+        self.transport = transport if transport is not None else AsyncHTTPTransport()
+
+    async def algod_request(self, method: str, requrl: str, params: dict = None, data: bytes = None, headers: dict = None, response_format: str = "json") -> 'dict | bytes':
+        header = {"User-Agent": "py-algorand-sdk", constants.algod_auth_header: self.algod_token}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+
+        status, body = await self.transport.request(method, self.algod_address + "/v2" + requrl, header, params, data)
+        if status != 200:
+            try:
+                message = loads(body)["message"]
+            except Exception:
+                message = body.decode(errors="replace")
+            raise AlgodHTTPError(message, status)
+        if response_format == "msgpack":
+            return body
+        return loads(body)
+
+    async def suggested_params(self) -> SuggestedParams:
+        res = await self.algod_request("GET", "/transactions/params")
+        return SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"])
+
+    async def send_transactions(self, txns: list) -> str:
+        '''Returns the first transaction id'''
+        for txn in txns:
+            assert not isinstance(txn, Transaction), "Attempt to send UNSIGNED transaction {}".format(txn)
+        data = b"".join(b64decode(encoding.msgpack_encode(txn)) for txn in txns)
+        res = await self.algod_request("POST", "/transactions", data=data, headers={"Content-Type": "application/x-binary"})
+        return res["txId"]
+
+    async def send_transaction(self, txn) -> str:
+        return await self.send_transactions([txn])
+
+    async def pending_transaction_info(self, txid: str) -> dict:
+        return await self.algod_request("GET", "/transactions/pending/" + txid)
+
+    async def status(self) -> dict:
+        return await self.algod_request("GET", "/status")
+
+    async def status_after_block(self, round_num: int) -> dict:
+        return await self.algod_request("GET", "/status/wait-for-block-after/{}".format(round_num))
+
+    async def block_info(self, round_num: int, response_format: str = "msgpack") -> 'dict | bytes':
+        '''Returns the raw block with response_format msgpack (as the SDK reads the blocks), the decoded one with json'''
+        return await self.algod_request("GET", "/blocks/{}".format(round_num), params={"format": response_format}, response_format=response_format)
+
+    async def application_info(self, app_id: int) -> dict:
+        return await self.algod_request("GET", "/applications/{}".format(app_id))
+
+    async def account_info(self, address: str) -> dict:
+        return await self.algod_request("GET", "/accounts/{}".format(quote(address)))
+
+class AsyncIndexerClient:
+    def __init__(self, indexer_token: str, indexer_address: str, headers: dict = None, transport: AsyncHTTPTransport = None) -> None:
+        '''Awaitable subset of the indexer v2 endpoints used by the SDK, mirroring IndexerClient method names'''
+
+        self.indexer_token = indexer_token
+        self.indexer_address = indexer_address
+        self.headers = headers
+        self.transport = transport if transport is not None else AsyncHTTPTransport()
+
+    async def indexer_request(self, method: str, requrl: str, params: dict = None) -> dict:
+        header = {"User-Agent": "py-algorand-sdk", constants.indexer_auth_header: self.indexer_token}
+        if self.headers:
+            header.update(self.headers)
+
+        status, body = await self.transport.request(method, self.indexer_address + "/v2" + requrl, header, params)
+        if status != 200:
+            try:
+                message = loads(body)["message"]
+            except Exception:
+                message = body.decode(errors="replace")
+            raise IndexerHTTPError(message)
+        return loads(body)
+
+    async def applications(self, app_id: int) -> dict:
+        return await self.indexer_request("GET", "/applications/{}".format(app_id))
+
+    async def account_info(self, address: str) -> dict:
+        return await self.indexer_request("GET", "/accounts/{}".format(quote(address)))
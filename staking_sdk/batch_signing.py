@@ -0,0 +1,53 @@
+from base64 import b64encode
+from concurrent.futures import Executor, ProcessPoolExecutor
+from os import cpu_count
+from typing import List
+from algosdk import account
+from algosdk.future.transaction import SignedTransaction, Transaction
+
+#Below this number of groups the process pool start up and the pickling cost more than the signing, see benchmarks/batch_signing.py
+MIN_PARALLEL_GROUPS = 2000
+CHUNKS_PER_PROCESS = 4
+
+def sign_signatures(groups: List[List[Transaction]], pk: str) -> List[List[str]]:
+    '''Returns the base64 signatures of every transaction of the groups, in the same order'''
+    return [[b64encode(txn.raw_sign(pk)).decode() for txn in group] for group in groups]
+
+def attach_signatures(groups: List[List[Transaction]], signatures: List[List[str]], signer: str) -> List[List[SignedTransaction]]:
+    '''Builds the signed transactions as Transaction.sign does, rekeyed senders get signer as authorizing address'''
+    return [[SignedTransaction(txn, signature, None if txn.sender == signer else signer) for txn, signature in zip(group, group_signatures)]
+            for group, group_signatures in zip(groups, signatures)]
+
+def sign_groups_in_process(groups: List[List[Transaction]], pk: str) -> List[List[SignedTransaction]]:
+    '''Signs the groups on the current process, the result is the same as calling sign_group on each group'''
+    return attach_signatures(groups, sign_signatures(groups, pk), account.address_from_private_key(pk))
+
+def sign_groups(groups: List[List[Transaction]], pk: str, executor: Executor = None, processes: int = None, min_parallel: int = MIN_PARALLEL_GROUPS) -> List[List[SignedTransaction]]:
+    '''Signs many transaction groups (e.g. built with assign_group_id) with the same private key, keeping the order of the input.\n
+       Batches of at least min_parallel groups are split in processes * CHUNKS_PER_PROCESS chunks and signed on a process pool:
+       pass an executor (e.g. a ProcessPoolExecutor) to reuse it between batches, with its number of workers as processes,
+       otherwise one with processes workers is started and shut down for this batch. processes defaults to the number of CPUs.\n
+       The workers only send back the signatures, the signed transactions are built on the calling process.\n
+       Smaller batches, or a single CPU, are signed in process'''
+
+    groups = [list(group) for group in groups]
+    if processes is None:
+        processes = cpu_count() or 1
+    if len(groups) < min_parallel or processes < 2:
+        return sign_groups_in_process(groups, pk)
+
+    chunk_size = -(-len(groups) // (processes * CHUNKS_PER_PROCESS))
+    chunks = [groups[start:start + chunk_size] for start in range(0, len(groups), chunk_size)]
+
+    owned = executor is None
+    if owned:
+        executor = ProcessPoolExecutor(processes)
+    try:
+        signatures = []
+        for chunk_signatures in executor.map(sign_signatures, chunks, [pk] * len(chunks)):
+            signatures.extend(chunk_signatures)
+    finally:
+        if owned:
+            executor.shutdown()
+
+    return attach_signatures(groups, signatures, account.address_from_private_key(pk))
@@ -0,0 +1,257 @@
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from json import loads
+from select import select
+from ssl import SSLContext, create_default_context
+from threading import Condition
+from time import monotonic
+from typing import Dict, List, Tuple, TypedDict
+from urllib.parse import urlencode, urlsplit
+from algosdk import constants
+from algosdk.error import AlgodHTTPError, AlgodResponseError, IndexerHTTPError
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+from algosdk.v2client.indexer import IndexerClient
+
+#Methods sent again when a reused connection fails after the request was written: the server may have handled it
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+class HostPoolStats(TypedDict):
+    max_connections: int
+    open: int           #connections idle + in use
+    idle: int
+    in_use: int
+    opened: int         #connections created since the start
+    reused: int         #requests sent on an already open connection
+    requests: int
+    waits: int          #requests that waited for a connection because the pool was full
+    retries: int        #requests sent again because a reused connection had been closed by the server
+    dropped: int        #idle connections found closed by the server before being reused
+
+class HostPool:
+    def __init__(self, scheme: str, host: str, port: int) -> None:
+        '''The connections to one scheme://host:port, the idle ones with the time they were released'''
+
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.idle: List[Tuple[HTTPConnection, float]] = []
+        self.open = 0
+        self.opened = 0
+        self.reused = 0
+        self.requests = 0
+        self.waits = 0
+        self.retries = 0
+        self.dropped = 0
+
+class HTTPTransport:
+    def __init__(self, max_connections_per_host: int = 10, timeout: float = 30, idle_timeout: float = 30, ssl_context: SSLContext = None) -> None:
+        '''Blocking HTTP transport keeping up to max_connections_per_host persistent connections per host, so the TCP and TLS
+           handshakes are paid once per connection instead of once per request.\n
+           It is thread safe: a request takes an idle connection of its host, opens a new one if the pool is not full,
+           or waits for one to be released. One transport can be shared by any number of clients and threads.\n
+           Connections idle for more than idle_timeout seconds, or already closed by the server, are not reused.
+           A request failing on a reused connection is sent again once on a new one if it failed before being written,
+           or if its method is idempotent: a POST (e.g. of transactions) the server may have handled is never sent twice.\n
+           ssl_context (by default the system CAs) is shared by all the HTTPS connections'''
+
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context if ssl_context is not None else create_default_context()
+        self.condition = Condition()
+        self.pools: Dict[Tuple[str, str, int], HostPool] = {}
+        self.closed = False
+
+    def host_pool(self, url: str) -> HostPool:
+        parts = urlsplit(url)
+        port = parts.port if parts.port != None else (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+
+        with self.condition:
+            if key not in self.pools:
+                self.pools[key] = HostPool(*key)
+            return self.pools[key]
+
+    def new_connection(self, pool: HostPool) -> HTTPConnection:
+        if pool.scheme == "https":
+            return HTTPSConnection(pool.host, pool.port, timeout=self.timeout, context=self.ssl_context)
+        return HTTPConnection(pool.host, pool.port, timeout=self.timeout)
+
+    def acquire(self, pool: HostPool) -> Tuple[HTTPConnection, bool]:
+        '''Returns a connection of pool and whether it was already open, waiting if max_connections_per_host are in use'''
+
+        with self.condition:
+            if self.closed:
+                raise Exception("HTTPTransport closed")
+            waited = False
+            while True:
+                while pool.idle:
+                    connection, released = pool.idle.pop()
+                    if monotonic() - released < self.idle_timeout:
+                        if not self.is_dropped(connection):
+                            pool.reused += 1
+                            return connection, True
+                        pool.dropped += 1
+                    connection.close()
+                    pool.open -= 1
+
+                if pool.open < self.max_connections_per_host:
+                    pool.open += 1
+                    pool.opened += 1
+                    return self.new_connection(pool), False
+
+                if not waited:
+                    pool.waits += 1
+                    waited = True
+                self.condition.wait()
+
+    def is_dropped(self, connection: HTTPConnection) -> bool:
+        '''An idle keep-alive connection is readable only if the server closed it (or sent unexpected data)'''
+
+        if connection.sock is None:
+            return True
+        try:
+            return bool(select([connection.sock], [], [], 0)[0])
+        except (OSError, ValueError):
+            return True
+
+    def release(self, pool: HostPool, connection: HTTPConnection, reusable: bool) -> None:
+        with self.condition:
+            if reusable and not self.closed:
+                pool.idle.append((connection, monotonic()))
+            else:
+                connection.close()
+                pool.open -= 1
+            self.condition.notify()
+
+    def request(self, method: str, url: str, headers: dict = None, data: bytes = None) -> 'tuple[int, bytes]':
+        '''Sends the request on a pooled connection\n
+           Returns the status code and the body of the response'''
+
+        pool = self.host_pool(url)
+        parts = urlsplit(url)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+
+        with self.condition:
+            pool.requests += 1
+
+        for attempt in range(2):
+            connection, reused = self.acquire(pool)
+            written = False
+            try:
+                connection.request(method, path, body=data, headers=headers if headers != None else {})
+                written = True
+                response = connection.getresponse()
+                body = response.read()
+            except (ConnectionError, HTTPException):
+                self.release(pool, connection, False)
+                if reused and attempt == 0 and (not written or method.upper() in IDEMPOTENT_METHODS):
+                    with self.condition:
+                        pool.retries += 1
+                    continue
+                raise
+            except BaseException:
+                self.release(pool, connection, False)
+                raise
+
+            self.release(pool, connection, not response.will_close)
+            return response.status, body
+
+    def stats(self) -> Dict[str, HostPoolStats]:
+        '''The pool statistics by scheme://host:port'''
+
+        with self.condition:
+            return {"{}://{}:{}".format(*key): HostPoolStats(max_connections=self.max_connections_per_host,
+                                                             open=pool.open,
+                                                             idle=len(pool.idle),
+                                                             in_use=pool.open - len(pool.idle),
+                                                             opened=pool.opened,
+                                                             reused=pool.reused,
+                                                             requests=pool.requests,
+                                                             waits=pool.waits,
+                                                             retries=pool.retries,
+                                                             dropped=pool.dropped)
+                    for key, pool in self.pools.items()}
+
+    def close(self) -> None:
+        '''Closes the idle connections, the ones in use are closed when released'''
+
+        with self.condition:
+            self.closed = True
+            for pool in self.pools.values():
+                for connection, _ in pool.idle:
+                    connection.close()
+                pool.open -= len(pool.idle)
+                pool.idle = []
+            self.condition.notify_all()
+
+def error_message(body: bytes) -> str:
+    try:
+        return loads(body)["message"]
+    except Exception:
+        return body.decode(errors="replace")
+
+class PooledAlgodClient(AlgodClient):
+    def __init__(self, algod_token: str, algod_address: str, headers: dict = None, transport: HTTPTransport = None) -> None:
+        '''AlgodClient sending its requests through transport (by default a new HTTPTransport) instead of a new connection each'''
+
+        super().__init__(algod_token, algod_address, headers)
+        self.transport = transport if transport is not None else HTTPTransport()
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        '''Same request and errors as AlgodClient.algod_request'''
+
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+
+        status, body = self.transport.request(method, self.algod_address + requrl, header, data)
+        if not 200 <= status < 300:
+            raise AlgodHTTPError(error_message(body), status)
+
+        if response_format == "json":
+            try:
+                return loads(body)
+            except Exception as e:
+                raise AlgodResponseError("Failed to parse JSON response from algod") from e
+        return body
+
+class PooledIndexerClient(IndexerClient):
+    def __init__(self, indexer_token: str, indexer_address: str, headers: dict = None, transport: HTTPTransport = None) -> None:
+        '''IndexerClient sending its requests through transport (by default a new HTTPTransport) instead of a new connection each'''
+
+        super().__init__(indexer_token, indexer_address, headers)
+        self.transport = transport if transport is not None else HTTPTransport()
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None):
+        '''Same request, errors and key ordering as IndexerClient.indexer_request'''
+
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth and self.indexer_token:
+            header.update({constants.indexer_auth_header: self.indexer_token})
+
+        if requrl not in constants.unversioned_paths:
+            requrl = api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + urlencode(params)
+
+        status, body = self.transport.request(method, self.indexer_address + requrl, header, data)
+        if not 200 <= status < 300:
+            raise IndexerHTTPError(error_message(body))
+
+        def recursively_sort_dict(dictionary):
+            return {k: recursively_sort_dict(v) if isinstance(v, dict) else v for k, v in sorted(dictionary.items())}
+
+        return recursively_sort_dict(loads(body))
\ No newline at end of file
@@ -0,0 +1,82 @@
+from copy import copy
+from threading import Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING
+from .utils import get_suggested_params
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+    from algosdk.future.transaction import SuggestedParams
+
+SECONDS_PER_ROUND = 4.5
+
+class SuggestedParamsCache:
+    def __init__(self, algod_client: 'AlgodClient', max_rounds: int = 10, max_seconds: float = None, refresh_margin: float = 0.2) -> None:
+        '''Caches the suggested params (flat fee of 1000) to share them between all the transaction builders.\n
+           The params expire once a round max_rounds after their first valid round is observed: observe_round is called
+           with the rounds the SDK reads (confirmed rounds, block follower rounds). When no round is observed they expire
+           after max_seconds, by default max_rounds * SECONDS_PER_ROUND seconds.\n
+           When the params are requested in the last refresh_margin fraction of their lifetime the cached ones are returned
+           and a refresh is started in background, so the callers wait for algod only when the params are expired\n
+           The copies are identical: identical transactions built from them get the same txid, set a unique_note() on them'''
+
+        self.algod_client = algod_client
+        self.max_rounds = max_rounds
+        self.refresh_rounds = max_rounds * (1 - refresh_margin)
+        self.ttl = max_seconds if max_seconds is not None else max_rounds * SECONDS_PER_ROUND
+        self.refresh_after = self.ttl * (1 - refresh_margin)
+
+        self.lock = Lock()
+        self.params: 'SuggestedParams' = None
+        self.fetched_at = 0.0
+        self.latest_round = 0
+        self.refreshing = False
+
+    def get(self) -> 'SuggestedParams':
+        '''Returns a copy of the cached params, so they can be modified (e.g. fee = 2000) without changing the shared ones'''
+
+        with self.lock:
+            params, age = self.params, monotonic() - self.fetched_at
+            rounds = self.latest_round - params.first if params is not None else 0
+
+        if params is None or rounds >= self.max_rounds or age >= self.ttl:
+            params = self.refresh()
+        elif rounds >= self.refresh_rounds or age >= self.refresh_after:
+            self.refresh_in_background()
+
+        return copy(params)
+
+    def observe_round(self, round: int) -> None:
+        '''Records a round known to be reached, the params expire max_rounds after their first valid round'''
+        with self.lock:
+            self.latest_round = max(self.latest_round, round)
+
+    def refresh(self) -> 'SuggestedParams':
+        '''Fetches the params from algod and caches them'''
+
+        params = get_suggested_params(self.algod_client)
+        with self.lock:
+            self.params, self.fetched_at = params, monotonic()
+            self.latest_round = max(self.latest_round, params.first)
+        return params
+
+    def refresh_in_background(self) -> None:
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+
+        Thread(target=self.background_refresh, daemon=True).start()
+
+    def background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            pass #The params will be fetched again by get() once expired
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.params = None
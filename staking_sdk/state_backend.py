@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple, TYPE_CHECKING
+from .utils import format_state, read_global_state, read_local_state, is_opted_in_app, is_opted_in_asset
+
+if TYPE_CHECKING:
+    from algosdk.v2client.indexer import IndexerClient
+    from algosdk.v2client.algod import AlgodClient
+
+class StateBackend(ABC):
+    '''Interface used by the StakingClient to read the application global state and the accounts local state and opt ins.\n
+       A backend not implementing all the abstract methods cannot be instantiated.\n
+       The StakingClient reports its confirmed transactions with observe_round, invalidate, apply_local_delta and drop_local_state,
+       which do nothing unless the backend caches its reads (see account_cache.AccountSnapshotCache)'''
+
+    #Whether read_account costs one request as any other read, so one full account read can answer all the queries of an address
+    cheap_account_reads = False
+
+    @abstractmethod
+    def read_global_state(self, app_id: int) -> Dict[str, 'int | str']:
+        pass
+
+    @abstractmethod
+    def read_local_state(self, app_id: int, address: str) -> Dict[str, 'int | str']:
+        pass
+
+    @abstractmethod
+    def is_opted_in_app(self, address: str, app_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    def read_account(self, address: str) -> Tuple[dict, int]:
+        '''Returns the full account (assets, apps-local-state, ...) and the round it was read at'''
+
+    def observe_round(self, round: int) -> None:
+        pass
+
+    def invalidate(self, address: str, round: int = None) -> None:
+        pass
+
+    def apply_local_delta(self, address: str, app_id: int, delta: List[dict], round: int, opted_in: bool = False) -> None:
+        pass
+
+    def drop_local_state(self, address: str, app_id: int) -> None:
+        pass
+
+class IndexerStateBackend(StateBackend):
+    '''Reads the state through the indexer, results can lag behind the latest round.\n
+       Local state and opt ins are read from the full account, so read_account costs the same'''
+
+    cheap_account_reads = True
+
+    def __init__(self, indexer_client: 'IndexerClient') -> None:
+        self.indexer_client = indexer_client
+
+    def read_global_state(self, app_id: int) -> Dict[str, 'int | str']:
+        return read_global_state(self.indexer_client, app_id)
+
+    def read_local_state(self, app_id: int, address: str) -> Dict[str, 'int | str']:
+        return read_local_state(self.indexer_client, app_id, address)
+
+    def is_opted_in_app(self, address: str, app_id: int) -> bool:
+        return is_opted_in_app(self.indexer_client, address, app_id)
+
+    def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        return is_opted_in_asset(self.indexer_client, address, asa_id)
+
+    def read_account(self, address: str) -> Tuple[dict, int]:
+        results = self.indexer_client.account_info(address)
+        return results['account'], results.get('current-round', 0)
+
+class AlgodStateBackend(StateBackend):
+    '''Reads the state directly from algod, always up to date with the latest round.\n
+       Local state and opt ins use the per account application/asset endpoints, only read_account fetches the full account'''
+
+    def __init__(self, algod_client: 'AlgodClient') -> None:
+        self.algod_client = algod_client
+
+    def read_global_state(self, app_id: int) -> Dict[str, 'int | str']:
+        return format_state(self.algod_client.application_info(app_id)['params'].get('global-state', []))
+
+    def read_local_state(self, app_id: int, address: str) -> Dict[str, 'int | str']:
+        local_state = self.account_application_info(address, app_id)
+        if local_state is None:
+            return {}
+        return format_state(local_state.get('app-local-state', {}).get('key-value', []))
+
+    def is_opted_in_app(self, address: str, app_id: int) -> bool:
+        local_state = self.account_application_info(address, app_id)
+        return local_state is not None and 'app-local-state' in local_state
+
+    def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        holding = self.account_asset_info(address, asa_id)
+        return holding is not None and 'asset-holding' in holding
+
+    def read_account(self, address: str) -> Tuple[dict, int]:
+        account = self.algod_client.account_info(address)
+        return account, account.get('round', 0)
+
+    def account_application_info(self, address: str, app_id: int) -> 'dict | None':
+        '''Returns None if the address is not opted in app_id'''
+        return self.get_or_none("/accounts/{}/applications/{}".format(address, app_id))
+
+    def account_asset_info(self, address: str, asa_id: int) -> 'dict | None':
+        '''Returns None if the address is not opted in asa_id'''
+        return self.get_or_none("/accounts/{}/assets/{}".format(address, asa_id))
+
+    def get_or_none(self, requrl: str) -> 'dict | None':
+        from algosdk.error import AlgodHTTPError
+
+        try:
+            return self.algod_client.algod_request("GET", requrl)
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
@@ -1,9 +1,12 @@
-from os import path
+from os import path, urandom
 from json import load
-from typing import Dict, List
-from algosdk.v2client.indexer import IndexerClient
-from algosdk.v2client.algod import AlgodClient
-from algosdk.future.transaction import Transaction
+from functools import lru_cache
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from algosdk.v2client.indexer import IndexerClient
+    from algosdk.v2client.algod import AlgodClient
+    from algosdk.future.transaction import Transaction
 
 my_path = path.abspath(path.dirname(__file__))
 INFO_PATH = path.join(my_path, "v1/app_ids.json")
@@ -14,11 +17,25 @@ def int_to_bytes(i: int, len: int = 8):
 def bytes_to_int(bytes: str, byteorder: str = 'big') -> int:
     return int.from_bytes(bytes,byteorder)
 
-def get_app_id(chain: str) -> int:
+@lru_cache(maxsize=None)
+def read_app_ids() -> Dict[str, dict]:
+    '''The content of app_ids.json, read once per process (call read_app_ids.cache_clear() after editing it)'''
     with open(INFO_PATH, 'r') as file:
-        return load(file)[chain]['APP_ID']
+        return load(file)
+
+def get_app_id(chain: str) -> int:
+    return read_app_ids()[chain]['APP_ID']
+
+def get_app_ids(chain: str) -> List[int]:
+    '''The application ids of the shards of chain (APP_IDS in app_ids.json), by default the single APP_ID'''
+    info = read_app_ids()[chain]
+    return list(info.get('APP_IDS', [info['APP_ID']]))
+
+def unique_note() -> bytes:
+    '''8 random bytes to set as note, so identical transactions built with the same params (e.g. two equal deposits) get distinct txids'''
+    return urandom(8)
 
-def is_opted_in_app(indexer: IndexerClient, address: str, app_id: int) -> bool:
+def is_opted_in_app(indexer: 'IndexerClient', address: str, app_id: int) -> bool:
     try:
         for app in indexer.account_info(address)['account']['apps-local-state']:
             if app['id'] == app_id:
@@ -28,7 +45,7 @@ def is_opted_in_app(indexer: IndexerClient, address: str, app_id: int) -> bool:
 
     return False
     
-def is_opted_in_asset(indexer: IndexerClient, address: str, asa_id: int) -> bool:
+def is_opted_in_asset(indexer: 'IndexerClient', address: str, asa_id: int) -> bool:
     try:
         for asset in indexer.account_info(address)['account']['assets']:
             if asset['asset-id'] == asa_id:
@@ -38,13 +55,13 @@ def is_opted_in_asset(indexer: IndexerClient, address: str, asa_id: int) -> bool
     
     return False
 
-def get_suggested_params(algod: AlgodClient):
+def get_suggested_params(algod: 'AlgodClient'):
     params = algod.suggested_params()
     params.flat_fee = True
     params.fee = 1000
     return params
 
-def sign_group(txns: List[Transaction], pk: str) -> list:
+def sign_group(txns: 'List[Transaction]', pk: str) -> list:
     signed = []
     for txn in txns:
         signed.append(txn.sign(pk))
@@ -64,10 +81,10 @@ def format_state(state) -> Dict[str, 'int | str']:
             formatted[formatted_key] = value['uint']
     return formatted
 
-def read_global_state(indexer_client: IndexerClient, app_id: int):
+def read_global_state(indexer_client: 'IndexerClient', app_id: int):
     return format_state(indexer_client.applications(app_id)['application']['params']['global-state'])
 
-def read_local_state(indexer_client: IndexerClient, app_id: int, address: str):
+def read_local_state(indexer_client: 'IndexerClient', app_id: int, address: str):
     results = indexer_client.account_info(address)['account']
     try:
         for local_state in results["apps-local-state"]:
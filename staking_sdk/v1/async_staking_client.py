@@ -0,0 +1,376 @@
+from asyncio import Lock
+from copy import copy
+from time import monotonic
+from typing import Callable, Dict, List
+from base64 import b64encode, b64decode
+from algosdk.encoding import encode_address
+from algosdk.future.transaction import SuggestedParams, assign_group_id
+from algosdk.logic import get_application_address
+from ..utils import get_app_id, bytes_to_int, format_state, sign_group, unique_note
+from ..params_cache import SECONDS_PER_ROUND
+from ..async_http import AsyncHTTPTransport, AsyncAlgodClient, AsyncIndexerClient
+from ..contract_strings import GlobalKey
+from .typed_dict import UserStakedState, GlobalStateChangeset, SubmitResult
+from .staking_pool import StakingPool
+from .pool_registry import PoolRegistry
+from .codec import UserSlot, decode_user_slots, find_user_slot
+from .bulk_submit import async_submit_groups
+from .create_pool import create_pool
+from .delete_pool import delete_pool
+from .deposit import deposit
+from .claim import claim
+from .withdraw import withdraw
+from .escrow_opt_in import escrow_opt_in
+from .staking_app_close_out import staking_app_close_out
+from .staking_app_opt_in import staking_app_opt_in
+
+INFO_KEY = b64encode(GlobalKey.info.encode()).decode()
+
+class AsyncStakingClient:
+    def __init__(self, algod_client: AsyncAlgodClient, indexer_client: AsyncIndexerClient, chain: str, user_address: str = None, params_max_rounds: int = 10) -> None:
+        '''Instatiate a new AsyncStakingClient object, the global state is loaded with load() (or use the create() classmethod)\n
+           The pools are kept only for their state, transactions are built with the params fetched asynchronously'''
+
+        self.algod_client = algod_client
+        self.indexer_client = indexer_client
+        self.chain = chain
+        self.user_address = user_address
+
+        self.app_id = get_app_id(self.chain)
+        self.escrow = get_application_address(self.app_id)
+
+        self.manager = None
+        self.pools_number = 0
+        self.pools = PoolRegistry(self.new_pool)
+
+        self.params_max_rounds = params_max_rounds
+        self.params_ttl = params_max_rounds * SECONDS_PER_ROUND
+        self.params: SuggestedParams = None
+        self.params_fetched_at = 0.0
+        self.params_lock = Lock()
+        self.latest_round = 0
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> 'AsyncStakingClient':
+        '''Instatiate a new client and load the global state'''
+        client = cls(*args, **kwargs)
+        await client.load()
+        return client
+
+    async def load(self) -> None:
+        await self.update_global_state()
+
+    async def close(self) -> None:
+        await self.algod_client.transport.close()
+        await self.indexer_client.transport.close()
+
+    async def __aenter__(self) -> 'AsyncStakingClient':
+        await self.load()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def new_pool(self, key: str, value: str) -> StakingPool:
+        return StakingPool(None, None, key, value)
+
+    async def update_global_state(self) -> GlobalStateChangeset:
+        '''Reads the global state and applies to the pools only the records that changed since the last update\n
+           Returns the ids of the pools added, changed and removed'''
+
+        global_state = await self.get_unformatted_global_state()
+        self.manager = self.get_manager(global_state)
+        self.pools_number = self.get_pools_number(global_state)
+        global_state.pop(INFO_KEY)
+
+        return self.pools.apply(global_state)
+
+    def get_manager(self, unformatted_gloabal_state) -> str:
+        '''Extract the manager address from an unformatted global state'''
+        return encode_address(b64decode(unformatted_gloabal_state[INFO_KEY])[:32])
+
+    def get_pools_number(self, unformatted_gloabal_state) -> int:
+        '''Extract the pools number from an unformatted global state'''
+        return bytes_to_int(b64decode(unformatted_gloabal_state[INFO_KEY])[-8:])
+
+    async def get_suggested_params(self) -> SuggestedParams:
+        '''Returns a copy of the cached params (flat fee of 1000), concurrent callers share the same algod request\n
+           As in SuggestedParamsCache the params expire params_max_rounds after their first valid round (the rounds are seen
+           while waiting for the confirmations) or, when no round is seen, after params_max_rounds * SECONDS_PER_ROUND seconds'''
+
+        async with self.params_lock:
+            if (self.params is None or self.latest_round - self.params.first >= self.params_max_rounds
+                or monotonic() - self.params_fetched_at >= self.params_ttl):
+                params = await self.algod_client.suggested_params()
+                params.flat_fee = True
+                params.fee = 1000
+                self.params, self.params_fetched_at = params, monotonic()
+                self.latest_round = max(self.latest_round, params.first)
+            return copy(self.params)
+
+    async def submit_create_pool(self, staking_rewards: int, start_time: int, time_delta: int, staking_asa_id: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a create_pool transaction group'''
+
+        params = await self.get_suggested_params()
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        txns = create_pool(sender, params, staking_rewards, start_time, time_delta, staking_asa_id, self.app_id, unique_note())
+
+        await self.submit_group(sign_group(assign_group_id(txns), pk), True)
+
+    async def submit_delete_pool(self, pool_id: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a delete_pool transaction group'''
+
+        if self.user_address != None:
+            sender = self.user_address
+
+        params = await self.get_suggested_params()
+        params.fee = 2000
+
+        txn = delete_pool(sender, params, self.get_pool_from_id(pool_id).staked_asa_id, self.app_id, pool_id, unique_note())
+
+        await self.submit_txn(txn.sign(pk), True)
+
+    async def submit_deposit_in_pool(self, pool_id: int, amount: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a deposit transaction group'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        params = await self.get_suggested_params()
+
+        txns = deposit(sender, params, amount, self.get_pool_from_id(pool_id).staked_asa_id, self.app_id, pool_id, unique_note())
+
+        await self.submit_group(sign_group(assign_group_id(txns), pk), True)
+
+    async def submit_claim_from_pool(self, pool_id: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a claim transaction group
+           Raises Exception if the pool has been deleted'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        try:
+            staking_asa_id = self.get_staking_asa_id_from_pool(pool_id)
+        except Exception:
+            raise Exception("Pool deleted, try with withdraw call")
+
+        params = await self.get_suggested_params()
+        params.fee = 2000
+
+        await self.submit_txn(claim(sender, params, staking_asa_id, self.app_id, pool_id, unique_note()).sign(pk), True)
+
+    async def submit_withdraw_from_pool(self, pool_id: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a withdraw transaction group\n
+           Raises Exception if the sender has not staked in pool_id'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        pool = self.pools.get(pool_id)
+        if pool is not None:
+            staking_asa_id = pool.staked_asa_id
+        else:
+            slot = await self.get_local_slot(pool_id, sender)
+            if slot == None:
+                raise Exception("Sender seems not have been staked in the pool")
+            staking_asa_id = slot.staking_asa_id
+
+        params = await self.get_suggested_params()
+        params.fee = 2000
+
+        await self.submit_txn(withdraw(sender, params, staking_asa_id, self.app_id, pool_id, unique_note()).sign(pk), True)
+
+    async def submit_escrow_opt_in(self, staking_asa_id: int, pk: str, sender: str = None) -> None:
+        '''Sumbmits to the network a escrow_opt_in transaction group\n
+           Raises Exception if the escrow is alredy opted in'''
+
+        if await self.is_opted_in_asset(self.escrow, staking_asa_id):
+            raise Exception("Escrow alredy opted in asset {}".format(staking_asa_id))
+
+        params = await self.get_suggested_params()
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        txns = escrow_opt_in(sender, params, staking_asa_id, self.app_id, unique_note())
+
+        await self.submit_group(sign_group(assign_group_id(txns), pk), True)
+
+    async def submit_staking_app_opt_in(self, pk, sender: str = None) -> None:
+        '''Sumbmits to the network an application opt in transaction to the staking appplication\n
+           Raises Exception if the sender is alredy opted in'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+        if await self.is_opted_in_app(sender, self.app_id):
+            raise Exception(f"{sender} is alredy opted in {self.app_id}")
+
+        params = await self.get_suggested_params()
+
+        await self.submit_txn(staking_app_opt_in(sender, params, self.app_id, unique_note()).sign(pk), True)
+
+    async def submit_staking_app_close_out(self, pk, sender: str = None) -> None:
+        '''Sumbmits to the network an application close out transaction from the staking appplication\n
+           Raises Exception if the sender is not opted in'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+        if not await self.is_opted_in_app(sender, self.app_id):
+            raise Exception(f"{sender} is not opted in {self.app_id}")
+
+        params = await self.get_suggested_params()
+
+        await self.submit_txn(staking_app_close_out(sender, params, self.app_id, unique_note()).sign(pk), True)
+
+    async def is_opted_in_app(self, address: str, app_id: int) -> bool:
+        try:
+            for app in (await self.indexer_client.account_info(address))['account']['apps-local-state']:
+                if app['id'] == app_id:
+                    return True
+        except KeyError:
+            pass
+
+        return False
+
+    async def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        try:
+            for asset in (await self.indexer_client.account_info(address))['account']['assets']:
+                if asset['asset-id'] == asa_id:
+                    return True
+        except KeyError:
+            pass
+
+        return False
+
+    async def get_unformatted_global_state(self) -> Dict[str, 'int | str']:
+        return format_state((await self.indexer_client.applications(self.app_id))['application']['params']['global-state'])
+
+    async def get_unformatted_local_state(self, address: str) -> Dict[str, 'int | str']:
+        results = (await self.indexer_client.account_info(address))['account']
+        try:
+            for local_state in results["apps-local-state"]:
+                if local_state["id"] == self.app_id:
+                    if "key-value" not in local_state:
+                        return {}
+                    return format_state(local_state["key-value"])
+        except KeyError:
+            pass
+        return {}
+
+    async def get_local_slots(self, address: str = None) -> List[UserSlot]:
+        '''Returns the decoded local state slots of address (by default the client user_address)'''
+        if address == None and self.user_address != None:
+            address = self.user_address
+
+        return decode_user_slots(await self.get_unformatted_local_state(address))
+
+    async def get_local_slot(self, pool_id: int, address: str = None) -> 'UserSlot | None':
+        '''Returns the local state slot of address in pool_id, None if address has not staked in it'''
+        if address == None and self.user_address != None:
+            address = self.user_address
+
+        return find_user_slot(await self.get_unformatted_local_state(address), pool_id)
+
+    async def get_formatted_local_state(self, address: str = None) -> List[UserStakedState]:
+        return [slot.json() for slot in await self.get_local_slots(address)]
+
+    def get_pool_from_id(self, pool_id: int) -> StakingPool:
+        '''Returns the StakingPool object for the specific pool_id\n
+           The global state should be updated to get reliable results\n
+           Raises Exception if the pool_id is not found'''
+
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            raise Exception("Pool {} not found".format(pool_id))
+        return pool
+
+    def get_staking_asa_id_from_pool(self, pool_id: int) -> int:
+        return self.get_pool_from_id(pool_id).staked_asa_id
+
+    def get_latest_pool_created(self) -> StakingPool:
+        '''Get the latest pool created id\n
+           The global state should be updated to get reliable results\n
+           Raises Exception if no latest pool is found'''
+
+        latest = self.pools.latest
+        if latest is None:
+            raise Exception("No latest pool found")
+
+        return latest
+
+    async def submit_group(self, transaction_group, wait: bool = False) -> str:
+        txid = await self.algod_client.send_transactions(transaction_group)
+
+        if wait:
+            await self.wait_for_confirmation(txid)
+
+        return txid
+
+    async def submit_txn(self, txn, wait: bool = False) -> str:
+        txid = await self.algod_client.send_transaction(txn)
+
+        if wait:
+            await self.wait_for_confirmation(txid)
+
+        return txid
+
+    async def submit_groups(self, groups: list, max_rounds: int = 10, on_result: Callable[[SubmitResult], None] = None) -> List[SubmitResult]:
+        '''Sends all the signed groups (or single signed transactions) concurrently and tracks their confirmation in one
+           round-following loop (see bulk_submit.async_submit_groups) instead of a wait_for_confirmation per group\n
+           on_result is called for each group as soon as it is confirmed or fails, the results are returned in the groups order'''
+
+        def confirmed(result: SubmitResult) -> None:
+            if result["confirmed_round"] != None:
+                self.latest_round = max(self.latest_round, result["confirmed_round"])
+            if on_result != None:
+                on_result(result)
+
+        return await async_submit_groups(self.algod_client, groups, max_rounds, confirmed)
+
+    async def wait_for_confirmation(self, txid: str, wait_rounds: int = 10) -> dict:
+        '''Waits without blocking the event loop until txid is confirmed\n
+           Raises Exception if the transaction is rejected or not confirmed within wait_rounds'''
+
+        current_round = (await self.algod_client.status())["last-round"]
+        last_round = current_round + wait_rounds
+
+        while current_round <= last_round:
+            self.latest_round = max(self.latest_round, current_round)
+            info = await self.algod_client.pending_transaction_info(txid)
+            if info.get("confirmed-round", 0) > 0:
+                self.latest_round = max(self.latest_round, info["confirmed-round"])
+                return info
+            if info.get("pool-error"):
+                raise Exception("Transaction {} rejected: {}".format(txid, info["pool-error"]))
+
+            await self.algod_client.status_after_block(current_round)
+            current_round += 1
+
+        raise Exception("Transaction {} not confirmed after {} rounds".format(txid, wait_rounds))
+
+class AsyncMainnetStakingClient(AsyncStakingClient):
+    def __init__(self, algod_client: AsyncAlgodClient = None, indexer_client: AsyncIndexerClient = None, user_address: str = None, transport: AsyncHTTPTransport = None) -> None:
+
+        if transport is None:
+            transport = AsyncHTTPTransport()
+        if algod_client is None:
+            algod_client = AsyncAlgodClient("", "https://node.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
+        if indexer_client is None:
+            indexer_client = AsyncIndexerClient("", "https://algoindexer.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
+
+        super().__init__(algod_client, indexer_client, "mainnet", user_address)
+
+class AsyncTestnetStakingClient(AsyncStakingClient):
+    def __init__(self, algod_client: AsyncAlgodClient = None, indexer_client: AsyncIndexerClient = None, user_address: str = None, transport: AsyncHTTPTransport = None) -> None:
+
+        if transport is None:
+            transport = AsyncHTTPTransport()
+        if algod_client is None:
+            algod_client = AsyncAlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
+        if indexer_client is None:
+            indexer_client = AsyncIndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
+
+        super().__init__(algod_client, indexer_client, "testnet", user_address)
@@ -0,0 +1,202 @@
+from base64 import b64encode, b64decode
+from json import dump, load
+from os import path, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+import msgpack
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.indexer import IndexerClient
+from algosdk.encoding import encode_address
+from algosdk.future.transaction import OnComplete
+from ..utils import bytes_to_int, format_state
+from ..params_cache import SuggestedParamsCache
+from ..account_cache import apply_state_delta
+from ..contract_strings import GlobalKey
+from .typed_dict import UserStakedState
+from .staking_pool import StakingPool
+from .pool_registry import PoolRegistry
+from .codec import UserSlot, decode_user_slots, find_user_slot
+from .local_state_scanner import LocalStateScanner
+
+INFO_KEY = b64encode(GlobalKey.info.encode()).decode()
+
+def state_delta(block_delta: dict) -> List[dict]:
+    '''Formats an EvalDelta of a msgpack block (raw keys, "at", "bs", "ui") as in the algod transaction responses'''
+    return [{"key": b64encode(key).decode(),
+             "value": {"action": value.get(b"at", 0), "bytes": b64encode(value.get(b"bs", b"")).decode(), "uint": value.get(b"ui", 0)}}
+            for key, value in block_delta.items()]
+
+class BlockFollower:
+    def __init__(self, algod_client: AlgodClient, app_id: int, checkpoint_path: str = None, checkpoint_every: int = 100) -> None:
+        '''In memory view of all the pools and all the user slots of the staking application, kept current by reading the blocks
+           round by round and applying the state deltas of the calls to the application (CP, DP, CL, WD, DL, opt in, close out, clear state).\n
+           The view starts from bootstrap() (or bootstrap_from_network()) and is then moved forward with follow() or run().\n
+           With checkpoint_path the view and the last processed round are saved every checkpoint_every blocks and at the end of each follow(),
+           a new BlockFollower with the same checkpoint_path resumes from there'''
+
+        self.algod_client = algod_client
+        self.app_id = app_id
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+
+        self.params_cache = SuggestedParamsCache(self.algod_client)
+        self.pools = PoolRegistry(self.new_pool)
+        self.local_states: Dict[str, Dict[str, str]] = {}
+        self.info = None
+        self.round: int = None
+        self.timestamp = 0
+
+        if self.checkpoint_path != None and path.exists(self.checkpoint_path):
+            self.load_checkpoint()
+
+    def new_pool(self, key: str, value: str) -> StakingPool:
+        return StakingPool(self.algod_client, None, key, value, self.params_cache)
+
+    def bootstrap(self, global_state: Dict[str, str], local_states: Iterable[Tuple[str, Dict[str, str]]], round: int) -> None:
+        '''Loads the unformatted global state and (address, unformatted local state) of all the opted in accounts,
+           read at round or later. The blocks are followed from round + 1: the deltas set absolute values,
+           so the blocks already included in the state read are applied again without changing the result'''
+
+        global_state = dict(global_state)
+        self.info = global_state.pop(INFO_KEY, None)
+        self.pools.apply(global_state)
+        self.local_states = {address: dict(local_state) for address, local_state in local_states}
+        self.round = round
+
+    def bootstrap_from_network(self, indexer_client: IndexerClient) -> None:
+        '''Reads the global state from algod and the local states with a LocalStateScanner.\n
+           The indexer lags behind algod, so the blocks are followed from the lowest of the algod round and the indexer rounds
+           of the scanned pages: the blocks between them are applied again over the newer global state, without changing it'''
+
+        round = self.algod_client.status()['last-round']
+        global_state = format_state(self.algod_client.application_info(self.app_id)['params'].get('global-state', []))
+        scanner = LocalStateScanner(indexer_client, self.app_id)
+        local_states = list(scanner.local_states())
+        if scanner.min_round != None:
+            round = min(round, scanner.min_round)
+        self.bootstrap(global_state, local_states, round)
+
+    def follow(self, until_round: int = None) -> int:
+        '''Applies the blocks after the last processed round up to until_round (by default the latest round)\n
+           Returns the number of blocks processed'''
+
+        if self.round == None:
+            raise Exception("BlockFollower not bootstrapped")
+        if until_round == None:
+            until_round = self.algod_client.status()['last-round']
+
+        processed = 0
+        while self.round < until_round:
+            self.apply_block(self.algod_client.block_info(self.round + 1, response_format="msgpack"))
+            processed += 1
+            if self.checkpoint_path != None and processed % self.checkpoint_every == 0:
+                self.save_checkpoint()
+
+        if self.checkpoint_path != None and processed:
+            self.save_checkpoint()
+        return processed
+
+    def run(self, stop: Callable[[], bool] = None) -> None:
+        '''Follows the chain waiting for each new block, until stop() returns True'''
+
+        while stop == None or not stop():
+            self.follow()
+            self.algod_client.status_after_block(self.round)
+
+    def apply_block(self, raw_block: bytes) -> None:
+        block = msgpack.unpackb(raw_block, raw=True, strict_map_key=False)[b"block"]
+
+        for stxn in block.get(b"txns", []):
+            self.apply_txn(stxn)
+
+        self.round = block.get(b"rnd", self.round + 1)
+        self.timestamp = block.get(b"ts", self.timestamp)
+
+    def apply_txn(self, stxn: dict) -> None:
+        txn = stxn.get(b"txn", {})
+        if txn.get(b"type") != b"appl" or txn.get(b"apid", 0) != self.app_id:
+            return
+
+        sender = encode_address(txn[b"snd"])
+        on_complete = txn.get(b"apan", 0)
+        eval_delta = stxn.get(b"dt", {})
+
+        if on_complete == OnComplete.OptInOC:
+            self.local_states[sender] = {}
+
+        global_state_delta = []
+        for item in state_delta(eval_delta.get(b"gd", {})):
+            if item["key"] != INFO_KEY:
+                global_state_delta.append(item)
+            elif item["value"]["action"] == 1:
+                self.info = item["value"]["bytes"]
+        self.pools.apply_delta(global_state_delta)
+
+        accounts = [sender] + [encode_address(account) for account in txn.get(b"apat", [])]
+        for index, local_delta in eval_delta.get(b"ld", {}).items():
+            address = accounts[index]
+            self.local_states[address] = apply_state_delta(self.local_states.get(address, {}), state_delta(local_delta))
+
+        if on_complete in (OnComplete.CloseOutOC, OnComplete.ClearStateOC):
+            self.local_states.pop(sender, None)
+
+    def save_checkpoint(self) -> None:
+        '''Writes the view and the last processed round, replacing the previous checkpoint only once fully written'''
+
+        global_state = dict(self.pools.raw_state)
+        if self.info != None:
+            global_state[INFO_KEY] = self.info
+
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, 'w') as file:
+            dump({"app-id": self.app_id, "round": self.round, "timestamp": self.timestamp,
+                  "global-state": global_state, "local-states": self.local_states}, file)
+        replace(temporary_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> None:
+        with open(self.checkpoint_path, 'r') as file:
+            checkpoint = load(file)
+
+        if checkpoint["app-id"] != self.app_id:
+            raise Exception("Checkpoint of application {}, not {}".format(checkpoint["app-id"], self.app_id))
+        self.bootstrap(checkpoint["global-state"], checkpoint["local-states"].items(), checkpoint["round"])
+        self.timestamp = checkpoint["timestamp"]
+
+    @property
+    def manager(self) -> 'str | None':
+        return encode_address(b64decode(self.info)[:32]) if self.info != None else None
+
+    @property
+    def pools_number(self) -> int:
+        return bytes_to_int(b64decode(self.info)[-8:]) if self.info != None else 0
+
+    def get_pool_from_id(self, pool_id: int) -> StakingPool:
+        '''Raises Exception if the pool_id is not found'''
+
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            raise Exception("Pool {} not found".format(pool_id))
+        return pool
+
+    def is_opted_in(self, address: str) -> bool:
+        return address in self.local_states
+
+    def get_local_slots(self, address: str) -> List[UserSlot]:
+        return decode_user_slots(self.local_states.get(address, {}))
+
+    def get_local_slot(self, pool_id: int, address: str) -> 'UserSlot | None':
+        return find_user_slot(self.local_states.get(address, {}), pool_id)
+
+    def get_formatted_local_state(self, address: str) -> List[UserStakedState]:
+        return [slot.json() for slot in self.get_local_slots(address)]
+
+    def slots(self, pool_id: int = None, staking_asa_id: int = None) -> Iterator[Tuple[str, UserStakedState]]:
+        '''Yields (address, UserStakedState) of every staking slot, optionally only the ones of pool_id and/or staking_asa_id,
+           as a LocalStateScanner without reading the indexer'''
+
+        for address, local_state in list(self.local_states.items()):
+            for slot in decode_user_slots(local_state):
+                if pool_id is not None and slot.pool_id != pool_id:
+                    continue
+                if staking_asa_id is not None and slot.staking_asa_id != staking_asa_id:
+                    continue
+                yield address, slot.json()
@@ -0,0 +1,183 @@
+from asyncio import gather
+from typing import Callable, Dict, List, TYPE_CHECKING
+import msgpack
+from .typed_dict import SubmitResult
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+    from ..async_http import AsyncAlgodClient
+
+def block_txids(raw_block: bytes) -> List[str]:
+    '''Ids of the transactions confirmed in a block read in msgpack, whose genesis hash and id are only in the block header'''
+
+    from base64 import b32encode, b64decode
+    from algosdk import constants
+    from algosdk.encoding import checksum, msgpack_encode
+
+    block = msgpack.unpackb(raw_block, raw=False, strict_map_key=False)["block"]
+    txids = []
+    for stxn in block.get("txns", []):
+        txn = dict(stxn["txn"])
+        if "gh" not in txn and "gh" in block:
+            txn["gh"] = block["gh"]
+        if stxn.get("hgi") and "gen" in block:
+            txn["gen"] = block["gen"]
+        txid = checksum(constants.txid_prefix + b64decode(msgpack_encode(txn)))
+        txids.append(b32encode(txid).decode().rstrip("="))
+    return txids
+
+def block_apply_data(raw_block: bytes) -> List[dict]:
+    '''State deltas of the transactions of a block read in msgpack, in the block order, formatted as in the
+       pending-transaction-info responses (confirmed-round, global-state-delta and local-state-delta by address)'''
+
+    from algosdk.encoding import encode_address
+    from .block_follower import state_delta
+
+    block = msgpack.unpackb(raw_block, raw=True, strict_map_key=False)[b"block"]
+    infos = []
+    for stxn in block.get(b"txns", []):
+        txn = stxn.get(b"txn", {})
+        eval_delta = stxn.get(b"dt", {})
+        accounts = [encode_address(txn[b"snd"])] + [encode_address(account) for account in txn.get(b"apat", [])]
+        infos.append({"confirmed-round": block.get(b"rnd", 0),
+                      "global-state-delta": state_delta(eval_delta.get(b"gd", {})),
+                      "local-state-delta": [{"address": accounts[index], "delta": state_delta(local_delta)}
+                                            for index, local_delta in eval_delta.get(b"ld", {}).items()]})
+    return infos
+
+def submit_groups(algod_client: 'AlgodClient', groups: list, max_rounds: int = 10, on_result: Callable[[SubmitResult], None] = None,
+                  on_confirmed: Callable[[SubmitResult, Dict[str, dict]], None] = None) -> List[SubmitResult]:
+    '''Sends all the signed groups (a group can be a single signed transaction) without waiting in between,
+       then follows the rounds with status-after-block reading each new block once and matching its txids with the pending groups.\n
+       on_result is called for each group as soon as it is confirmed or fails.\n
+       on_confirmed is called before on_result for each confirmed group, with the state deltas (block_apply_data) of the
+       transactions of its block by txid: the block is read anyway, so the deltas cost no further request.\n
+       Groups not confirmed within max_rounds are looked up once with pending-transaction-info and reported with their
+       pool error, or with the error "timeout".\n
+       Returns the results in the same order of groups'''
+
+    results: List[SubmitResult] = []
+    pending: Dict[str, SubmitResult] = {}
+
+    def report(result: SubmitResult, confirmed_round: int = None, error: str = None, infos: Dict[str, dict] = None) -> None:
+        result["confirmed_round"] = confirmed_round
+        result["error"] = error
+        if confirmed_round is not None and on_confirmed is not None:
+            on_confirmed(result, infos if infos is not None else {})
+        if on_result is not None:
+            on_result(result)
+
+    first_round = algod_client.status()["last-round"]
+
+    for index, group in enumerate(groups):
+        if not isinstance(group, list):
+            group = [group]
+
+        result = SubmitResult(index=index, txid=None, confirmed_round=None, error=None)
+        results.append(result)
+        try:
+            result["txid"] = algod_client.send_transactions(group)
+            pending[result["txid"]] = result
+        except Exception as e:
+            report(result, error=str(e))
+
+    if not pending:
+        return results
+
+    last_round = algod_client.status_after_block(first_round)["last-round"]
+    end_round = last_round + max_rounds
+    next_round = first_round + 1
+
+    while pending:
+        while pending and next_round <= last_round:
+            try:
+                raw_block = algod_client.block_info(next_round, response_format="msgpack")
+                txids = block_txids(raw_block)
+                confirmed = [txid for txid in txids if txid in pending]
+                infos = dict(zip(txids, block_apply_data(raw_block))) if confirmed and on_confirmed is not None else None
+            except Exception:
+                break #Retry on the next round
+
+            for txid in confirmed:
+                report(pending.pop(txid), confirmed_round=next_round, infos=infos)
+            next_round += 1
+
+        if not pending or last_round >= end_round:
+            break
+        last_round = algod_client.status_after_block(last_round)["last-round"]
+
+    for txid, result in pending.items():
+        try:
+            info = algod_client.pending_transaction_info(txid)
+        except Exception:
+            info = {}
+
+        if info.get("confirmed-round", 0) > 0:
+            report(result, confirmed_round=info["confirmed-round"], infos={txid: info})
+        else:
+            report(result, error=info.get("pool-error") or "timeout")
+
+    return results
+
+async def async_submit_groups(algod_client: 'AsyncAlgodClient', groups: list, max_rounds: int = 10, on_result: Callable[[SubmitResult], None] = None) -> List[SubmitResult]:
+    '''Awaitable submit_groups for an AsyncAlgodClient: the groups are sent concurrently, then the rounds are followed
+       with status-after-block reading each new block once and matching its txids with the pending groups.\n
+       on_result is called for each group as soon as it is confirmed or fails, groups not confirmed within max_rounds
+       are looked up once with pending-transaction-info.\n
+       Returns the results in the same order of groups'''
+
+    results: List[SubmitResult] = []
+    pending: Dict[str, SubmitResult] = {}
+
+    def report(result: SubmitResult, confirmed_round: int = None, error: str = None) -> None:
+        result["confirmed_round"] = confirmed_round
+        result["error"] = error
+        if on_result is not None:
+            on_result(result)
+
+    first_round = (await algod_client.status())["last-round"]
+
+    sent = await gather(*(algod_client.send_transactions(group if isinstance(group, list) else [group]) for group in groups), return_exceptions=True)
+    for index, txid in enumerate(sent):
+        result = SubmitResult(index=index, txid=None, confirmed_round=None, error=None)
+        results.append(result)
+        if isinstance(txid, BaseException):
+            report(result, error=str(txid))
+        else:
+            result["txid"] = txid
+            pending[txid] = result
+
+    if not pending:
+        return results
+
+    last_round = (await algod_client.status_after_block(first_round))["last-round"]
+    end_round = last_round + max_rounds
+    next_round = first_round + 1
+
+    while pending:
+        while pending and next_round <= last_round:
+            try:
+                txids = block_txids(await algod_client.block_info(next_round, response_format="msgpack"))
+            except Exception:
+                break #Retry on the next round
+
+            for txid in txids:
+                if txid in pending:
+                    report(pending.pop(txid), confirmed_round=next_round)
+            next_round += 1
+
+        if not pending or last_round >= end_round:
+            break
+        last_round = (await algod_client.status_after_block(last_round))["last-round"]
+
+    infos = await gather(*(algod_client.pending_transaction_info(txid) for txid in pending), return_exceptions=True)
+    for (txid, result), info in zip(pending.items(), infos):
+        if isinstance(info, BaseException):
+            info = {}
+
+        if info.get("confirmed-round", 0) > 0:
+            report(result, confirmed_round=info["confirmed-round"])
+        else:
+            report(result, error=info.get("pool-error") or "timeout")
+
+    return results
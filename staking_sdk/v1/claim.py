@@ -2,7 +2,7 @@ from algosdk.future.transaction import SuggestedParams, ApplicationNoOpTxn, Tran
 from ..utils import int_to_bytes
 from ..contract_strings import StakingArguments
 
-def claim(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int) -> Transaction:
+def claim(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int, note: bytes = None) -> Transaction:
     '''
         Returns a transaction rapresenting a claim.
     '''
@@ -14,6 +14,7 @@ def claim(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)
+                app_args=args,
+                note=note)
 
     return txn
\ No newline at end of file
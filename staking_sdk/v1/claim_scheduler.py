@@ -0,0 +1,142 @@
+from heapq import heappush, heappop
+from itertools import count
+from typing import Callable, Dict, List, Tuple
+import msgpack
+from algosdk.v2client.algod import AlgodClient
+from .typed_dict import ClaimOutcome, SubmitResult
+from .staking_client import StakingClient
+
+def block_timestamp(algod_client: AlgodClient, round: int) -> int:
+    '''Returns the timestamp of the block of round, the Global.latest_timestamp seen by the transactions of the next rounds'''
+    block = msgpack.unpackb(algod_client.block_info(round, response_format="msgpack"), raw=True, strict_map_key=False)[b"block"]
+    return block.get(b"ts", 0)
+
+class ClaimScheduler:
+    def __init__(self, client: StakingClient, max_attempts: int = 3, max_rounds: int = 10, on_outcome: Callable[[ClaimOutcome], None] = None) -> None:
+        '''Claims the stakes of many depositor accounts as soon as their pools end.\n
+           The scheduled claims are kept in a heap keyed on the pool end time (ST + TD) and compared with the timestamp of the latest block,
+           not with the local clock: at each block all the claims of the pools ended before its timestamp are signed and submitted at once
+           (fee 2000) with client.submit_groups.\n
+           A claim not confirmed within max_rounds (e.g. a block timestamp behind the expected one) is checked at the next block:
+           it is reported claimed if its transaction was confirmed since (or the slot of the depositor is gone), waited if still pending,
+           and submitted again otherwise, up to max_attempts times. A rejected claim is not submitted again.\n
+           The outcome of each (address, pool_id) is reported to on_outcome and kept in outcomes'''
+
+        self.client = client
+        self.max_attempts = max_attempts
+        self.max_rounds = max_rounds
+        self.on_outcome = on_outcome
+
+        self.heap: List[tuple] = []
+        self.sequence = count()
+        self.outcomes: Dict[Tuple[str, int], ClaimOutcome] = {}
+        self.round: int = None
+        self.timestamp = 0
+
+    def schedule(self, address: str, pk: str, pool_id: int) -> None:
+        '''Schedules the claim of address from pool_id, signed with pk\n
+           Raises Exception if the pool is not found'''
+
+        pool = self.client.get_pool_from_id(pool_id)
+        heappush(self.heap, (pool.start_time + pool.time_delta, next(self.sequence), address, pk, pool_id, 0, None))
+
+    def schedule_account(self, address: str, pk: str) -> int:
+        '''Schedules the claims of all the pools where address has staked (deleted pools are skipped)\n
+           Returns the number of claims scheduled'''
+
+        scheduled = 0
+        for slot in self.client.get_local_slots(address):
+            if slot.pool_id in self.client.pools:
+                self.schedule(address, pk, slot.pool_id)
+                scheduled += 1
+        return scheduled
+
+    def next_end_time(self) -> 'int | None':
+        return self.heap[0][0] if self.heap else None
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def report(self, address: str, pool_id: int, attempts: int, result: SubmitResult = None, error: str = None) -> ClaimOutcome:
+        outcome = ClaimOutcome(address=address, pool_id=pool_id,
+                               claimed=result is not None and result["error"] is None,
+                               txid=result["txid"] if result is not None else None,
+                               confirmed_round=result["confirmed_round"] if result is not None else None,
+                               attempts=attempts,
+                               error=error if result is None else result["error"])
+        self.outcomes[(address, pool_id)] = outcome
+        if self.on_outcome != None:
+            self.on_outcome(outcome)
+        return outcome
+
+    def timed_out_claim(self, txid: str, address: str, pool_id: int) -> 'SubmitResult | None':
+        '''Result of a claim that was not confirmed within max_rounds: confirmed since, still pending (error "pending"),
+           rejected, or None if it was dropped from the transaction pool and must be submitted again.\n
+           When algod no longer knows txid the claim is confirmed if the slot of address in pool_id is gone'''
+
+        try:
+            info = self.client.algod_client.pending_transaction_info(txid)
+        except Exception:
+            info = {}
+
+        if info.get("confirmed-round", 0) > 0:
+            return SubmitResult(index=0, txid=txid, confirmed_round=info["confirmed-round"], error=None)
+        if info:
+            return SubmitResult(index=0, txid=txid, confirmed_round=None, error=info.get("pool-error") or "pending")
+        if self.client.get_local_slot(pool_id, address) is None:
+            return SubmitResult(index=0, txid=txid, confirmed_round=None, error=None)
+        return None
+
+    def run_once(self) -> List[ClaimOutcome]:
+        '''Reads the latest block and submits the claims of all the pools ended before its timestamp, waiting their confirmation\n
+           Returns the outcomes completed in this run (claimed, or failed for the last time)'''
+
+        algod_client = self.client.algod_client
+        self.round = algod_client.status()["last-round"]
+        self.timestamp = block_timestamp(algod_client, self.round)
+
+        due = []
+        while self.heap and self.heap[0][0] < self.timestamp:
+            due.append(heappop(self.heap))
+
+        outcomes, submitted, groups = [], [], []
+        for entry in due:
+            end_time, _, address, pk, pool_id, attempts, txid = entry
+            try:
+                if txid is not None:
+                    result = self.timed_out_claim(txid, address, pool_id)
+                    if result is not None and result["error"] == "pending":
+                        heappush(self.heap, (end_time, next(self.sequence), address, pk, pool_id, attempts, txid))
+                        continue
+                    if result is not None:
+                        outcomes.append(self.report(address, pool_id, attempts, result))
+                        continue
+                txn = self.client.get_pool_from_id(pool_id).prepare_claim_group(address, self.client.app_id)
+            except Exception as e:
+                outcomes.append(self.report(address, pool_id, attempts, error=str(e)))
+                continue
+            submitted.append(entry)
+            groups.append(txn.sign(pk))
+
+        if not groups:
+            return outcomes
+
+        for (end_time, _, address, pk, pool_id, attempts, _), result in zip(submitted, self.client.submit_groups(groups, self.max_rounds)):
+            attempts += 1
+            if result["error"] == "timeout" and attempts < self.max_attempts:
+                heappush(self.heap, (end_time, next(self.sequence), address, pk, pool_id, attempts, result["txid"]))
+            else:
+                outcomes.append(self.report(address, pool_id, attempts, result))
+
+        return outcomes
+
+    def run(self, stop: Callable[[], bool] = None) -> Dict[Tuple[str, int], ClaimOutcome]:
+        '''Runs the scheduler block by block until all the scheduled claims are completed or stop() returns True\n
+           Returns the outcomes by (address, pool_id)'''
+
+        while self.heap and (stop == None or not stop()):
+            self.run_once()
+            if self.heap:
+                self.client.algod_client.status_after_block(self.round)
+
+        return self.outcomes
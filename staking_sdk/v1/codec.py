@@ -0,0 +1,97 @@
+from struct import Struct
+from base64 import b64encode, b64decode
+from typing import Dict, List
+from .typed_dict import UserStakedState
+
+#Layouts documented in pyteal/CONTRACT_DOCS.txt, all the fields are big endian uint64
+POOL_ID = Struct(">Q")
+POOL_RECORD = Struct(">8Q")  #TR | UN | TBC | TS | TSC | ST | TD | CID_G
+USER_SLOT = Struct(">4Q")    #POOL_ID | UST | USC | CID_L
+
+class PoolRecord:
+    __slots__ = ("total_rewards", "users_number", "to_be_claimed", "total_staked", "total_score", "start_time", "time_delta", "staked_asa_id")
+
+    def __init__(self, total_rewards: int, users_number: int, to_be_claimed: int, total_staked: int, total_score: int, start_time: int, time_delta: int, staked_asa_id: int) -> None:
+        self.total_rewards = total_rewards
+        self.users_number = users_number
+        self.to_be_claimed = to_be_claimed
+        self.total_staked = total_staked
+        self.total_score = total_score
+        self.start_time = start_time
+        self.time_delta = time_delta
+        self.staked_asa_id = staked_asa_id
+
+    def astuple(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PoolRecord) and self.astuple() == other.astuple()
+
+    def __repr__(self) -> str:
+        return "PoolRecord{}".format(self.astuple())
+
+class UserSlot:
+    __slots__ = ("pool_id", "user_staked", "user_score", "staking_asa_id")
+
+    def __init__(self, pool_id: int, user_staked: int, user_score: int, staking_asa_id: int) -> None:
+        self.pool_id = pool_id
+        self.user_staked = user_staked
+        self.user_score = user_score
+        self.staking_asa_id = staking_asa_id
+
+    def astuple(self) -> tuple:
+        return (self.pool_id, self.user_staked, self.user_score, self.staking_asa_id)
+
+    def json(self) -> UserStakedState:
+        return UserStakedState(POOL_ID=self.pool_id, user_staked=self.user_staked, user_score=self.user_score, STAKING_ASA_ID=self.staking_asa_id)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UserSlot) and self.astuple() == other.astuple()
+
+    def __repr__(self) -> str:
+        return "UserSlot{}".format(self.astuple())
+
+def decode_pool_id(key: str) -> int:
+    '''Decodes a base64 global state key (or a user slot key) to its uint64'''
+    return POOL_ID.unpack(b64decode(key))[0]
+
+def encode_pool_id(pool_id: int) -> str:
+    return b64encode(POOL_ID.pack(pool_id)).decode()
+
+def unpack_pool_record(value: str) -> tuple:
+    '''Decodes a base64 pool value once and returns its 8 fields in the contract order'''
+    return POOL_RECORD.unpack(b64decode(value))
+
+def decode_pool_record(value: str) -> PoolRecord:
+    return PoolRecord(*POOL_RECORD.unpack(b64decode(value)))
+
+def encode_pool_record(record: PoolRecord) -> str:
+    return b64encode(POOL_RECORD.pack(*record.astuple())).decode()
+
+def decode_user_slot(value: str) -> UserSlot:
+    '''Decodes a base64 local state value once'''
+    return UserSlot(*USER_SLOT.unpack(b64decode(value)))
+
+def encode_user_slot(slot: UserSlot) -> str:
+    return b64encode(USER_SLOT.pack(*slot.astuple())).decode()
+
+
+def decode_user_slots(local_state: Dict[str, 'int | str']) -> List[UserSlot]:
+    '''Decodes the slots of an unformatted local state of either contract layout (slot index keys or pool id keys),
+       skipping the uint STAKES counter of the pool keyed one'''
+    return [decode_user_slot(value) for value in local_state.values() if isinstance(value, str)]
+
+def find_user_slot(local_state: Dict[str, 'int | str'], pool_id: int) -> 'UserSlot | None':
+    '''Slot of pool_id in an unformatted local state: a single lookup of the pool id key with the pool keyed contract,
+       a scan of the slots with the slot index one'''
+
+    value = local_state.get(encode_pool_id(pool_id))
+    if isinstance(value, str):
+        slot = decode_user_slot(value)
+        if slot.pool_id == pool_id:
+            return slot
+
+    for slot in decode_user_slots(local_state):
+        if slot.pool_id == pool_id:
+            return slot
+    return None
\ No newline at end of file
@@ -4,7 +4,7 @@ from algosdk.logic import get_application_address
 from ..utils import int_to_bytes
 from ..contract_strings import StakingArguments
 
-def create_pool(sender: str, params: SuggestedParams, staking_rewards: int, start_time: int, time_delta: int, staking_asa_id: int, staking_app_id) -> List[Transaction]:
+def create_pool(sender: str, params: SuggestedParams, staking_rewards: int, start_time: int, time_delta: int, staking_asa_id: int, staking_app_id, note: bytes = None) -> List[Transaction]:
     '''
         Returns a List of transaction without the group_id set rapresenting a pool creation group.
     '''
@@ -23,6 +23,7 @@ def create_pool(sender: str, params: SuggestedParams, staking_rewards: int, star
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)]
+                app_args=args,
+                note=note)]
     
     return txns
\ No newline at end of file
@@ -2,7 +2,7 @@ from algosdk.future.transaction import SuggestedParams, ApplicationNoOpTxn, Tran
 from ..utils import int_to_bytes
 from ..contract_strings import StakingArguments
 
-def delete_pool(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int) -> Transaction:
+def delete_pool(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int, note: bytes = None) -> Transaction:
     '''
         Returns a transaction rapresenting a delete pool.
     '''
@@ -15,6 +15,7 @@ def delete_pool(sender: str, params: SuggestedParams, staking_asa_id: int, staki
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)
+                app_args=args,
+                note=note)
 
     return txn
\ No newline at end of file
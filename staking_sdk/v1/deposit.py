@@ -4,9 +4,10 @@ from algosdk.logic import get_application_address
 from ..utils import int_to_bytes
 from ..contract_strings import StakingArguments
 
-def deposit(sender: str, params: SuggestedParams, amount: int, staking_asa_id: int, staking_app_id: int, pool_id: int) -> List[Transaction]:
+def deposit(sender: str, params: SuggestedParams, amount: int, staking_asa_id: int, staking_app_id: int, pool_id: int, note: bytes = None) -> List[Transaction]:
     '''
         Returns a List of transaction without the group_id set rapresenting a deposit group.
+        note is set on the application call, e.g. unique_note() to tell apart identical deposits.
     '''
     args = [StakingArguments.deposit.encode(),
             int_to_bytes(pool_id)]
@@ -22,6 +23,7 @@ def deposit(sender: str, params: SuggestedParams, amount: int, staking_asa_id: i
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)]
+                app_args=args,
+                note=note)]
 
     return txns
\ No newline at end of file
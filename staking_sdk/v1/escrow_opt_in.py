@@ -3,7 +3,7 @@ from algosdk.future.transaction import SuggestedParams, PaymentTxn, ApplicationN
 from algosdk.logic import get_application_address
 from ..contract_strings import StakingArguments
 
-def escrow_opt_in(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int) -> List[Transaction]:
+def escrow_opt_in(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, note: bytes = None) -> List[Transaction]:
     '''
         Returns a List of transaction without the group_id set rapresenting a escrow_opt_in group.
     '''
@@ -20,6 +20,7 @@ def escrow_opt_in(sender: str, params: SuggestedParams, staking_asa_id: int, sta
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)]
+                app_args=args,
+                note=note)]
     
     return txns
\ No newline at end of file
@@ -0,0 +1,63 @@
+from typing import Dict, Iterator, Tuple, TYPE_CHECKING
+from .typed_dict import UserStakedState
+from ..utils import format_state
+from .codec import decode_user_slot
+
+if TYPE_CHECKING:
+    from algosdk.v2client.indexer import IndexerClient
+
+class LocalStateScanner:
+    def __init__(self, indexer_client: 'IndexerClient', app_id: int, pool_id: int = None, staking_asa_id: int = None, next_page: str = None, limit: int = 100) -> None:
+        '''Iterates over the local state of every account opted in the staking application, yielding (address, UserStakedState)
+           for each staking slot, optionally only the ones of pool_id and/or staking_asa_id.\n
+           The accounts are read page by page from the indexer, so only one page is kept in memory.\n
+           next_page is the token of the page being read: save it to resume a scan later from the same page
+           (the slots of that page already yielded will be yielded again).\n
+           min_round is the lowest current-round of the pages read, the round the scanned states are known to be at least up to'''
+
+        self.indexer_client = indexer_client
+        self.app_id = app_id
+        self.pool_id = pool_id
+        self.staking_asa_id = staking_asa_id
+        self.next_page = next_page
+        self.limit = limit
+        self.min_round: 'int | None' = None
+
+    def __iter__(self) -> Iterator[Tuple[str, UserStakedState]]:
+        for account in self.accounts():
+            yield from self.account_slots(account)
+
+    def local_states(self) -> Iterator[Tuple[str, Dict[str, str]]]:
+        '''Yields (address, unformatted local state) for every account opted in the application, pool_id and staking_asa_id are ignored'''
+        for account in self.accounts():
+            for local_state in account.get('apps-local-state', []):
+                if local_state['id'] == self.app_id:
+                    yield account['address'], format_state(local_state.get('key-value', []))
+
+    def accounts(self) -> Iterator[dict]:
+        while True:
+            page = self.indexer_client.accounts(application_id=self.app_id, limit=self.limit, next_page=self.next_page)
+            if 'current-round' in page:
+                self.min_round = page['current-round'] if self.min_round is None else min(self.min_round, page['current-round'])
+
+            yield from page.get('accounts', [])
+
+            if not page.get('next-token') or not page.get('accounts'):
+                self.next_page = None
+                return
+            self.next_page = page['next-token']
+
+    def account_slots(self, account: dict) -> Iterator[Tuple[str, UserStakedState]]:
+        for local_state in account.get('apps-local-state', []):
+            if local_state['id'] != self.app_id:
+                continue
+
+            for item in local_state.get('key-value', []):
+                if item['value']['type'] != 1:     #STAKES counter of the pool keyed contract
+                    continue
+                slot = decode_user_slot(item['value']['bytes'])
+                if self.pool_id is not None and slot.pool_id != self.pool_id:
+                    continue
+                if self.staking_asa_id is not None and slot.staking_asa_id != self.staking_asa_id:
+                    continue
+                yield account['address'], slot.json()
@@ -0,0 +1,136 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Set, Tuple
+from .staking_pool import StakingPool
+
+#Constant of pyteal/staking_contract_pyteal.py
+MAX_SECONDS_TO_CLAIM = int(60*60*24*365)
+
+class PoolIndex:
+    def __init__(self, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        '''Secondary indexes of the pools of a PoolRegistry, updated by the registry at every added, changed and removed pool.\n
+           - by staked ASA: dict of sets\n
+           - by end time (ST + TD): sorted (end, id) lists, one for the pools with depositors (UN > 0) and one for the empty pools\n
+           - by activity interval [ST, ST + TD): the sorted interval endpoints (counted by the pools using them), each elementary segment
+           mapped to the set of pools covering it. Adding or removing an interval splits or merges the segments at its endpoints and
+           updates the segments it covers, a change that keeps ST and TD does not touch them\n
+           The queries bisect the sorted lists, so they cost O(log n + k) for k pools returned.\n
+           max_seconds_to_claim must be the MAX_SECONDS_TO_CLAIM of the deployed contract'''
+
+        self.max_seconds_to_claim = max_seconds_to_claim
+
+        self.pools: Dict[int, StakingPool] = {}
+        self.entries: Dict[int, Tuple[int, int, int, bool]] = {}   #pool id -> (ST, end, staked ASA, has depositors)
+        self.by_asa: Dict[int, Set[int]] = {}
+        self.staked_ends: List[Tuple[int, int]] = []
+        self.empty_ends: List[Tuple[int, int]] = []
+
+        self.boundaries: List[int] = []
+        self.boundary_refs: Dict[int, int] = {}
+        self.segments: List[Set[int]] = []  #segments[i] holds the pools covering [boundaries[i], boundaries[i + 1])
+
+    def add(self, pool: StakingPool) -> None:
+        '''Indexes pool, replacing the previous entry of the same id'''
+
+        entry = (pool.start_time, pool.start_time + pool.time_delta, pool.staked_asa_id, pool.users_number > 0)
+        previous = self.entries.get(pool.id)
+        self.pools[pool.id] = pool
+        if entry == previous:
+            return
+
+        if previous is not None:
+            self.unindex(pool.id, previous)
+            if previous[:2] != entry[:2]:
+                self.remove_interval(pool.id, previous[0], previous[1])
+        if previous is None or previous[:2] != entry[:2]:
+            self.add_interval(pool.id, entry[0], entry[1])
+
+        self.entries[pool.id] = entry
+        self.by_asa.setdefault(entry[2], set()).add(pool.id)
+        insort(self.staked_ends if entry[3] else self.empty_ends, (entry[1], pool.id))
+
+    def remove(self, pool_id: int) -> None:
+        entry = self.entries.pop(pool_id, None)
+        if entry is None:
+            return
+        del self.pools[pool_id]
+
+        self.unindex(pool_id, entry)
+        self.remove_interval(pool_id, entry[0], entry[1])
+
+    def unindex(self, pool_id: int, entry: Tuple[int, int, int, bool]) -> None:
+        '''Removes the staked ASA and end time entries of pool_id'''
+
+        self.by_asa[entry[2]].discard(pool_id)
+        if not self.by_asa[entry[2]]:
+            del self.by_asa[entry[2]]
+        ends = self.staked_ends if entry[3] else self.empty_ends
+        del ends[bisect_left(ends, (entry[1], pool_id))]
+
+    def add_boundary(self, time: int) -> None:
+        '''Counts a use of the endpoint time, a new one splits the segment containing it'''
+
+        refs = self.boundary_refs.get(time, 0)
+        self.boundary_refs[time] = refs + 1
+        if refs:
+            return
+
+        position = bisect_left(self.boundaries, time)
+        self.boundaries.insert(position, time)
+        self.segments.insert(position, set(self.segments[position - 1]) if position else set())
+
+    def remove_boundary(self, time: int) -> None:
+        '''Drops a use of the endpoint time, when unused its segment covers the same pools of the previous one and is merged'''
+
+        refs = self.boundary_refs[time] - 1
+        if refs:
+            self.boundary_refs[time] = refs
+            return
+
+        del self.boundary_refs[time]
+        position = bisect_left(self.boundaries, time)
+        del self.boundaries[position]
+        del self.segments[position]
+
+    def add_interval(self, pool_id: int, start: int, end: int) -> None:
+        self.add_boundary(start)
+        self.add_boundary(end)
+        for position in range(bisect_left(self.boundaries, start), bisect_left(self.boundaries, end)):
+            self.segments[position].add(pool_id)
+
+    def remove_interval(self, pool_id: int, start: int, end: int) -> None:
+        for position in range(bisect_left(self.boundaries, start), bisect_left(self.boundaries, end)):
+            self.segments[position].discard(pool_id)
+        self.remove_boundary(start)
+        self.remove_boundary(end)
+
+    def active(self, timestamp: int) -> List[StakingPool]:
+        '''Pools with ST <= timestamp < ST + TD, ordered by id'''
+
+        position = bisect_right(self.boundaries, timestamp) - 1
+        if position < 0:
+            return []
+        return [self.pools[pool_id] for pool_id in sorted(self.segments[position])]
+
+    def by_staked_asa(self, staked_asa_id: int) -> List[StakingPool]:
+        return [self.pools[pool_id] for pool_id in sorted(self.by_asa.get(staked_asa_id, ()))]
+
+    def ended_before(self, ends: List[Tuple[int, int]], timestamp: int) -> List[StakingPool]:
+        '''Pools of ends with ST + TD < timestamp, ordered by end time'''
+        return [self.pools[pool_id] for _, pool_id in ends[:bisect_left(ends, (timestamp, -1))]]
+
+    def claimable(self, timestamp: int) -> List[StakingPool]:
+        '''Pools with depositors that can be claimed at timestamp (timestamp > ST + TD)'''
+        return self.ended_before(self.staked_ends, timestamp)
+
+    def deletable(self, timestamp: int) -> List[StakingPool]:
+        '''Pools the manager can delete at timestamp: ended and without depositors, or ended more than max_seconds_to_claim before'''
+        return self.ended_before(self.empty_ends, timestamp) + self.ended_before(self.staked_ends, timestamp - self.max_seconds_to_claim)
+
+    def ending_soonest(self, timestamp: int, limit: int = 10) -> List[StakingPool]:
+        '''The limit pools still running at timestamp (timestamp <= ST + TD) with the nearest end time'''
+
+        ends = []
+        for sorted_ends in (self.staked_ends, self.empty_ends):
+            first = bisect_left(sorted_ends, (timestamp, -1))
+            ends += sorted_ends[first:first + limit]
+        return [self.pools[pool_id] for _, pool_id in sorted(ends)[:limit]]
@@ -0,0 +1,113 @@
+from typing import Callable, Dict, Iterator, List
+from .typed_dict import GlobalStateChangeset
+from .staking_pool import StakingPool
+from .codec import decode_pool_id
+from .pool_index import PoolIndex, MAX_SECONDS_TO_CLAIM
+
+class PoolRegistry:
+    def __init__(self, new_pool: Callable[[str, str], StakingPool], max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        '''Keyed collection of the StakingPool objects of the application, indexed by pool id.\n
+           new_pool is called with the raw (base64) key and value of a global state record
+           every time a pool that was not known before appears.\n
+           index keeps the pools also by staked ASA, end time and activity interval, max_seconds_to_claim is the one of the contract'''
+
+        self.new_pool = new_pool
+        self.index = PoolIndex(max_seconds_to_claim)
+
+        self.by_id: Dict[int, StakingPool] = {}
+        self.raw_state: Dict[str, str] = {}
+        self.latest_id = 0
+
+    def apply(self, global_state: Dict[str, str]) -> GlobalStateChangeset:
+        '''Diffs the raw pools global state (INFO key excluded) against the previous snapshot.\n
+           Records whose encoded value has not changed are skipped without decoding them again.\n
+           Returns the ids of the pools added, changed and removed'''
+
+        changeset = GlobalStateChangeset(added=[], changed=[], removed=[])
+
+        for key in self.raw_state.keys() - global_state.keys():
+            self.remove_record(key, changeset)
+
+        for key, value in global_state.items():
+            self.set_record(key, value, changeset)
+
+        self.update_latest(changeset)
+
+        return changeset
+
+    def apply_delta(self, global_state_delta: List[dict]) -> GlobalStateChangeset:
+        '''Applies the global-state-delta of a confirmed application call (INFO key excluded) without reading the global state.\n
+           Returns the ids of the pools added, changed and removed'''
+
+        changeset = GlobalStateChangeset(added=[], changed=[], removed=[])
+
+        for item in global_state_delta:
+            if item['value']['action'] == 3:
+                self.remove_record(item['key'], changeset)
+            else:
+                self.set_record(item['key'], item['value'].get('bytes', ''), changeset)
+
+        self.update_latest(changeset)
+
+        return changeset
+
+    def set_record(self, key: str, value: str, changeset: GlobalStateChangeset) -> None:
+        previous = self.raw_state.get(key)
+        if previous == value:
+            return
+
+        if previous is None:
+            pool = self.new_pool(key, value)
+            self.by_id[pool.id] = pool
+            changeset["added"].append(pool.id)
+            if pool.id > self.latest_id:
+                self.latest_id = pool.id
+        else:
+            pool = self.by_id[decode_pool_id(key)]
+            pool.update_pool_state(key, value)
+            changeset["changed"].append(pool.id)
+
+        self.index.add(pool)
+        self.raw_state[key] = value
+
+    def remove_record(self, key: str, changeset: GlobalStateChangeset) -> None:
+        if self.raw_state.pop(key, None) is None:
+            return
+
+        pool_id = decode_pool_id(key)
+        self.by_id.pop(pool_id, None)
+        self.index.remove(pool_id)
+        changeset["removed"].append(pool_id)
+
+    def update_latest(self, changeset: GlobalStateChangeset) -> None:
+        if self.latest_id in changeset["removed"]:
+            self.latest_id = max(self.by_id, default=0)
+
+    def get(self, pool_id: int) -> 'StakingPool | None':
+        return self.by_id.get(pool_id)
+
+    @property
+    def latest(self) -> 'StakingPool | None':
+        '''The pool with the highest id (i.e. the latest created), None if there are no pools'''
+        return self.by_id.get(self.latest_id)
+
+    def ids(self) -> List[int]:
+        return list(self.by_id.keys())
+
+    def __getitem__(self, pool_id: int) -> StakingPool:
+        return self.by_id[pool_id]
+
+    def __contains__(self, pool_id: int) -> bool:
+        return pool_id in self.by_id
+
+    def __iter__(self) -> Iterator[StakingPool]:
+        return iter(list(self.by_id.values()))
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __repr__(self) -> str:
+        return str(list(self.by_id.values()))
+
+    def __str__(self) -> str:
+        return str(list(self.by_id.values()))
@@ -0,0 +1,133 @@
+from typing import Iterable, List, Tuple
+from .typed_dict import UserStakedState
+from .staking_pool import StakingPool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UINT64_MAX = 2**64 - 1
+
+def reference_claimable(total_rewards: int, to_be_claimed: int, total_score: int, user_staked: int, user_score: int) -> int:
+    '''Scalar reference of the on_claim math: UST + min(WideRatio([TR, USC], [TSC]), TBC)\n
+       A pool with TSC 0 can not be claimed by the contract (division by zero), here it gives no rewards'''
+
+    rewards = total_rewards * user_score // total_score if total_score else 0
+    if to_be_claimed < rewards:
+        rewards = to_be_claimed
+    return user_staked + rewards
+
+def wide_multiply(a: 'np.ndarray', b: 'np.ndarray') -> 'tuple[np.ndarray, np.ndarray]':
+    '''Returns the high and low uint64 words of the 128 bit products a * b, computed on 32 bit limbs'''
+
+    mask, shift = np.uint64(0xFFFFFFFF), np.uint64(32)
+    a0, a1 = a & mask, a >> shift
+    b0, b1 = b & mask, b >> shift
+
+    low_low, low_high, high_low = a0 * b0, a0 * b1, a1 * b0
+    middle = (low_low >> shift) + (low_high & mask) + (high_low & mask)
+
+    low = (low_low & mask) | ((middle & mask) << shift)
+    high = a1 * b1 + (low_high >> shift) + (high_low >> shift) + (middle >> shift)
+    return high, low
+
+def wide_divide(high: 'np.ndarray', low: 'np.ndarray', divisor: 'np.ndarray', bits: int = 64) -> 'np.ndarray':
+    '''Returns the uint64 quotients of the 128 bit numbers (high, low) by divisor, with bitwise long division.\n
+       Requires 1 <= bits <= 64 and the quotients to be lower than 2**bits (with bits = 64 this means high < divisor)'''
+
+    one, top = np.uint64(1), np.uint64(63)
+    if bits < 64:
+        remainder = (high << np.uint64(64 - bits)) | (low >> np.uint64(bits))
+        low = low << np.uint64(64 - bits)
+    else:
+        remainder, low = high.copy(), low.copy()
+
+    quotient = np.zeros(len(divisor), dtype=np.uint64)
+    for _ in range(bits):
+        carry = remainder >> top
+        remainder <<= one
+        remainder |= low >> top
+        low <<= one
+        subtract = carry | (remainder >= divisor).astype(np.uint64)
+        remainder -= divisor * subtract
+        quotient <<= one
+        quotient |= subtract
+    return quotient
+
+class RewardProjection:
+    def __init__(self, pools: Iterable[StakingPool], slots: Iterable[Tuple[str, UserStakedState]]) -> None:
+        '''Loads the pools and the (address, UserStakedState) slots (e.g. from a LocalStateScanner) in columnar uint64 arrays
+           to compute the claimable amounts of all the stakers at once. Requires numpy.\n
+           The projection uses the current TBC of each pool, so as the contract it caps the rewards of each claim to what is left in the pool.\n
+           The slots of pools that are not loaded (i.e. deleted) give no rewards, only the staked amount that can be withdrawn'''
+
+        if np is None:
+            raise ImportError("RewardProjection requires numpy")
+
+        pools = list(pools)
+        index = {pool.id: position for position, pool in enumerate(pools)}
+        #A trailing empty pool is read by the slots of missing pools through the index -1
+        self.pool_ids = np.array([pool.id for pool in pools] + [0], dtype=np.uint64)
+        self.total_rewards = np.array([pool.total_rewards for pool in pools] + [0], dtype=np.uint64)
+        self.to_be_claimed = np.array([pool.to_be_claimed for pool in pools] + [0], dtype=np.uint64)
+        self.total_score = np.array([pool.total_score for pool in pools] + [0], dtype=np.uint64)
+
+        self.addresses: List[str] = []
+        pool_index, user_staked, user_score = [], [], []
+        for address, state in slots:
+            self.addresses.append(address)
+            pool_index.append(index.get(state["POOL_ID"], -1))
+            user_staked.append(state["user_staked"])
+            user_score.append(state["user_score"])
+
+        self.pool_index = np.array(pool_index, dtype=np.int64)
+        self.user_staked = np.array(user_staked, dtype=np.uint64)
+        self.user_score = np.array(user_score, dtype=np.uint64)
+
+    def rewards(self) -> 'np.ndarray':
+        '''Returns the rewards of each slot with the exact integer semantics of WideRatio.\n
+           TR * USC is computed in uint64 where it can not overflow, the remaining rows with 128 bit limb arithmetic'''
+
+        total_rewards = self.total_rewards[self.pool_index]
+        to_be_claimed = self.to_be_claimed[self.pool_index]
+        total_score = self.total_score[self.pool_index]
+
+        max_user_score = np.full(len(self.pool_index), UINT64_MAX, dtype=np.uint64)
+        np.floor_divide(np.uint64(UINT64_MAX), total_rewards, out=max_user_score, where=total_rewards > 0)
+        fits = self.user_score <= max_user_score
+        divisible = total_score > 0
+
+        rewards = np.zeros(len(self.pool_index), dtype=np.uint64)
+        np.floor_divide(total_rewards * self.user_score, total_score, out=rewards, where=fits & divisible)
+
+        wide = np.nonzero(~fits & divisible)[0]
+        if len(wide):
+            high, low = wide_multiply(total_rewards[wide], self.user_score[wide])
+            quotient_fits = high < total_score[wide]
+            #With USC <= TSC (always true for the contract state) the quotient is at most TR, so only its bits are computed
+            bits = 64
+            if np.all(self.user_score[wide] <= total_score[wide]):
+                bits = max(1, int(total_rewards[wide].max()).bit_length())
+            rewards[wide[quotient_fits]] = wide_divide(high[quotient_fits], low[quotient_fits], total_score[wide][quotient_fits], bits)
+
+            #WideRatio fails in the contract when the result overflows, here the rewards are then capped to TBC
+            for row in wide[~quotient_fits]:
+                rewards[row] = min(int(total_rewards[row]) * int(self.user_score[row]) // int(total_score[row]), UINT64_MAX)
+
+        return np.minimum(rewards, to_be_claimed)
+
+    def claimable(self) -> 'np.ndarray':
+        '''Returns the amount (UST + rewards) each slot would receive claiming now'''
+        return self.user_staked + self.rewards()
+
+    def verify(self) -> None:
+        '''Checks every projected amount against reference_claimable\n
+           Raises Exception on the first mismatch'''
+
+        claimable = self.claimable()
+        for row, position in enumerate(self.pool_index):
+            expected = reference_claimable(int(self.total_rewards[position]), int(self.to_be_claimed[position]), int(self.total_score[position]),
+                                           int(self.user_staked[row]), int(self.user_score[row]))
+            if int(claimable[row]) != expected:
+                raise Exception("Projection mismatch for {}: {} != {}".format(self.addresses[row], int(claimable[row]), expected))
@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
+from time import time
+from typing import Dict, List, TYPE_CHECKING
+from ..utils import get_app_ids
+from ..state_backend import StateBackend, IndexerStateBackend
+from ..params_cache import SuggestedParamsCache
+from .typed_dict import UserStakedState, GlobalStateChangeset
+from .staking_pool import StakingPool
+from .codec import UserSlot
+from .staking_client import StakingClient
+from .pool_index import MAX_SECONDS_TO_CLAIM
+
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+    from algosdk.v2client.indexer import IndexerClient
+
+#Constant of pyteal/staking_contract_pyteal.py, one global key is INFO
+MAX_GLOBAL_BYTES = 64
+MAX_POOLS_PER_SHARD = MAX_GLOBAL_BYTES - 1
+
+class ShardedStakingClient:
+    def __init__(self, algod_client: 'AlgodClient', indexer_client: 'IndexerClient', chain: str, user_address: str = None, state_backend: StateBackend = None, params_cache: SuggestedParamsCache = None, app_ids: List[int] = None, max_workers: int = None, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        '''Routes the calls to N identical instances (shards) of the staking application, each holding up to MAX_POOLS_PER_SHARD pools.\n
+           New pools are created on the least loaded shard (fewest pools, then fewest depositors), deposit, claim, withdraw and delete
+           go to the shard holding the pool id. Each shard is a StakingClient, they share params_cache and state_backend
+           (an AccountSnapshotCache reads an account once for all the shards), and their global states are read in parallel with max_workers threads.\n
+           app_ids overrides the APP_IDS of chain in app_ids.json (deployed with: python deploy_contract.py --shards N)\n
+           max_seconds_to_claim is the MAX_SECONDS_TO_CLAIM the shards were deployed with'''
+
+        self.algod_client = algod_client
+        self.indexer_client = indexer_client
+        self.chain = chain
+        self.user_address = user_address
+        self.max_seconds_to_claim = max_seconds_to_claim
+
+        if state_backend is None:
+            state_backend = IndexerStateBackend(self.indexer_client)
+        self.state_backend = state_backend
+
+        if params_cache is None:
+            params_cache = SuggestedParamsCache(self.algod_client)
+        self.params_cache = params_cache
+
+        if app_ids is None:
+            app_ids = get_app_ids(self.chain)
+        if not app_ids:
+            raise Exception("No application ids for the shards of {}".format(self.chain))
+
+        self.executor = ThreadPoolExecutor(max_workers if max_workers != None else len(app_ids))
+        shards = self.executor.map(self.new_shard, app_ids)
+        self.shards: Dict[int, StakingClient] = dict(zip(app_ids, shards))
+
+    def new_shard(self, app_id: int) -> StakingClient:
+        return StakingClient(self.algod_client, self.indexer_client, self.chain, self.user_address, self.state_backend, self.params_cache, app_id, max_seconds_to_claim=self.max_seconds_to_claim)
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def update_global_state(self) -> Dict[int, GlobalStateChangeset]:
+        '''Reads the global states of all the shards in parallel\n
+           Returns the ids of the pools added, changed and removed by application id'''
+        return dict(zip(self.shards, self.executor.map(StakingClient.update_global_state, self.shards.values())))
+
+    def least_loaded_shard(self) -> StakingClient:
+        '''The shard with fewest pools, then fewest depositors\n
+           Raises Exception if all the shards are full'''
+
+        shards = [shard for shard in self.shards.values() if len(shard.pools) < MAX_POOLS_PER_SHARD]
+        if not shards:
+            raise Exception("All the {} shards hold {} pools".format(len(self.shards), MAX_POOLS_PER_SHARD))
+        return min(shards, key=lambda shard: (len(shard.pools), sum(pool.users_number for pool in shard.pools)))
+
+    def shard_of(self, pool_id: int, app_id: int = None) -> StakingClient:
+        '''The shard holding pool_id, app_id selects it when two shards have a pool with the same id (created in the same second)\n
+           Raises Exception if the pool_id is not found'''
+
+        if app_id != None:
+            if app_id not in self.shards:
+                raise Exception("Application {} is not a shard".format(app_id))
+            return self.shards[app_id]
+
+        shards = [shard for shard in self.shards.values() if pool_id in shard.pools]
+        if not shards:
+            raise Exception("Pool {} not found".format(pool_id))
+        if len(shards) > 1:
+            raise Exception("Pool {} found in the applications {}, pass its app_id".format(pool_id, [shard.app_id for shard in shards]))
+        return shards[0]
+
+    def stake_shard(self, pool_id: int, sender: str, app_id: int = None) -> StakingClient:
+        '''The shard where sender has staked in pool_id, also when the pool has been deleted\n
+           Raises Exception if the sender has not staked in pool_id'''
+
+        if app_id != None:
+            return self.shard_of(pool_id, app_id)
+
+        shards = [shard for shard in self.shards.values()
+                  if self.state_backend.is_opted_in_app(sender, shard.app_id) and shard.get_local_slot(pool_id, sender) != None]
+        if not shards:
+            raise Exception("Sender seems not have been staked in the pool")
+        if len(shards) > 1:
+            raise Exception("Pool {} staked in the applications {}, pass its app_id".format(pool_id, [shard.app_id for shard in shards]))
+        return shards[0]
+
+    def app_id_of(self, pool_id: int) -> int:
+        return self.shard_of(pool_id).app_id
+
+    def submit_create_pool(self, staking_rewards: int, start_time: int, time_delta: int, staking_asa_id: int, pk: str, sender: str = None) -> int:
+        '''Sumbmits a create_pool transaction group to the least loaded shard, opting its escrow in staking_asa_id if needed\n
+           Returns the application id of the shard'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        shard = self.least_loaded_shard()
+        if not self.state_backend.is_opted_in_asset(shard.escrow, staking_asa_id):
+            shard.submit_escrow_opt_in(staking_asa_id, pk, sender)
+        shard.submit_create_pool(staking_rewards, start_time, time_delta, staking_asa_id, pk, sender)
+        return shard.app_id
+
+    def submit_delete_pool(self, pool_id: int, pk: str, sender: str = None, app_id: int = None) -> None:
+        self.shard_of(pool_id, app_id).submit_delete_pool(pool_id, pk, sender)
+
+    def submit_deposit_in_pool(self, pool_id: int, amount: int, pk: str, sender: str = None, app_id: int = None) -> None:
+        '''Sumbmits a deposit transaction group to the shard of pool_id, opting the sender in the shard application if needed'''
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        shard = self.shard_of(pool_id, app_id)
+        if not self.state_backend.is_opted_in_app(sender, shard.app_id):
+            shard.submit_staking_app_opt_in(pk, sender)
+        shard.submit_deposit_in_pool(pool_id, amount, pk, sender)
+
+    def submit_claim_from_pool(self, pool_id: int, pk: str, sender: str = None, app_id: int = None) -> None:
+        self.shard_of(pool_id, app_id).submit_claim_from_pool(pool_id, pk, sender)
+
+    def submit_withdraw_from_pool(self, pool_id: int, pk: str, sender: str = None, app_id: int = None) -> None:
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+
+        self.stake_shard(pool_id, sender, app_id).submit_withdraw_from_pool(pool_id, pk, sender)
+
+    def get_local_slots(self, address: str = None) -> Dict[int, List[UserSlot]]:
+        '''Returns the decoded local state slots of address (by default the client user_address) by application id of the shards it is opted in'''
+
+        if address == None and self.user_address != None:
+            address = self.user_address
+
+        return {app_id: shard.get_local_slots(address) for app_id, shard in self.shards.items() if self.state_backend.is_opted_in_app(address, app_id)}
+
+    def get_formatted_local_state(self, address: str = None) -> List[UserStakedState]:
+        return [slot.json() for slots in self.get_local_slots(address).values() for slot in slots]
+
+    def get_pools(self) -> List[StakingPool]:
+        '''The pools of all the shards ordered by id'''
+        return list(merge(*(sorted(shard.pools, key=lambda pool: pool.id) for shard in self.shards.values()), key=lambda pool: pool.id))
+
+    def get_pool_from_id(self, pool_id: int, app_id: int = None) -> StakingPool:
+        '''Raises Exception if the pool_id is not found'''
+        return self.shard_of(pool_id, app_id).get_pool_from_id(pool_id)
+
+    def get_active_pools(self, timestamp: int = None) -> List[StakingPool]:
+        timestamp = timestamp if timestamp != None else int(time())
+        return [pool for shard in self.shards.values() for pool in shard.get_active_pools(timestamp)]
+
+    def get_pools_by_staked_asa(self, staked_asa_id: int) -> List[StakingPool]:
+        return list(merge(*(shard.get_pools_by_staked_asa(staked_asa_id) for shard in self.shards.values()), key=lambda pool: pool.id))
+
+    def get_claimable_pools(self, timestamp: int = None) -> List[StakingPool]:
+        timestamp = timestamp if timestamp != None else int(time())
+        return list(merge(*(shard.get_claimable_pools(timestamp) for shard in self.shards.values()), key=lambda pool: pool.start_time + pool.time_delta))
+
+    def get_deletable_pools(self, timestamp: int = None) -> List[StakingPool]:
+        timestamp = timestamp if timestamp != None else int(time())
+        return [pool for shard in self.shards.values() for pool in shard.get_deletable_pools(timestamp)]
+
+    def get_pools_ending_soonest(self, timestamp: int = None, limit: int = 10) -> List[StakingPool]:
+        timestamp = timestamp if timestamp != None else int(time())
+        pools = merge(*(shard.get_pools_ending_soonest(timestamp, limit) for shard in self.shards.values()), key=lambda pool: pool.start_time + pool.time_delta)
+        return [pool for pool, _ in zip(pools, range(limit))]
\ No newline at end of file
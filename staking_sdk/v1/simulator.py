@@ -0,0 +1,807 @@
+from typing import Dict, List
+from base64 import b64encode, b64decode
+from copy import copy
+from time import time
+import msgpack
+from algosdk import constants
+from algosdk.encoding import encode_address, decode_address
+from algosdk.error import AlgodHTTPError
+from algosdk.future.transaction import SuggestedParams, Transaction, OnComplete, calculate_group_id
+from algosdk.logic import get_application_address
+from ..utils import int_to_bytes
+from ..contract_strings import GlobalKey, StakingArguments
+
+#Constants of pyteal/staking_contract_pyteal.py
+TX_FEE = 1000
+MIN_AMOUNT_PER_ASA = 100000
+MAX_LOCAL_BYTES = 4
+MAX_GLOBAL_BYTES = 64
+MAX_SECONDS_TO_CLAIM = int(60*60*24*365)
+
+UINT64_MAX = 2**64 - 1
+ZERO_ADDRESS = encode_address(bytes(32))
+INFO = GlobalKey.info.encode()
+GENESIS_HASH = b64encode(bytes(32)).decode()
+GENESIS_ID = "simnet-v1"
+
+MISSING = object()
+
+class Rejected(Exception):
+    '''A transaction of the group failed, the whole group is discarded'''
+
+def u64(value: int) -> int:
+    '''Checks value as a TEAL uint64 arithmetic result (overflow and underflow panic)'''
+    if value < 0 or value > UINT64_MAX:
+        raise Rejected("uint64 overflow")
+    return value
+
+def itob(value: int) -> bytes:
+    return int_to_bytes(u64(value))
+
+def btoi(value: bytes) -> int:
+    if len(value) > 8:
+        raise Rejected("btoi arg too long")
+    return int.from_bytes(value, "big")
+
+def extract(value: bytes, start: int, length: int) -> bytes:
+    if not isinstance(value, bytes) or start + length > len(value):
+        raise Rejected("extract range beyond length of string")
+    return value[start:start + length]
+
+def extract_uint64(value: bytes, start: int) -> int:
+    return int.from_bytes(extract(value, start, 8), "big")
+
+def key_value(state: Dict[bytes, bytes]) -> List[dict]:
+    '''Formats a key-value store as returned by algod and the indexer'''
+    return [{"key": b64encode(key).decode(), "value": {"type": 1, "bytes": b64encode(value).decode(), "uint": 0}} for key, value in state.items()]
+
+def state_delta(before: Dict[bytes, bytes], after: Dict[bytes, bytes]) -> List[dict]:
+    '''Formats the changes between two key-value stores as an algod EvalDelta (action 1 set bytes, 3 delete)'''
+    delta = []
+    for key in before.keys() - after.keys():
+        delta.append({"key": b64encode(key).decode(), "value": {"action": 3}})
+    for key, value in after.items():
+        if before.get(key) != value:
+            delta.append({"key": b64encode(key).decode(), "value": {"action": 1, "bytes": b64encode(value).decode()}})
+    return delta
+
+def block_delta(delta: List[dict]) -> Dict[bytes, dict]:
+    '''Formats an algod EvalDelta as stored in the blocks (raw keys, "at" action, "bs" bytes)'''
+    return {b64decode(item["key"]): ({"at": 1, "bs": b64decode(item["value"]["bytes"])} if item["value"]["action"] == 1 else {"at": 3})
+            for item in delta}
+
+#Transaction fields as read by the contract through Gtxn, zero values when the field does not belong to the type
+def pay_amount(txn: Transaction) -> int:
+    return txn.amt if txn.type == constants.payment_txn else 0
+
+def pay_receiver(txn: Transaction) -> str:
+    return txn.receiver if txn.type == constants.payment_txn else ZERO_ADDRESS
+
+def close_remainder_to(txn: Transaction) -> str:
+    return (txn.close_remainder_to or ZERO_ADDRESS) if txn.type == constants.payment_txn else ZERO_ADDRESS
+
+def asset_amount(txn: Transaction) -> int:
+    return txn.amount if txn.type == constants.assettransfer_txn else 0
+
+def asset_receiver(txn: Transaction) -> str:
+    return txn.receiver if txn.type == constants.assettransfer_txn else ZERO_ADDRESS
+
+def xfer_asset(txn: Transaction) -> int:
+    return txn.index if txn.type == constants.assettransfer_txn else 0
+
+def asset_close_to(txn: Transaction) -> str:
+    return (txn.close_assets_to or ZERO_ADDRESS) if txn.type == constants.assettransfer_txn else ZERO_ADDRESS
+
+def rekey_to(txn: Transaction) -> str:
+    return txn.rekey_to or ZERO_ADDRESS
+
+def app_args(txn: Transaction) -> List[bytes]:
+    return (txn.app_args or []) if txn.type == constants.appcall_txn else []
+
+def foreign_assets(txn: Transaction) -> List[int]:
+    return (txn.foreign_assets or []) if txn.type == constants.appcall_txn else []
+
+def accounts(txn: Transaction) -> List[str]:
+    return (txn.accounts or []) if txn.type == constants.appcall_txn else []
+
+def ungrouped(txn: Transaction) -> Transaction:
+    txn = copy(txn)
+    txn.group = None
+    return txn
+
+class Ledger:
+    def __init__(self, clock=time) -> None:
+        '''In memory accounts, assets and applications state.\n
+           Every write goes through write(), that keeps an undo log while a group is evaluated to discard it on failure'''
+
+        self.clock = clock
+        self.time_offset = 0
+        self.round = 1
+        self.latest_timestamp = int(clock())
+
+        self.algos: Dict[str, int] = {}
+        self.assets: Dict[str, Dict[int, int]] = {}
+        self.local: Dict[str, Dict[int, Dict[bytes, bytes]]] = {}
+        self.globals: Dict[int, Dict[bytes, bytes]] = {}
+        self.undo: list = None
+
+    def write(self, container: dict, key, value) -> None:
+        if self.undo is not None:
+            self.undo.append((container, key, container.get(key, MISSING)))
+        if value is MISSING:
+            container.pop(key, None)
+        else:
+            container[key] = value
+
+    def rollback(self, position: int = 0) -> None:
+        while len(self.undo) > position:
+            container, key, value = self.undo.pop()
+            if value is MISSING:
+                container.pop(key, None)
+            else:
+                container[key] = value
+
+    def new_round(self) -> None:
+        self.round += 1
+        self.latest_timestamp = max(self.latest_timestamp, int(self.clock()) + self.time_offset)
+
+    def pay(self, sender: str, receiver: str, amount: int, fee: int = 0) -> None:
+        if self.algos.get(sender, 0) < amount + fee:
+            raise Rejected("{} balance below {}".format(sender, amount + fee))
+        self.write(self.algos, sender, self.algos.get(sender, 0) - amount - fee)
+        self.write(self.algos, receiver, self.algos.get(receiver, 0) + amount)
+
+    def is_opted_in_asset(self, address: str, asa_id: int) -> bool:
+        return asa_id in self.assets.get(address, {})
+
+    def opt_in_asset(self, address: str, asa_id: int) -> None:
+        if address not in self.assets:
+            self.write(self.assets, address, {})
+        if asa_id not in self.assets[address]:
+            self.write(self.assets[address], asa_id, 0)
+
+    def transfer_asset(self, sender: str, receiver: str, asa_id: int, amount: int) -> None:
+        if not self.is_opted_in_asset(sender, asa_id) or not self.is_opted_in_asset(receiver, asa_id):
+            raise Rejected("asset {} missing from {}".format(asa_id, sender if not self.is_opted_in_asset(sender, asa_id) else receiver))
+        if self.assets[sender][asa_id] < amount:
+            raise Rejected("underflow on subtracting {} from sender amount {}".format(amount, self.assets[sender][asa_id]))
+        self.write(self.assets[sender], asa_id, self.assets[sender][asa_id] - amount)
+        self.write(self.assets[receiver], asa_id, self.assets[receiver][asa_id] + amount)
+
+    def local_state(self, address: str, app_id: int) -> 'Dict[bytes, bytes] | None':
+        return self.local.get(address, {}).get(app_id)
+
+class StakingAppModel:
+    def __init__(self, ledger: Ledger, app_id: int, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        '''Pure Python model of approval_program and clear_state_program of pyteal/staking_contract_pyteal.py\n
+           Each method mirrors the respective branch of the PyTeal source, with the same asserts and byte layouts'''
+
+        self.ledger = ledger
+        self.app_id = app_id
+        self.escrow = get_application_address(app_id)
+        self.max_seconds_to_claim = max_seconds_to_claim
+
+    @property
+    def state(self) -> Dict[bytes, bytes]:
+        return self.ledger.globals[self.app_id]
+
+    @property
+    def manager(self) -> str:
+        return encode_address(extract(self.state[INFO], 0, 32))
+
+    def global_put(self, key: bytes, value: bytes) -> None:
+        if key not in self.state and len(self.state) >= MAX_GLOBAL_BYTES:
+            raise Rejected("store bytes count {} exceeds schema bytes count {}".format(len(self.state) + 1, MAX_GLOBAL_BYTES))
+        self.ledger.write(self.state, key, value)
+
+    def global_get(self, key: bytes) -> bytes:
+        return self.state.get(key, b"")
+
+    def local_put(self, account: str, key: bytes, value: bytes) -> None:
+        local = self.ledger.local_state(account, self.app_id)
+        if local is None:
+            raise Rejected("{} has not opted in to app {}".format(account, self.app_id))
+        if key not in local and len(local) >= MAX_LOCAL_BYTES:
+            raise Rejected("store bytes count {} exceeds schema bytes count {}".format(len(local) + 1, MAX_LOCAL_BYTES))
+        self.ledger.write(local, key, value)
+
+    def local_get(self, account: str, key: bytes) -> bytes:
+        local = self.ledger.local_state(account, self.app_id)
+        if local is None:
+            raise Rejected("{} has not opted in to app {}".format(account, self.app_id))
+        return local.get(key, b"")
+
+    def local_del(self, account: str, key: bytes) -> None:
+        self.ledger.write(self.ledger.local_state(account, self.app_id), key, MISSING)
+
+    def has_local_key(self, account: str, key: bytes) -> bool:
+        local = self.ledger.local_state(account, self.app_id)
+        return local is not None and key in local
+
+    def search_pool_id(self, pool_id: bytes, account: str) -> int:
+        for i in range(1, MAX_LOCAL_BYTES + 1):
+            if self.has_local_key(account, itob(i)) and extract(self.local_get(account, itob(i)), 0, 8) == pool_id:
+                return i
+        return 0
+
+    def find_first_free(self, account: str) -> int:
+        for i in range(1, MAX_LOCAL_BYTES + 1):
+            if not self.has_local_key(account, itob(i)):
+                return i
+        return 0
+
+    def TR(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 0)
+
+    def UN(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 8)
+
+    def TBC(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 16)
+
+    def TS(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 24)
+
+    def TSC(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 32)
+
+    def ST(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 40)
+
+    def TD(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 48)
+
+    def CID_G(self, key: bytes) -> int:
+        return extract_uint64(self.global_get(key), 56)
+
+    def UST(self, account: str, key: bytes) -> int:
+        return extract_uint64(self.local_get(account, key), 8)
+
+    def USC(self, account: str, key: bytes) -> int:
+        return extract_uint64(self.local_get(account, key), 16)
+
+    def CID_L(self, account: str, key: bytes) -> int:
+        return extract_uint64(self.local_get(account, key), 24)
+
+    def inner_asset_transfer(self, receiver: str, asa_id: int, amount: int, fee: int, inner_txns: list) -> None:
+        self.ledger.pay(self.escrow, self.escrow, 0, fee)
+        if receiver == self.escrow and amount == 0:
+            self.ledger.opt_in_asset(self.escrow, asa_id)
+        else:
+            self.ledger.transfer_asset(self.escrow, receiver, asa_id, amount)
+        inner_txns.append({"txn": {"txn": {"type": constants.assettransfer_txn, "snd": self.escrow, "arcv": receiver,
+                                           "aamt": amount, "xaid": asa_id, "fee": fee}}})
+
+    def approval(self, group: List[Transaction], txn: Transaction, inner_txns: list) -> None:
+        '''Raises Rejected where the approval program rejects or panics'''
+
+        on_complete = int(txn.on_complete)
+        if on_complete == OnComplete.OptInOC:
+            return
+        if on_complete == OnComplete.CloseOutOC:
+            return self.handle_closeout(group, txn)
+        if on_complete in (OnComplete.UpdateApplicationOC, OnComplete.DeleteApplicationOC):
+            raise Rejected("rejected by logic")
+
+        args = app_args(txn)
+        handlers = {(1, StakingArguments.optin): self.opt_in_asset,
+                    (3, StakingArguments.create): self.on_pool_create,
+                    (2, StakingArguments.deposit): self.on_deposit,
+                    (2, StakingArguments.claim): self.on_claim,
+                    (2, StakingArguments.withdraw): self.on_withdrawal,
+                    (2, StakingArguments.delete): self.on_pool_delete}
+        handler = handlers.get((len(args), args[0].decode(errors="replace") if args else None))
+        if on_complete != OnComplete.NoOpOC or handler is None:
+            raise Rejected("err opcode executed")
+
+        handler(group, txn, args, inner_txns)
+
+    def require(self, *conditions) -> None:
+        if not all(conditions):
+            raise Rejected("assert failed")
+
+    def opt_in_asset(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        self.require(len(group) == 2, len(foreign_assets(txn)) == 1)
+        self.require(
+            group[0].type == constants.payment_txn,
+            pay_amount(group[0]) == MIN_AMOUNT_PER_ASA + TX_FEE,
+            pay_receiver(group[0]) == self.escrow,
+            rekey_to(group[0]) == ZERO_ADDRESS,
+            close_remainder_to(group[0]) == ZERO_ADDRESS,
+            group[0].sender == self.manager,
+            group[1].type == constants.appcall_txn,
+            group[1].sender == group[0].sender,
+            rekey_to(group[1]) == ZERO_ADDRESS,
+            not self.ledger.is_opted_in_asset(self.escrow, foreign_assets(txn)[0]))
+
+        self.inner_asset_transfer(self.escrow, foreign_assets(txn)[0], 0, TX_FEE, inner_txns)
+
+    def handle_closeout(self, group: List[Transaction], txn: Transaction) -> None:
+        self.require(len(group) == 1, rekey_to(txn) == ZERO_ADDRESS)
+
+        for i in range(1, MAX_LOCAL_BYTES + 1):
+            if self.has_local_key(txn.sender, itob(i)):
+                raise Rejected("rejected by logic")
+
+    def on_pool_create(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        self.require(len(group) == 2, len(foreign_assets(txn)) == 1)
+        timestamp = self.ledger.latest_timestamp
+        self.require(
+            self.ledger.is_opted_in_asset(self.escrow, foreign_assets(txn)[0]),
+            len(accounts(txn)) == 0,
+            txn.sender == self.manager,
+            group[0].type == constants.assettransfer_txn,
+            asset_receiver(group[0]) == self.escrow,
+            xfer_asset(group[0]) == foreign_assets(txn)[0],
+            asset_amount(group[0]) != 0,
+            rekey_to(group[0]) == ZERO_ADDRESS,
+            asset_close_to(group[0]) == ZERO_ADDRESS,
+            group[1].type == constants.appcall_txn,
+            rekey_to(group[1]) == ZERO_ADDRESS,
+            group[0].sender == group[1].sender,
+            itob(timestamp) not in self.state)
+
+        start_time = btoi(args[1])
+        if start_time < timestamp:
+            start_time = timestamp
+
+        self.global_put(
+            itob(timestamp),
+            itob(asset_amount(group[0])) +
+            itob(0) +
+            itob(asset_amount(group[0])) +
+            itob(0) +
+            itob(0) +
+            itob(start_time) +
+            args[2] +
+            itob(foreign_assets(txn)[0]))
+
+        self.global_put(INFO, extract(self.state[INFO], 0, 32) + itob(extract_uint64(self.state[INFO], 32) + 1))
+
+    def on_deposit(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        key, timestamp = args[1], self.ledger.latest_timestamp
+        self.require(len(group) == 2, len(foreign_assets(txn)) == 1)
+        self.require(
+            len(accounts(txn)) == 0,
+            group[0].type == constants.assettransfer_txn,
+            asset_receiver(group[0]) == self.escrow,
+            xfer_asset(group[0]) == foreign_assets(txn)[0],
+            asset_amount(group[0]) != 0,
+            rekey_to(group[0]) == ZERO_ADDRESS,
+            asset_close_to(group[0]) == ZERO_ADDRESS,
+            group[1].type == constants.appcall_txn,
+            rekey_to(group[1]) == ZERO_ADDRESS,
+            group[0].sender == group[1].sender,
+            key in self.state)
+        self.require(
+            foreign_assets(txn)[0] == self.CID_G(key),
+            timestamp < u64(self.ST(key) + self.TD(key)))
+
+        if timestamp <= self.ST(key):
+            relative_time = self.TD(key)
+        else:
+            relative_time = u64(u64(self.TD(key) + self.ST(key)) - timestamp)
+
+        amount = asset_amount(group[0])
+        score = u64(relative_time * amount)
+        record = self.global_get(key)
+
+        i = self.search_pool_id(key, txn.sender)
+        if i != 0:
+            self.local_put(txn.sender, itob(i),
+                key +
+                itob(self.UST(txn.sender, itob(i)) + amount) +
+                itob(self.USC(txn.sender, itob(i)) + score) +
+                itob(foreign_assets(txn)[0]))
+
+            self.global_put(key,
+                extract(record, 0, 24) +
+                itob(self.TS(key) + amount) +
+                itob(self.TSC(key) + score) +
+                extract(record, 40, 24))
+        else:
+            i = self.find_first_free(txn.sender)
+            if i == 0:
+                raise Rejected("rejected by logic")
+
+            self.local_put(txn.sender, itob(i),
+                key +
+                itob(amount) +
+                itob(score) +
+                itob(foreign_assets(txn)[0]))
+
+            self.global_put(key,
+                extract(record, 0, 8) +
+                itob(self.UN(key) + 1) +
+                extract(record, 16, 8) +
+                itob(self.TS(key) + amount) +
+                itob(self.TSC(key) + score) +
+                extract(record, 40, 24))
+
+    def on_claim(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        key, timestamp = args[1], self.ledger.latest_timestamp
+        i = self.search_pool_id(key, txn.sender)
+
+        self.require(len(group) == 1, len(foreign_assets(txn)) == 1)
+        self.require(
+            len(accounts(txn)) == 0,
+            txn.type == constants.appcall_txn,
+            txn.fee == 2*TX_FEE,
+            rekey_to(txn) == ZERO_ADDRESS,
+            key in self.state,
+            i != 0)
+        self.require(
+            foreign_assets(txn)[0] == self.CID_G(key),
+            timestamp > u64(self.ST(key) + self.TD(key)))
+
+        if self.TSC(key) == 0:
+            raise Rejected("divide by zero")
+        rewards = u64(self.TR(key) * self.USC(txn.sender, itob(i)) // self.TSC(key))
+
+        if self.TBC(key) < rewards:
+            rewards = self.TBC(key)
+
+        self.inner_asset_transfer(txn.sender, foreign_assets(txn)[0], u64(self.UST(txn.sender, itob(i)) + rewards), 0, inner_txns)
+
+        self.local_del(txn.sender, itob(i))
+
+        record = self.global_get(key)
+        self.global_put(key,
+            extract(record, 0, 8) +
+            itob(self.UN(key) - 1) +
+            itob(self.TBC(key) - rewards) +
+            extract(record, 24, 40))
+
+    def on_withdrawal(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        key = args[1]
+        i = self.search_pool_id(key, txn.sender)
+
+        self.require(len(group) == 1, len(foreign_assets(txn)) == 1)
+        self.require(
+            len(accounts(txn)) == 0,
+            txn.type == constants.appcall_txn,
+            txn.fee == 2*TX_FEE,
+            rekey_to(txn) == ZERO_ADDRESS,
+            key not in self.state,
+            i != 0)
+        self.require(foreign_assets(txn)[0] == self.CID_L(txn.sender, itob(i)))
+
+        self.inner_asset_transfer(txn.sender, foreign_assets(txn)[0], self.UST(txn.sender, itob(i)), 0, inner_txns)
+
+        self.local_del(txn.sender, itob(i))
+
+    def on_pool_delete(self, group: List[Transaction], txn: Transaction, args: List[bytes], inner_txns: list) -> None:
+        key, timestamp = args[1], self.ledger.latest_timestamp
+
+        self.require(len(group) == 1, len(foreign_assets(txn)) == 1)
+        self.require(
+            len(accounts(txn)) == 0,
+            txn.sender == self.manager,
+            txn.type == constants.appcall_txn,
+            txn.fee == 2*TX_FEE,
+            rekey_to(txn) == ZERO_ADDRESS,
+            key in self.state)
+        end = u64(self.ST(key) + self.TD(key))
+        self.require(
+            foreign_assets(txn)[0] == self.CID_G(key),
+            timestamp > end,
+            self.UN(key) == 0 or timestamp > u64(end + self.max_seconds_to_claim))
+
+        self.inner_asset_transfer(txn.sender, foreign_assets(txn)[0], self.TBC(key), 0, inner_txns)
+
+        self.ledger.write(self.state, key, MISSING)
+
+        self.global_put(INFO, extract(self.state[INFO], 0, 32) + itob(extract_uint64(self.state[INFO], 32) - 1))
+
+    def clear_state(self, txn: Transaction) -> None:
+        '''Raises Rejected where the clear state program panics, the local state is cleared anyway by the caller'''
+
+        for i in range(1, MAX_LOCAL_BYTES + 1):
+            if self.has_local_key(txn.sender, itob(i)):
+                pool_id = extract(self.local_get(txn.sender, itob(i)), 0, 8)
+                if pool_id in self.state:
+                    record = self.global_get(pool_id)
+                    self.global_put(pool_id,
+                        extract(record, 0, 8) +
+                        itob(self.UN(pool_id) - 1) +
+                        extract(record, 16, 8) +
+                        itob(self.TS(pool_id) - self.UST(txn.sender, itob(i))) +
+                        itob(self.TSC(pool_id) - self.USC(txn.sender, itob(i))) +
+                        extract(record, 40, 24))
+
+class SimulatedNetwork:
+    def __init__(self, clock=time) -> None:
+        '''In process network running the staking application model, each submitted group is confirmed in a new round.\n
+           Use network.algod and network.indexer in place of AlgodClient and IndexerClient, e.g.
+           StakingClient(network.algod, network.indexer, "testnet", app_id=network.create_staking_app(manager)).\n
+           Signatures are not verified and the minimum balances are not enforced'''
+
+        self.ledger = Ledger(clock)
+        self.apps: Dict[int, StakingAppModel] = {}
+        self.creators: Dict[int, str] = {}
+        self.asset_creators: Dict[int, str] = {}
+        self.next_index = 1000
+        self.results: Dict[str, dict] = {}
+        self.blocks: Dict[int, dict] = {self.ledger.round: self.block_header()}
+
+        self.algod = SimulatedAlgod(self)
+        self.indexer = SimulatedIndexer(self)
+
+    def advance_time(self, seconds: int) -> None:
+        '''Moves forward the clock of the next blocks'''
+        self.ledger.time_offset += seconds
+
+    def block_header(self) -> dict:
+        return {"rnd": self.ledger.round, "ts": self.ledger.latest_timestamp, "gen": GENESIS_ID, "gh": b64decode(GENESIS_HASH), "txns": []}
+
+    def new_block(self) -> None:
+        self.ledger.new_round()
+        self.blocks[self.ledger.round] = self.block_header()
+
+    def fund(self, address: str, amount: int) -> None:
+        self.ledger.write(self.ledger.algos, address, self.ledger.algos.get(address, 0) + amount)
+
+    def create_asset(self, creator: str, total: int) -> int:
+        self.next_index += 1
+        self.asset_creators[self.next_index] = creator
+        self.ledger.opt_in_asset(creator, self.next_index)
+        self.ledger.write(self.ledger.assets[creator], self.next_index, total)
+        return self.next_index
+
+    def create_staking_app(self, manager: str, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> int:
+        '''Deploys the staking application with manager hardcoded as MANAGER_ADDRESS and returns its id'''
+
+        self.next_index += 1
+        self.apps[self.next_index] = StakingAppModel(self.ledger, self.next_index, max_seconds_to_claim)
+        self.creators[self.next_index] = manager
+        self.ledger.globals[self.next_index] = {INFO: decode_address(manager) + itob(0)}
+        return self.next_index
+
+    def execute(self, group: list) -> str:
+        '''Evaluates atomically a signed group in a new round and returns the first txid\n
+           Raises AlgodHTTPError as algod when the group is rejected, the round is then not produced'''
+
+        txns = []
+        for stxn in group:
+            if isinstance(stxn, Transaction) or not hasattr(stxn, "transaction"):
+                raise AlgodHTTPError("Attempt to send UNSIGNED transaction {}".format(stxn), 400)
+            txns.append(stxn.transaction)
+
+        txids = [stxn.get_txid() for stxn in group]
+        for txid in txids:
+            if txid in self.results:
+                raise AlgodHTTPError("transaction already in ledger: {}".format(txid), 400)
+
+        ledger = self.ledger
+        timestamp = ledger.latest_timestamp
+        self.new_block()
+        ledger.undo = []
+        try:
+            if len(txns) > 1:
+                group_id = calculate_group_id([ungrouped(txn) for txn in txns])
+                if any(txn.group != group_id for txn in txns):
+                    raise Rejected("incomplete group")
+
+            infos, fees, fees_required = [], 0, 0
+            for index, txn in enumerate(txns):
+                if not txn.first_valid_round <= ledger.round <= txn.last_valid_round:
+                    raise Rejected("txn dead: round {} outside of {}--{}".format(ledger.round, txn.first_valid_round, txn.last_valid_round))
+                ledger.pay(txn.sender, txn.sender, 0, txn.fee)
+                info = {"confirmed-round": ledger.round, "pool-error": "",
+                        "txn": {"txn": {"type": txn.type, "snd": txn.sender, "fee": txn.fee}}}
+                fees, fees_required = fees + txn.fee, fees_required + TX_FEE
+
+                if txn.type == constants.payment_txn:
+                    ledger.pay(txn.sender, txn.receiver, txn.amt)
+                    if txn.close_remainder_to:
+                        ledger.pay(txn.sender, txn.close_remainder_to, ledger.algos[txn.sender])
+                elif txn.type == constants.assettransfer_txn:
+                    if txn.sender == txn.receiver and txn.amount == 0 and not ledger.is_opted_in_asset(txn.sender, txn.index):
+                        ledger.opt_in_asset(txn.sender, txn.index)
+                    else:
+                        ledger.transfer_asset(txn.sender, txn.receiver, txn.index, txn.amount)
+                    if txn.close_assets_to:
+                        ledger.transfer_asset(txn.sender, txn.close_assets_to, txn.index, ledger.assets[txn.sender][txn.index])
+                        ledger.write(ledger.assets[txn.sender], txn.index, MISSING)
+                elif txn.type == constants.appcall_txn:
+                    inner_txns = self.application_call(txns, txn, info)
+                    for inner in inner_txns:
+                        fees, fees_required = fees + inner["txn"]["txn"]["fee"], fees_required + TX_FEE
+                    info["inner-txns"] = inner_txns
+                else:
+                    raise Rejected("transaction type {} not supported by the simulator".format(txn.type))
+
+                infos.append(info)
+
+            if fees < fees_required:
+                raise Rejected("fee too small: {} < {}".format(fees, fees_required))
+        except Rejected as e:
+            ledger.rollback()
+            del self.blocks[ledger.round]
+            ledger.round -= 1
+            ledger.latest_timestamp = timestamp
+            raise AlgodHTTPError("TransactionPool.Remember: transaction {}: {}".format(txids[0], e), 400)
+        finally:
+            ledger.undo = None
+
+        self.results.update(zip(txids, infos))
+        self.blocks[ledger.round]["txns"] += [self.block_txn(stxn, info) for stxn, info in zip(group, infos)]
+        return txids[0]
+
+    def block_txn(self, stxn, info: dict) -> dict:
+        '''Signed transaction with apply data as stored in a block, without the genesis id and hash of the block header'''
+
+        block_txn = stxn.dictify()
+        block_txn["txn"] = {key: value for key, value in block_txn["txn"].items() if key not in ("gen", "gh")}
+        block_txn["hgi"] = True
+        if "global-state-delta" in info:
+            block_txn["dt"] = {"gd": block_delta(info["global-state-delta"]),
+                               "ld": {0: block_delta(local["delta"]) for local in info["local-state-delta"]}}
+        return block_txn
+
+    def application_call(self, txns: List[Transaction], txn: Transaction, info: dict) -> list:
+        ledger = self.ledger
+        app = self.apps.get(txn.index)
+        if app is None:
+            raise Rejected("application {} does not exist".format(txn.index))
+        info["txn"]["txn"].update({"apid": txn.index, "apan": int(txn.on_complete),
+                                   "apaa": [b64encode(arg).decode() for arg in app_args(txn)]})
+
+        on_complete = int(txn.on_complete)
+        if on_complete == OnComplete.OptInOC:
+            if ledger.local_state(txn.sender, txn.index) is not None:
+                raise Rejected("{} has already opted in to app {}".format(txn.sender, txn.index))
+            if txn.sender not in ledger.local:
+                ledger.write(ledger.local, txn.sender, {})
+            ledger.write(ledger.local[txn.sender], txn.index, {})
+        elif ledger.local_state(txn.sender, txn.index) is None and on_complete in (OnComplete.CloseOutOC, OnComplete.ClearStateOC):
+            raise Rejected("{} is not opted in to app {}".format(txn.sender, txn.index))
+
+        global_before = dict(app.state)
+        local_before = dict(ledger.local_state(txn.sender, txn.index) or {})
+        inner_txns = []
+
+        if on_complete == OnComplete.ClearStateOC:
+            position = len(ledger.undo)
+            try:
+                app.clear_state(txn)
+            except Rejected:
+                ledger.rollback(position)
+        else:
+            app.approval(txns, txn, inner_txns)
+
+        #As algod, the delta holds only the keys written by the program: removing the local state is not reported
+        local_delta = state_delta(local_before, ledger.local_state(txn.sender, txn.index) or {})
+        if on_complete in (OnComplete.CloseOutOC, OnComplete.ClearStateOC):
+            ledger.write(ledger.local[txn.sender], txn.index, MISSING)
+
+        info["global-state-delta"] = state_delta(global_before, app.state)
+        info["local-state-delta"] = [{"address": txn.sender, "delta": local_delta}] if local_delta else []
+        return inner_txns
+
+    def account(self, address: str) -> dict:
+        '''Account as returned by algod /v2/accounts/{address}'''
+
+        ledger = self.ledger
+        apps_local_state = []
+        for app_id, local in ledger.local.get(address, {}).items():
+            app_local_state = {"id": app_id, "schema": {"num-byte-slice": MAX_LOCAL_BYTES, "num-uint": 0}}
+            if local:
+                app_local_state["key-value"] = key_value(local)
+            apps_local_state.append(app_local_state)
+
+        return {"address": address,
+                "amount": ledger.algos.get(address, 0),
+                "round": ledger.round,
+                "assets": [{"asset-id": asa_id, "amount": amount, "is-frozen": False, "creator": self.asset_creators.get(asa_id, "")}
+                           for asa_id, amount in ledger.assets.get(address, {}).items()],
+                "apps-local-state": apps_local_state}
+
+    def application(self, app_id: int) -> dict:
+        '''Application as returned by algod /v2/applications/{app_id}'''
+
+        if app_id not in self.apps:
+            raise AlgodHTTPError("application does not exist", 404)
+        return {"id": app_id,
+                "params": {"creator": self.creators[app_id],
+                           "global-state": key_value(self.ledger.globals[app_id]),
+                           "global-state-schema": {"num-byte-slice": MAX_GLOBAL_BYTES, "num-uint": 0},
+                           "local-state-schema": {"num-byte-slice": MAX_LOCAL_BYTES, "num-uint": 0}}}
+
+class SimulatedAlgod:
+    def __init__(self, network: SimulatedNetwork) -> None:
+        '''AlgodClient shaped view of a SimulatedNetwork'''
+        self.network = network
+
+    def suggested_params(self, **kwargs) -> SuggestedParams:
+        ledger_round = self.network.ledger.round
+        return SuggestedParams(0, ledger_round, ledger_round + 1000, GENESIS_HASH, GENESIS_ID, False, "simnet", TX_FEE)
+
+    def send_transaction(self, txn, **kwargs) -> str:
+        return self.network.execute([txn])
+
+    def send_transactions(self, txns, **kwargs) -> str:
+        return self.network.execute(list(txns))
+
+    def pending_transaction_info(self, transaction_id: str, **kwargs) -> dict:
+        if transaction_id not in self.network.results:
+            raise AlgodHTTPError("txn does not exist", 404)
+        return self.network.results[transaction_id]
+
+    def status(self, **kwargs) -> dict:
+        return {"last-round": self.network.ledger.round, "time-since-last-round": 0, "catchup-time": 0}
+
+    def status_after_block(self, block_num: int = None, round_num: int = None, **kwargs) -> dict:
+        '''Produces empty blocks until the round after block_num'''
+        target = block_num if block_num is not None else round_num
+        while self.network.ledger.round <= target:
+            self.network.new_block()
+        return self.status()
+
+    def account_info(self, address: str, **kwargs) -> dict:
+        return self.network.account(address)
+
+    def block_info(self, block: int = None, response_format: str = "json", round_num: int = None, **kwargs) -> bytes:
+        '''Serves the blocks in msgpack only, each block records its timestamp and the confirmed transactions with their state deltas'''
+
+        block_round = block if block is not None else round_num
+        if response_format != "msgpack":
+            raise AlgodHTTPError("the simulator serves blocks only with format msgpack", 400)
+        if block_round not in self.network.blocks:
+            raise AlgodHTTPError("failed to retrieve information from the ledger", 404)
+        return msgpack.packb({"block": self.network.blocks[block_round]}, use_bin_type=True)
+
+    def application_info(self, application_id: int, **kwargs) -> dict:
+        return self.network.application(application_id)
+
+    def algod_request(self, method: str, requrl: str, params: dict = None, data: bytes = None, headers: dict = None, response_format: str = "json") -> dict:
+        '''Serves the per account application and asset endpoints'''
+
+        parts = requrl.strip("/").split("/")
+        if method == "GET" and len(parts) == 4 and parts[0] == "accounts":
+            address, kind, index = parts[1], parts[2], int(parts[3])
+            if kind == "applications":
+                local = self.network.ledger.local_state(address, index)
+                if local is None:
+                    raise AlgodHTTPError("account application info not found", 404)
+                app_local_state = {"id": index, "schema": {"num-byte-slice": MAX_LOCAL_BYTES, "num-uint": 0}}
+                if local:
+                    app_local_state["key-value"] = key_value(local)
+                return {"round": self.network.ledger.round, "app-local-state": app_local_state}
+            if kind == "assets":
+                if not self.network.ledger.is_opted_in_asset(address, index):
+                    raise AlgodHTTPError("account asset info not found", 404)
+                return {"round": self.network.ledger.round,
+                        "asset-holding": {"asset-id": index, "amount": self.network.ledger.assets[address][index], "is-frozen": False}}
+        raise AlgodHTTPError("{} {} not supported by the simulator".format(method, requrl), 404)
+
+class SimulatedIndexer:
+    def __init__(self, network: SimulatedNetwork) -> None:
+        '''IndexerClient shaped view of a SimulatedNetwork, always up to date with the latest round'''
+        self.network = network
+
+    def applications(self, application_id: int, round_num: int = None, **kwargs) -> dict:
+        return {"application": self.network.application(application_id), "current-round": self.network.ledger.round}
+
+    def account_info(self, address: str, round_num: int = None, **kwargs) -> dict:
+        return {"account": self.network.account(address), "current-round": self.network.ledger.round}
+
+    def accounts(self, asset_id: int = None, limit: int = None, next_page: str = None, application_id: int = None, **kwargs) -> dict:
+        '''Accounts sorted by address, filtered by opted in application or asset, paginated with the last address as next token'''
+
+        ledger = self.network.ledger
+        if application_id is not None:
+            addresses = [address for address, apps in ledger.local.items() if application_id in apps]
+        elif asset_id is not None:
+            addresses = [address for address, assets in ledger.assets.items() if asset_id in assets]
+        else:
+            addresses = list(ledger.algos.keys() | ledger.assets.keys() | ledger.local.keys())
+
+        addresses = sorted(address for address in addresses if next_page is None or address > next_page)
+        if limit:
+            addresses = addresses[:limit]
+
+        page = {"accounts": [self.network.account(address) for address in addresses], "current-round": ledger.round}
+        if addresses:
+            page["next-token"] = addresses[-1]
+        return page
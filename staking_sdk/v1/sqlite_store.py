@@ -0,0 +1,138 @@
+import sqlite3
+from typing import Callable, Iterable, List, Tuple
+from .typed_dict import UserStakedState
+from .staking_pool import StakingPool
+from .codec import UserSlot, encode_pool_id, encode_pool_record, PoolRecord
+
+#SQLite integers are signed 64 bit, the uint64 columns are stored shifted by 2**63 to keep their order
+UINT64_BIAS = 2**63
+MAX_UINT64 = 2**64 - 1
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS pools (
+    pool_id INTEGER PRIMARY KEY,
+    staked_asa_id INTEGER NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pools_staked_asa_id ON pools (staked_asa_id);
+CREATE INDEX IF NOT EXISTS pools_end_time ON pools (end_time);
+
+CREATE TABLE IF NOT EXISTS stakes (
+    address TEXT NOT NULL,
+    pool_id INTEGER NOT NULL,
+    staking_asa_id INTEGER NOT NULL,
+    user_staked INTEGER NOT NULL,
+    user_score INTEGER NOT NULL,
+    PRIMARY KEY (address, pool_id)
+);
+CREATE INDEX IF NOT EXISTS stakes_pool_id ON stakes (pool_id, user_staked);
+CREATE INDEX IF NOT EXISTS stakes_staking_asa_id ON stakes (staking_asa_id);
+'''
+
+def to_sql(value: int) -> int:
+    return value - UINT64_BIAS
+
+def from_sql(value: int) -> int:
+    return value + UINT64_BIAS
+
+def time_to_sql(timestamp: int) -> int:
+    '''Clamps a timestamp to the uint64 range: ST + TD can exceed it, such a pool never ends'''
+    return to_sql(min(max(timestamp, 0), MAX_UINT64))
+
+class StakingStore:
+    def __init__(self, database: str = ":memory:", new_pool: Callable[[str, str], StakingPool] = None) -> None:
+        '''Local SQLite copy of the pools and of the user stakes, to query them without the network.\n
+           Populate it from a StakingClient (client.pools, client.scan_local_states()) or a BlockFollower (follower.pools, follower.slots()),
+           each bulk write runs in one transaction.\n
+           The pools are returned as StakingPool built with new_pool (e.g. client.new_pool, by default without algod and indexer clients)
+           and the stakes as (address, UserStakedState)'''
+
+        if new_pool is None:
+            new_pool = lambda key, value: StakingPool(None, None, key, value)
+        self.new_pool = new_pool
+
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def pool_row(self, pool: StakingPool) -> tuple:
+        record = PoolRecord(pool.total_rewards, pool.users_number, pool.to_be_claimed, pool.total_staked,
+                            pool.total_score, pool.start_time, pool.time_delta, pool.staked_asa_id)
+        return (to_sql(pool.id), to_sql(pool.staked_asa_id), to_sql(pool.start_time), time_to_sql(pool.start_time + pool.time_delta),
+                encode_pool_id(pool.id), encode_pool_record(record))
+
+    def stake_row(self, address: str, state: UserStakedState) -> tuple:
+        return (address, to_sql(state["POOL_ID"]), to_sql(state["STAKING_ASA_ID"]), to_sql(state["user_staked"]), to_sql(state["user_score"]))
+
+    def upsert_pools(self, pools: Iterable[StakingPool]) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO pools VALUES (?, ?, ?, ?, ?, ?)", [self.pool_row(pool) for pool in pools])
+
+    def replace_pools(self, pools: Iterable[StakingPool]) -> None:
+        '''Replaces all the pools, the ones not in pools (e.g. deleted) are removed'''
+
+        rows = [self.pool_row(pool) for pool in pools]
+        with self.connection:
+            self.connection.execute("DELETE FROM pools")
+            self.connection.executemany("INSERT INTO pools VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_pools(self, pool_ids: Iterable[int]) -> None:
+        with self.connection:
+            self.connection.executemany("DELETE FROM pools WHERE pool_id = ?", [(to_sql(pool_id),) for pool_id in pool_ids])
+
+    def upsert_stakes(self, stakes: Iterable[Tuple[str, UserStakedState]]) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO stakes VALUES (?, ?, ?, ?, ?)", [self.stake_row(address, state) for address, state in stakes])
+
+    def replace_stakes(self, stakes: Iterable[Tuple[str, UserStakedState]]) -> None:
+        '''Replaces all the stakes, the ones not in stakes (e.g. withdrawn) are removed'''
+
+        rows = [self.stake_row(address, state) for address, state in stakes]
+        with self.connection:
+            self.connection.execute("DELETE FROM stakes")
+            self.connection.executemany("INSERT INTO stakes VALUES (?, ?, ?, ?, ?)", rows)
+
+    def replace_address_stakes(self, address: str, states: Iterable[UserStakedState]) -> None:
+        '''Replaces the stakes of one address, e.g. with client.get_formatted_local_state(address)'''
+
+        rows = [self.stake_row(address, state) for state in states]
+        with self.connection:
+            self.connection.execute("DELETE FROM stakes WHERE address = ?", (address,))
+            self.connection.executemany("INSERT INTO stakes VALUES (?, ?, ?, ?, ?)", rows)
+
+    def query_pools(self, where: str = "", parameters: tuple = ()) -> List[StakingPool]:
+        return [self.new_pool(key, value) for key, value in self.connection.execute("SELECT key, value FROM pools " + where, parameters)]
+
+    def query_stakes(self, where: str = "", parameters: tuple = ()) -> List[Tuple[str, UserStakedState]]:
+        rows = self.connection.execute("SELECT address, pool_id, user_staked, user_score, staking_asa_id FROM stakes " + where, parameters)
+        return [(address, UserSlot(from_sql(pool_id), from_sql(user_staked), from_sql(user_score), from_sql(staking_asa_id)).json())
+                for address, pool_id, user_staked, user_score, staking_asa_id in rows]
+
+    def get_pool(self, pool_id: int) -> 'StakingPool | None':
+        pools = self.query_pools("WHERE pool_id = ?", (to_sql(pool_id),))
+        return pools[0] if pools else None
+
+    def get_pools_by_asa(self, staked_asa_id: int) -> List[StakingPool]:
+        return self.query_pools("WHERE staked_asa_id = ? ORDER BY pool_id", (to_sql(staked_asa_id),))
+
+    def get_pools_ending_between(self, start: int, end: int) -> List[StakingPool]:
+        '''Pools with start <= ST + TD < end, ordered by end time (e.g. the pools ending in the next hour: now, now + 3600)'''
+        return self.query_pools("WHERE end_time >= ? AND end_time < ? ORDER BY end_time", (time_to_sql(start), time_to_sql(end)))
+
+    def get_stakes_by_address(self, address: str) -> List[UserStakedState]:
+        return [state for _, state in self.query_stakes("WHERE address = ?", (address,))]
+
+    def get_stakes_by_asa(self, staking_asa_id: int) -> List[Tuple[str, UserStakedState]]:
+        return self.query_stakes("WHERE staking_asa_id = ?", (to_sql(staking_asa_id),))
+
+    def get_stakes_by_pool(self, pool_id: int) -> List[Tuple[str, UserStakedState]]:
+        return self.query_stakes("WHERE pool_id = ?", (to_sql(pool_id),))
+
+    def get_top_depositors(self, pool_id: int, limit: int = 10) -> List[Tuple[str, UserStakedState]]:
+        '''The limit stakes of pool_id with the highest staked amount'''
+        return self.query_stakes("WHERE pool_id = ? ORDER BY user_staked DESC LIMIT ?", (to_sql(pool_id), limit))
@@ -0,0 +1,15 @@
+from typing import Iterable
+from algosdk.future.transaction import ApplicationClearStateTxn, Transaction, SuggestedParams
+from ..utils import int_to_bytes
+
+#Stakes an account holds at most in the pool keyed contract (MAX_STAKES), all removed by its clear state program within its opcode budget
+CLEAR_STATE_MAX_POOLS = 8
+
+def staking_app_clear_state(sender: str, params: SuggestedParams, app_id: int, pool_ids: Iterable[int] = (), note: bytes = None) -> Transaction:
+    '''pool_ids are passed in ascending order as application arguments: the clear state program of the pool keyed contract
+       cannot list the local keys and removes only these stakes from the pools (the slot index contract ignores them)\n
+       Raises Exception if there are more than CLEAR_STATE_MAX_POOLS pool ids'''
+    pool_ids = sorted(set(pool_ids))
+    if len(pool_ids) > CLEAR_STATE_MAX_POOLS:
+        raise Exception("{} pool ids, the clear state program removes at most {} stakes".format(len(pool_ids), CLEAR_STATE_MAX_POOLS))
+    return ApplicationClearStateTxn(sender, params, app_id, app_args=[int_to_bytes(pool_id) for pool_id in pool_ids], note=note)
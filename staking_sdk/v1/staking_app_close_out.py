@@ -1,5 +1,5 @@
 from algosdk.future.transaction import ApplicationCloseOutTxn, Transaction, SuggestedParams
 
-def staking_app_close_out(sender: str, params: SuggestedParams, app_id: int) -> Transaction:
-    return ApplicationCloseOutTxn(sender, params, app_id)
+def staking_app_close_out(sender: str, params: SuggestedParams, app_id: int, note: bytes = None) -> Transaction:
+    return ApplicationCloseOutTxn(sender, params, app_id, note=note)
     
\ No newline at end of file
@@ -1,4 +1,4 @@
 from algosdk.future.transaction import ApplicationOptInTxn, Transaction, SuggestedParams
 
-def staking_app_opt_in(sender: str, params: SuggestedParams, app_id: int) -> Transaction:
-    return ApplicationOptInTxn(sender, params, app_id)
\ No newline at end of file
+def staking_app_opt_in(sender: str, params: SuggestedParams, app_id: int, note: bytes = None) -> Transaction:
+    return ApplicationOptInTxn(sender, params, app_id, note=note)
\ No newline at end of file
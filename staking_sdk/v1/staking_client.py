@@ -1,58 +1,101 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, TYPE_CHECKING
 from base64 import b64encode, b64decode
-from algosdk.v2client.algod import AlgodClient
-from algosdk.v2client.indexer import IndexerClient
-from algosdk.encoding import encode_address
-from algosdk.future.transaction import wait_for_confirmation, assign_group_id
-from algosdk.logic import get_application_address
-from ..utils import get_app_id, int_to_bytes, is_opted_in_app, is_opted_in_asset, read_global_state, bytes_to_int, get_suggested_params, read_local_state, sign_group
+from functools import cached_property
+from time import time
+from ..utils import get_app_id, bytes_to_int, sign_group, unique_note
+from ..state_backend import StateBackend, IndexerStateBackend
+from ..params_cache import SuggestedParamsCache
 from ..contract_strings import GlobalKey
-from .typed_dict import UserStakedState
+from .typed_dict import UserStakedState, GlobalStateChangeset, SubmitResult
 from .staking_pool import StakingPool
-from .create_pool import create_pool
-from .escrow_opt_in import escrow_opt_in
-from .staking_app_close_out import staking_app_close_out
-from .staking_app_opt_in import staking_app_opt_in
+from .pool_registry import PoolRegistry
+from .pool_index import MAX_SECONDS_TO_CLAIM
+from .codec import UserSlot, decode_user_slots, find_user_slot
+from .bulk_submit import submit_groups
+from .local_state_scanner import LocalStateScanner
+
+#algosdk and the transaction builders are imported where they are used, importing this module
+#and reading the pools does not load them (python -m benchmarks.client_startup)
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+    from algosdk.v2client.indexer import IndexerClient
+    from ..http_transport import HTTPTransport
 
 INFO_KEY = b64encode(GlobalKey.info.encode()).decode()
 
 class StakingClient:
-    def __init__(self, algod_client: AlgodClient, indexer_client: IndexerClient, chain: str, user_address: str = None) -> None:
-        '''Instatiate a new StakingClient object, loading from the global state all the data needed'''
+    def __init__(self, algod_client: 'AlgodClient', indexer_client: 'IndexerClient', chain: str, user_address: str = None, state_backend: StateBackend = None, params_cache: SuggestedParamsCache = None, app_id: int = None, lazy: bool = False, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        '''Instatiate a new StakingClient object, loading from the global state all the data needed\n
+           With lazy the constructor does no network call: the global state is read the first time
+           pools, manager or pools_number is used (or by update_global_state)\n
+           The state is read through state_backend, by default through the indexer.
+           Pass an AccountSnapshotCache wrapping a backend to cache the account reads: the client reports it the transactions
+           it confirms, so the cached reads of their addresses are dropped or updated with the state deltas\n
+           The suggested params are shared through params_cache by all the transactions built by the client and its pools\n
+           app_id overrides the application id of chain in app_ids.json\n
+           max_seconds_to_claim is the MAX_SECONDS_TO_CLAIM the contract was deployed with, used by get_deletable_pools'''
 
         self.algod_client = algod_client
         self.indexer_client = indexer_client
         self.chain = chain
         self.user_address = user_address
 
-        self.app_id = get_app_id(self.chain)
-        self.escrow = get_application_address(self.app_id)
-
-        global_state = self.get_unformatted_global_state()
-        self.manager = self.get_manager(global_state)
-        self.pools_number = self.get_pools_number(global_state)
-        global_state.pop(INFO_KEY)
-        
-        self.pools = [StakingPool(self.algod_client, self.indexer_client, key, value) for key, value in global_state.items()]
+        if state_backend is None:
+            state_backend = IndexerStateBackend(self.indexer_client)
+        self.state_backend = state_backend
+
+        if params_cache is None:
+            params_cache = SuggestedParamsCache(self.algod_client)
+        self.params_cache = params_cache
+
+        self.app_id = app_id if app_id is not None else get_app_id(self.chain)
+
+        self.pool_registry = PoolRegistry(self.new_pool, max_seconds_to_claim)
+        self.info: str = None
+        self.loaded = False
+        if not lazy:
+            self.update_global_state()
+
+    @cached_property
+    def escrow(self) -> str:
+        from algosdk.logic import get_application_address
+        return get_application_address(self.app_id)
+
+    @property
+    def pools(self) -> PoolRegistry:
+        if not self.loaded:
+            self.update_global_state()
+        return self.pool_registry
+
+    @property
+    def manager(self) -> str:
+        if not self.loaded:
+            self.update_global_state()
+        return self.get_manager({INFO_KEY: self.info})
+
+    @property
+    def pools_number(self) -> int:
+        if not self.loaded:
+            self.update_global_state()
+        return self.get_pools_number({INFO_KEY: self.info})
+
+    def new_pool(self, key: str, value: str) -> StakingPool:
+        return StakingPool(self.algod_client, self.indexer_client, key, value, self.params_cache)
     
-    def update_global_state(self) -> None:
-        global_state = self.get_unformatted_global_state()
-        self.manager = self.get_manager(global_state)
-        self.pools_number = self.get_pools_number(global_state)
-        global_state.pop(INFO_KEY)
+    def update_global_state(self) -> GlobalStateChangeset:
+        '''Reads the global state and applies to the pools only the records that changed since the last update
 
-        for pool in list(self.pools):
-            if b64encode(int_to_bytes(pool.id)) not in global_state.keys():
-                self.pools.remove(pool)
+           Returns the ids of the pools added, changed and removed'''
 
-        for key, value in global_state.items():
-            try:
-                self.get_pool_from_id(bytes_to_int(b64decode(key))).update_pool_state(key, value)
-            except Exception:
-                self.pools.append(StakingPool(self.algod_client, self.indexer_client, key, value))
+        global_state = self.get_unformatted_global_state()
+        self.info = global_state.pop(INFO_KEY)
+        self.loaded = True
+
+        return self.pool_registry.apply(global_state)
 
     def get_manager(self, unformatted_gloabal_state) -> str:
         '''Extract the manager address from an unformatted global state'''
+        from algosdk.encoding import encode_address
         return encode_address(b64decode(unformatted_gloabal_state[INFO_KEY])[:32])
     
     def get_pools_number(self, unformatted_gloabal_state) -> int:
@@ -61,13 +104,15 @@ class StakingClient:
 
     def submit_create_pool(self, staking_rewards: int, start_time: int, time_delta: int, staking_asa_id: int, pk: str, sender: str = None) -> None:
         '''Sumbmits to the network a create_pool transaction group'''
+        from algosdk.future.transaction import assign_group_id
+        from .create_pool import create_pool
 
-        params = get_suggested_params(self.algod_client)
+        params = self.params_cache.get()
 
         if self.user_address != None and sender == None:
             sender = self.user_address
 
-        txns = create_pool(sender, params, staking_rewards, start_time, time_delta, staking_asa_id, self.app_id)
+        txns = create_pool(sender, params, staking_rewards, start_time, time_delta, staking_asa_id, self.app_id, unique_note())
         
         group = assign_group_id(txns)
 
@@ -123,13 +168,11 @@ class StakingClient:
         try:
             txn = self.get_pool_from_id(pool_id).prepare_withdraw_group(sender, self.app_id)
         except Exception:
-            txn = None
-            for state in self.get_formatted_local_state(sender):
-                if state["POOL_ID"] == pool_id:
-                    txn = StakingPool.prepare_withdraw_group_from_info(
-                        self.algod_client, sender, self.app_id, state["POOL_ID"], state["STAKING_ASA_ID"])
-            if txn == None:
+            slot = self.get_local_slot(pool_id, sender)
+            if slot == None:
                 raise Exception("Sender seems not have been staked in the pool")
+            txn = StakingPool.prepare_withdraw_group_from_info(
+                self.algod_client, sender, self.app_id, slot.pool_id, slot.staking_asa_id, self.params_cache)
 
         signed_txn = txn.sign(pk)
 
@@ -138,16 +181,18 @@ class StakingClient:
     def submit_escrow_opt_in(self, staking_asa_id: int, pk: str, sender: str = None) -> None:
         '''Sumbmits to the network a escrow_opt_in transaction group\n
            Raises Exception if the escrow is alredy opted in'''
-        
-        if is_opted_in_asset(self.indexer_client, self.escrow, staking_asa_id):
+        from algosdk.future.transaction import assign_group_id
+        from .escrow_opt_in import escrow_opt_in
+
+        if self.state_backend.is_opted_in_asset(self.escrow, staking_asa_id):
             raise Exception("Escrow alredy opted in asset {}".format(staking_asa_id))
         
-        params = get_suggested_params(self.algod_client)
+        params = self.params_cache.get()
 
         if self.user_address != None and sender == None:
             sender = self.user_address
 
-        txns = escrow_opt_in(sender, params, staking_asa_id, self.app_id)
+        txns = escrow_opt_in(sender, params, staking_asa_id, self.app_id, unique_note())
 
         group = assign_group_id(txns)
 
@@ -158,86 +203,124 @@ class StakingClient:
     def submit_staking_app_opt_in(self, pk, sender: str = None) -> None:
         '''Sumbmits to the network an application opt in transaction to the staking appplication\n
            Raises Exception if the sender is alredy opted in'''
-        
+        from .staking_app_opt_in import staking_app_opt_in
+
         if self.user_address != None and sender == None:
             sender = self.user_address
-        if is_opted_in_app(self.indexer_client, sender, self.app_id):
+        if self.state_backend.is_opted_in_app(sender, self.app_id):
             raise Exception(f"{sender} is alredy opted in {self.app_id}")
 
-        params = get_suggested_params(self.algod_client)
+        params = self.params_cache.get()
         
-        self.submit_txn(staking_app_opt_in(sender, params, self.app_id).sign(pk), True)
+        self.submit_txn(staking_app_opt_in(sender, params, self.app_id, unique_note()).sign(pk), True)
     
     def submit_staking_app_close_out(self, pk, sender: str = None) -> None:
         '''Sumbmits to the network an application close out transaction from the staking appplication\n
            Raises Exception if the sender is not opted in'''
+        from .staking_app_close_out import staking_app_close_out
 
         if self.user_address != None and sender == None:
             sender = self.user_address
-        if not is_opted_in_app(self.indexer_client, sender, self.app_id):
+        if not self.state_backend.is_opted_in_app(sender, self.app_id):
             raise Exception(f"{sender} is not opted in {self.app_id}")
 
-        params = get_suggested_params(self.algod_client)
+        params = self.params_cache.get()
         
-        self.submit_txn(staking_app_close_out(sender, params, self.app_id).sign(pk), True)
+        self.submit_txn(staking_app_close_out(sender, params, self.app_id, unique_note()).sign(pk), True)
+
+    def submit_staking_app_clear_state(self, pk, sender: str = None) -> None:
+        '''Sumbmits to the network an application clear state transaction from the staking appplication, forfeiting the deposits.\n
+           The pool ids of the stakes in pools not deleted are passed to the clear state program (see staking_app_clear_state)\n
+           Raises Exception if the sender is not opted in or has more stakes than the clear state program removes'''
+        from .staking_app_clear_state import staking_app_clear_state
+
+        if self.user_address != None and sender == None:
+            sender = self.user_address
+        if not self.state_backend.is_opted_in_app(sender, self.app_id):
+            raise Exception(f"{sender} is not opted in {self.app_id}")
+
+        pool_ids = [slot.pool_id for slot in self.get_local_slots(sender) if slot.pool_id in self.pools]
+        params = self.params_cache.get()
+
+        self.submit_txn(staking_app_clear_state(sender, params, self.app_id, pool_ids, unique_note()).sign(pk), True)
 
     def get_unformatted_global_state(self) -> Dict[str, 'int | str']:
-        return read_global_state(self.indexer_client, self.app_id)
+        return self.state_backend.read_global_state(self.app_id)
     
     def get_unformatted_local_state(self, address: str) -> Dict[str, 'int | str']:
-        return read_local_state(self.indexer_client, self.app_id, address)
+        return self.state_backend.read_local_state(self.app_id, address)
 
-    def get_formatted_local_state(self, address: str = None) ->List[UserStakedState]:
+    def get_local_slots(self, address: str = None) -> List[UserSlot]:
+        '''Returns the decoded local state slots of address (by default the client user_address)'''
         if address == None and self.user_address != None:
             address = self.user_address
 
-        unformatted = self.get_unformatted_local_state(address)
-        formatted = []
-        for value in unformatted.values():
-            formatted.append(
-                dict(POOL_ID = bytes_to_int(b64decode(value)[:8]),
-                     user_staked = bytes_to_int(b64decode(value)[8:16]),
-                     user_score = bytes_to_int(b64decode(value)[16:24]),
-                     STAKING_ASA_ID = bytes_to_int(b64decode(value)[24:])))
+        return decode_user_slots(self.get_unformatted_local_state(address))
+
+    def get_local_slot(self, pool_id: int, address: str = None) -> 'UserSlot | None':
+        '''Returns the local state slot of address in pool_id, None if address has not staked in it'''
+        if address == None and self.user_address != None:
+            address = self.user_address
 
-        return formatted
+        return find_user_slot(self.get_unformatted_local_state(address), pool_id)
+
+    def get_formatted_local_state(self, address: str = None) -> List[UserStakedState]:
+        return [slot.json() for slot in self.get_local_slots(address)]
+
+    def scan_local_states(self, pool_id: int = None, staking_asa_id: int = None, next_page: str = None) -> LocalStateScanner:
+        '''Returns an iterator over the (address, UserStakedState) of every depositor, read page by page from the indexer'''
+        return LocalStateScanner(self.indexer_client, self.app_id, pool_id, staking_asa_id, next_page)
 
     def get_pool_from_id(self, pool_id: int) -> StakingPool:
         '''Returns the StakingPool object for the specific pool_id\n
            The global state should be updated to get reliable results\n
            Raises Exception if the pool_id is not found'''
         
-        for pool in self.pools:
-            if pool.id == pool_id:
-                return pool
-        raise Exception("Pool {} not found".format(pool_id))
+        pool = self.pools.get(pool_id)
+        if pool is None:
+            raise Exception("Pool {} not found".format(pool_id))
+        return pool
 
     def get_staking_asa_id_from_pool(self, pool_id: int) -> int:
-        for pool in self.pools:
-            if pool.id == pool_id:
-                return pool.staked_asa_id
-        raise Exception("Pool {} not found".format(pool_id))
+        return self.get_pool_from_id(pool_id).staked_asa_id
 
     def get_latest_pool_created(self) -> StakingPool:
         '''Get the latest pool created id\n
            The global state should be updated to get reliable results\n
            Raises Exception if no latest pool is found'''
            
-        latest = 0
-        for pool in self.pools:
-            if latest < pool.id:
-                latest = pool.id
-
-        if latest == 0:
+        latest = self.pools.latest
+        if latest is None:
             raise Exception("No latest pool found")
 
-        return self.get_pool_from_id(latest)
+        return latest
+
+    def get_active_pools(self, timestamp: int = None) -> List[StakingPool]:
+        '''Returns the pools with ST <= timestamp < ST + TD, by default at the current time\n
+           The global state should be updated to get reliable results'''
+        return self.pools.index.active(timestamp if timestamp != None else int(time()))
+
+    def get_pools_by_staked_asa(self, staked_asa_id: int) -> List[StakingPool]:
+        return self.pools.index.by_staked_asa(staked_asa_id)
+
+    def get_claimable_pools(self, timestamp: int = None) -> List[StakingPool]:
+        '''Returns the ended pools with depositors, that can be claimed at timestamp (by default now), ordered by end time'''
+        return self.pools.index.claimable(timestamp if timestamp != None else int(time()))
+
+    def get_deletable_pools(self, timestamp: int = None) -> List[StakingPool]:
+        '''Returns the pools the manager can delete at timestamp (by default now):
+           ended without depositors, or ended more than max_seconds_to_claim before'''
+        return self.pools.index.deletable(timestamp if timestamp != None else int(time()))
+
+    def get_pools_ending_soonest(self, timestamp: int = None, limit: int = 10) -> List[StakingPool]:
+        '''Returns up to limit pools not ended at timestamp (by default now), ordered by end time'''
+        return self.pools.index.ending_soonest(timestamp if timestamp != None else int(time()), limit)
 
     def submit_group(self, transaction_group, wait: bool = False) -> str:
         txid = self.algod_client.send_transactions(transaction_group)
 
         if wait:
-            wait_for_confirmation(self.algod_client, txid)
+            self.confirm(transaction_group)
 
         return txid
         
@@ -245,27 +328,128 @@ class StakingClient:
         txid = self.algod_client.send_transaction(txn)
 
         if wait:
-            wait_for_confirmation(self.algod_client, txid)
+            self.confirm([txn])
 
         return txid
+
+    def confirm(self, signed_txns: list) -> dict:
+        '''Waits for the confirmation of the signed transactions (sent as one group) and applies their state deltas to the
+           pools and to the cached local states, so they are up to date without reading them again.\n
+           The confirmation is waited on the application call of the group, whose response carries the deltas.\n
+           Returns the confirmed application call (or first transaction) info'''
+        from algosdk.future.transaction import wait_for_confirmation
+
+        app_calls = [signed_txn for signed_txn in signed_txns if self.is_app_call(signed_txn.transaction)]
+        waited = app_calls[-1] if app_calls else signed_txns[0]
+        info = wait_for_confirmation(self.algod_client, waited.get_txid())
+        self.apply_confirmed(signed_txns, info.get("confirmed-round"), {waited.get_txid(): info})
+
+        return info
+
+    def apply_confirmed(self, signed_txns: list, confirmed_round: int = None, infos: Dict[str, dict] = None) -> None:
+        '''Applies the state deltas of the application calls of signed_txns (one group confirmed in confirmed_round)
+           and invalidates the accounts they changed.\n
+           The deltas are read with pending-transaction-info, except for the calls whose info is already in infos (by txid)'''
+
+        if confirmed_round != None:
+            self.params_cache.observe_round(confirmed_round)
+
+        for signed_txn in signed_txns:
+            if self.is_app_call(signed_txn.transaction):
+                txid = signed_txn.get_txid()
+                info = infos.get(txid) if infos != None else None
+                if info == None:
+                    info = self.algod_client.pending_transaction_info(txid)
+                self.apply_state_delta(signed_txn.transaction, info)
+
+        self.invalidate_accounts(signed_txns, confirmed_round)
+
+    def is_app_call(self, txn) -> bool:
+        return txn.type == "appl" and txn.index == self.app_id
+
+    def apply_state_delta(self, txn, info: dict) -> GlobalStateChangeset:
+        '''Applies the global-state-delta and local-state-delta of a confirmed call to the staking application\n
+           Returns the ids of the pools added, changed and removed, none if the global state is not loaded yet
+           (it is read whole on first use)'''
+        from algosdk.future.transaction import OnComplete
+
+        global_state_delta = []
+        for item in info.get("global-state-delta", []):
+            if item["key"] != INFO_KEY:
+                global_state_delta.append(item)
+            elif item["value"]["action"] == 1:
+                self.info = item["value"]["bytes"]
+
+        opted_in = txn.on_complete == OnComplete.OptInOC
+        local_state_deltas = {local["address"]: local.get("delta", []) for local in info.get("local-state-delta", [])}
+        if opted_in:
+            local_state_deltas.setdefault(txn.sender, [])
+        if txn.on_complete in (OnComplete.CloseOutOC, OnComplete.ClearStateOC):
+            local_state_deltas.pop(txn.sender, None)    #The local state is removed, a delta would rebuild it from a snapshot
+            self.state_backend.drop_local_state(txn.sender, self.app_id)
+        for address, delta in local_state_deltas.items():
+            self.state_backend.apply_local_delta(address, self.app_id, delta, info["confirmed-round"], opted_in and address == txn.sender)
+
+        if not self.loaded:
+            return GlobalStateChangeset(added=[], changed=[], removed=[])
+        return self.pool_registry.apply_delta(global_state_delta)
+
+    def invalidate_accounts(self, signed_txns: list, confirmed_round: int = None) -> None:
+        '''Drops the cached snapshots of the senders and receivers of signed_txns, and of the escrow if they call the application'''
+
+        addresses = set()
+        for signed_txn in signed_txns:
+            txn = signed_txn.transaction
+            addresses.add(txn.sender)
+            if getattr(txn, "receiver", None):
+                addresses.add(txn.receiver)
+            if self.is_app_call(txn):
+                addresses.add(self.escrow)
+
+        for address in addresses:
+            self.state_backend.invalidate(address, confirmed_round)
+
+    def submit_groups(self, groups: list, max_rounds: int = 10, on_result: Callable[[SubmitResult], None] = None) -> List[SubmitResult]:
+        '''Sends all the signed groups (or single signed transactions) at once and tracks their confirmation in one round-following loop\n
+           The state deltas of each confirmed group are taken from the block it was confirmed in and applied as with confirm(),
+           before on_result is called for it. If they cannot be applied the global state is read again on next use
+           and the accounts of the group are dropped from the cache, the other groups are still tracked.\n
+           on_result is called for each group as soon as it is confirmed or fails, the results are returned in the groups order'''
+
+        def confirmed(result: SubmitResult, infos: Dict[str, dict]) -> None:
+            group = groups[result["index"]]
+            group = group if isinstance(group, list) else [group]
+            try:
+                self.apply_confirmed(group, result["confirmed_round"], infos)
+            except Exception:
+                self.loaded = False
+                self.invalidate_accounts(group, result["confirmed_round"])
+
+        return submit_groups(self.algod_client, groups, max_rounds, on_result, confirmed)
     
 class MainnetStakingClient(StakingClient):
-    def __init__(self, algod_client: AlgodClient = None, indexer_client: IndexerClient = None, user_address: str = None) -> None:
+    def __init__(self, algod_client: 'AlgodClient' = None, indexer_client: 'IndexerClient' = None, user_address: str = None, state_backend: StateBackend = None, params_cache: SuggestedParamsCache = None, lazy: bool = False, transport: 'HTTPTransport' = None, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        from ..http_transport import HTTPTransport, PooledAlgodClient, PooledIndexerClient
 
+        if transport is None:
+            transport = HTTPTransport()
         if algod_client is None:
-            algod_client = AlgodClient("", "https://node.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+            algod_client = PooledAlgodClient("", "https://node.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
         if indexer_client is None:
-            indexer_client = IndexerClient("", "https://algoindexer.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+            indexer_client = PooledIndexerClient("", "https://algoindexer.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
 
-        super().__init__(algod_client, indexer_client, "mainnet", user_address)
+        super().__init__(algod_client, indexer_client, "mainnet", user_address, state_backend, params_cache, lazy=lazy, max_seconds_to_claim=max_seconds_to_claim)
 
 class TestnetStakingClient(StakingClient):
-    def __init__(self, algod_client: AlgodClient = None, indexer_client: IndexerClient = None, user_address: str = None) -> None:
+    def __init__(self, algod_client: 'AlgodClient' = None, indexer_client: 'IndexerClient' = None, user_address: str = None, state_backend: StateBackend = None, params_cache: SuggestedParamsCache = None, lazy: bool = False, transport: 'HTTPTransport' = None, max_seconds_to_claim: int = MAX_SECONDS_TO_CLAIM) -> None:
+        from ..http_transport import HTTPTransport, PooledAlgodClient, PooledIndexerClient
 
+        if transport is None:
+            transport = HTTPTransport()
         if algod_client is None:
-            algod_client = AlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+            algod_client = PooledAlgodClient("", "https://node.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
 
         if indexer_client is None:
-            indexer_client = IndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"})
+            indexer_client = PooledIndexerClient("", "https://algoindexer.testnet.algoexplorerapi.io", headers={"User-Agent": "algosdk"}, transport=transport)
 
-        super().__init__(algod_client, indexer_client, "testnet", user_address)
\ No newline at end of file
+        super().__init__(algod_client, indexer_client, "testnet", user_address, state_backend, params_cache, lazy=lazy, max_seconds_to_claim=max_seconds_to_claim)
\ No newline at end of file
@@ -1,70 +1,95 @@
-from typing import List
-from algosdk.v2client.algod import AlgodClient
-from algosdk.v2client.indexer import IndexerClient
-from algosdk.future.transaction import Transaction, assign_group_id
-from base64 import b64decode
-from ..utils import bytes_to_int, get_suggested_params
-from .delete_pool import delete_pool
-from .deposit import deposit
-from .claim import claim
-from .withdraw import withdraw
+from typing import List, TYPE_CHECKING
+from ..utils import get_suggested_params, unique_note
+from ..params_cache import SuggestedParamsCache
+from .codec import decode_pool_id, unpack_pool_record
+
+#The transaction builders (and algosdk) are imported by the prepare_* methods,
+#so that reading and decoding the pools does not load them
+if TYPE_CHECKING:
+    from algosdk.v2client.algod import AlgodClient
+    from algosdk.v2client.indexer import IndexerClient
+    from algosdk.future.transaction import Transaction, SuggestedParams
 
 class StakingPool:
-    def __init__(self, algod_client: AlgodClient, indexer_client: IndexerClient, key: str, value: str) -> None:
+    def __init__(self, algod_client: 'AlgodClient', indexer_client: 'IndexerClient', key: str, value: str, params_cache: SuggestedParamsCache = None) -> None:
+        '''params_cache is the one shared by the client, a pool without it (e.g. read from a StakingStore) cannot prepare transactions'''
+
         self.algod_client = algod_client
         self.indexer_client = indexer_client
+        self.params_cache = params_cache
 
         self.update_pool_state(key, value)
     
     def update_pool_state(self, key: str, value: str) -> None:
-        self.id = bytes_to_int(b64decode(key))
-        self.total_rewards = bytes_to_int(b64decode(value)[:8])
-        self.users_number = bytes_to_int(b64decode(value)[8:16])
-        self.to_be_claimed = bytes_to_int(b64decode(value)[16:24])
-        self.total_staked = bytes_to_int(b64decode(value)[24:32])
-        self.total_score = bytes_to_int(b64decode(value)[32:40])
-        self.start_time = bytes_to_int(b64decode(value)[40:48])
-        self.time_delta = bytes_to_int(b64decode(value)[48:56])
-        self.staked_asa_id = bytes_to_int(b64decode(value)[56:])
-
-    def prepare_delete_pool_group(self, sender: str, staking_app_id: int) -> Transaction:
-        params = get_suggested_params(self.algod_client)
+        self.id = decode_pool_id(key)
+        (self.total_rewards,
+         self.users_number,
+         self.to_be_claimed,
+         self.total_staked,
+         self.total_score,
+         self.start_time,
+         self.time_delta,
+         self.staked_asa_id) = unpack_pool_record(value)
+
+    def get_params(self) -> 'SuggestedParams':
+        '''Raises Exception if the pool has no params_cache'''
+
+        if self.params_cache is None:
+            raise Exception("Pool {} has no params_cache to prepare transactions, get it from a StakingClient".format(self.id))
+        return self.params_cache.get()
+
+    def prepare_delete_pool_group(self, sender: str, staking_app_id: int) -> 'Transaction':
+        from .delete_pool import delete_pool
+
+        params = self.get_params()
         params.fee = 2000
 
-        txn = delete_pool(sender, params, self.staked_asa_id, staking_app_id, self.id)
+        txn = delete_pool(sender, params, self.staked_asa_id, staking_app_id, self.id, unique_note())
 
         return txn
     
-    def prepare_deposit_group(self, sender: str, amount: int, staking_app_id: int) -> List[Transaction]:
-        params = get_suggested_params(self.algod_client)
+    def prepare_deposit_group(self, sender: str, amount: int, staking_app_id: int) -> 'List[Transaction]':
+        from algosdk.future.transaction import assign_group_id
+        from .deposit import deposit
+
+        params = self.get_params()
 
-        txns = deposit(sender, params, amount, self.staked_asa_id, staking_app_id, self.id)
+        txns = deposit(sender, params, amount, self.staked_asa_id, staking_app_id, self.id, unique_note())
         
         group = assign_group_id(txns)
 
         return group
 
-    def prepare_claim_group(self, sender: str, staking_app_id: int) -> Transaction:
-        params = get_suggested_params(self.algod_client)
+    def prepare_claim_group(self, sender: str, staking_app_id: int) -> 'Transaction':
+        from .claim import claim
+
+        params = self.get_params()
         params.fee = 2000
 
-        txn = claim(sender, params, self.staked_asa_id, staking_app_id, self.id)
+        txn = claim(sender, params, self.staked_asa_id, staking_app_id, self.id, unique_note())
 
         return txn
 
-    def prepare_withdraw_group(self, sender: str, staking_app_id: int) -> Transaction:
-        params = get_suggested_params(self.algod_client)
+    def prepare_withdraw_group(self, sender: str, staking_app_id: int) -> 'Transaction':
+        from .withdraw import withdraw
+
+        params = self.get_params()
         params.fee = 2000
 
-        txn = withdraw(sender, params, self.staked_asa_id, staking_app_id, self.id)
+        txn = withdraw(sender, params, self.staked_asa_id, staking_app_id, self.id, unique_note())
 
         return txn
 
-    def prepare_withdraw_group_from_info(algod_client: AlgodClient, sender: str, staking_app_id: int, pool_id: int, staking_asa_id: int) -> Transaction:
-        params = get_suggested_params(algod_client)
+    def prepare_withdraw_group_from_info(algod_client: 'AlgodClient', sender: str, staking_app_id: int, pool_id: int, staking_asa_id: int, params_cache: SuggestedParamsCache = None) -> 'Transaction':
+        from .withdraw import withdraw
+
+        if params_cache is None:
+            params = get_suggested_params(algod_client)
+        else:
+            params = params_cache.get()
         params.fee = 2000
 
-        txn = withdraw(sender, params, staking_asa_id, staking_app_id, pool_id)
+        txn = withdraw(sender, params, staking_asa_id, staking_app_id, pool_id, unique_note())
     
         return txn
 
@@ -0,0 +1,71 @@
+from typing import List
+from algosdk import constants, error
+from algosdk.future.transaction import SuggestedParams, AssetTransferTxn, ApplicationNoOpTxn, Transaction, assign_group_id
+from algosdk.logic import get_application_address
+from ..utils import int_to_bytes
+from ..contract_strings import StakingArguments
+
+class PoolTransactionTemplate:
+    def __init__(self, staking_app_id: int, pool_id: int, staking_asa_id: int) -> None:
+        '''Prebuilt deposit, claim and withdraw transactions of one pool, to generate many of them cheaply.\n
+           The application address, the app args and the foreign assets are computed once, each transaction is a copy
+           of a prototype where only sender, params (fee and validity window) and amount are set.\n
+           The transactions encode to the same bytes as the ones returned by deposit(), claim() and withdraw().
+           The app_args and foreign_assets lists are shared between the copies and must not be modified'''
+
+        self.staking_app_id = staking_app_id
+        self.pool_id = pool_id
+        self.staking_asa_id = staking_asa_id
+        self.app_address = get_application_address(staking_app_id)
+
+        params = SuggestedParams(0, 0, 0, None, flat_fee=True)
+        self.deposit_transfer = AssetTransferTxn(self.app_address, params, self.app_address, 0, staking_asa_id)
+        self.deposit_call = self.app_call(params, StakingArguments.deposit)
+        self.claim_call = self.app_call(params, StakingArguments.claim)
+        self.withdraw_call = self.app_call(params, StakingArguments.withdraw)
+
+    def app_call(self, params: SuggestedParams, argument: str) -> ApplicationNoOpTxn:
+        return ApplicationNoOpTxn(self.app_address, params, self.staking_app_id,
+                                  foreign_assets=[self.staking_asa_id],
+                                  app_args=[argument.encode(), int_to_bytes(self.pool_id)])
+
+    def stamp(self, prototype: Transaction, sender: str, params: SuggestedParams, note: bytes = None) -> Transaction:
+        txn = prototype.__class__.__new__(prototype.__class__)
+        txn.__dict__.update(prototype.__dict__)
+        txn.sender = sender
+        txn.note = note
+        txn.fee = params.fee
+        txn.first_valid_round = params.first
+        txn.last_valid_round = params.last
+        txn.genesis_id = params.gen
+        txn.genesis_hash = params.gh
+        return txn
+
+    def fix_fee(self, txn: Transaction, params: SuggestedParams) -> Transaction:
+        '''Same fee computation of the transaction constructors: flat or per byte'''
+
+        if not params.flat_fee:
+            txn.fee = max(txn.estimate_size() * txn.fee, constants.min_txn_fee)
+        return txn
+
+    def deposit(self, sender: str, params: SuggestedParams, amount: int, note: bytes = None) -> List[Transaction]:
+        '''Same as deposit(sender, params, amount, staking_asa_id, staking_app_id, pool_id, note)'''
+
+        if not isinstance(amount, int) or amount < 0:
+            raise error.WrongAmountType
+        transfer = self.stamp(self.deposit_transfer, sender, params)
+        transfer.amount = amount
+
+        return [self.fix_fee(transfer, params),
+                self.fix_fee(self.stamp(self.deposit_call, sender, params, note), params)]
+
+    def deposit_group(self, sender: str, params: SuggestedParams, amount: int, note: bytes = None) -> List[Transaction]:
+        return assign_group_id(self.deposit(sender, params, amount, note))
+
+    def claim(self, sender: str, params: SuggestedParams, note: bytes = None) -> Transaction:
+        '''Same as claim(sender, params, staking_asa_id, staking_app_id, pool_id, note)'''
+        return self.fix_fee(self.stamp(self.claim_call, sender, params, note), params)
+
+    def withdraw(self, sender: str, params: SuggestedParams, note: bytes = None) -> Transaction:
+        '''Same as withdraw(sender, params, staking_asa_id, staking_app_id, pool_id, note)'''
+        return self.fix_fee(self.stamp(self.withdraw_call, sender, params, note), params)
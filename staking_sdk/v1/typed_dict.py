@@ -1,7 +1,27 @@
-from typing import Dict, TypedDict
+from typing import Dict, List, TypedDict
 
 class UserStakedState(TypedDict):
     POOL_ID: int
     user_staked: int
     user_score: int
     STAKING_ASA_ID: int
+
+class GlobalStateChangeset(TypedDict):
+    added: List[int]
+    changed: List[int]
+    removed: List[int]
+
+class SubmitResult(TypedDict):
+    index: int
+    txid: 'str | None'
+    confirmed_round: 'int | None'
+    error: 'str | None'
+
+class ClaimOutcome(TypedDict):
+    address: str
+    pool_id: int
+    claimed: bool
+    txid: 'str | None'
+    confirmed_round: 'int | None'
+    attempts: int
+    error: 'str | None'
\ No newline at end of file
@@ -2,7 +2,7 @@ from algosdk.future.transaction import SuggestedParams, ApplicationNoOpTxn, Tran
 from ..utils import int_to_bytes
 from ..contract_strings import StakingArguments
 
-def withdraw(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int) -> Transaction:
+def withdraw(sender: str, params: SuggestedParams, staking_asa_id: int, staking_app_id: int, pool_id: int, note: bytes = None) -> Transaction:
     '''
         Returns a transaction without rapresenting a withdraw.
     '''  
@@ -14,6 +14,7 @@ def withdraw(sender: str, params: SuggestedParams, staking_asa_id: int, staking_
                 params,
                 staking_app_id,
                 foreign_assets=[staking_asa_id],
-                app_args=args)
+                app_args=args,
+                note=note)
 
     return txn
\ No newline at end of file